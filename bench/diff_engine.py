@@ -0,0 +1,89 @@
+"""Change detection on a synthetic 10k-flight feed: batched snapshot diff vs the per-user loop
+
+Run from the repository root:  python -m bench.diff_engine [flights] [mutation_rate]
+"""
+import logging
+import random
+import sys
+import time
+
+from bench.stub_feed import make_feed
+from diff_engine import diff_snapshots, snapshot_rows
+from models import Flight
+
+logger = logging.getLogger("bench.legacy")
+
+
+def normalize_value(value):
+    if value is None:
+        return None
+    return str(value).strip()
+
+
+def normalize_status(value):
+    v = normalize_value(value)
+    return v.lower() if isinstance(v, str) else v
+
+
+def legacy_loop(monitored, snapshot):
+    """The previous monitor_flight_status body: one user, one flight, field by field"""
+    changed = 0
+    for user_id, data in monitored.items():
+        current = snapshot.get(data['flight_id'])
+        if current is None:
+            continue
+        current_status = normalize_status(current.flightstat)
+        current_schedule = normalize_value(current.schedule)
+        current_estimate = normalize_value(current.estimate)
+        current_gate = normalize_value(current.gatenumber)
+        stored_status = normalize_status(data['last_status'])
+        stored_schedule = normalize_value(data['last_schedule'])
+        stored_estimate = normalize_value(data['last_estimate'])
+        stored_gate = normalize_value(data.get('last_gate'))
+        logger.info(f"Flight {current.flightno} comparison:")
+        logger.info(f"  Status: '{stored_status}' vs '{current_status}' - {'CHANGED' if stored_status != current_status else 'SAME'}")
+        logger.info(f"  Schedule: '{stored_schedule}' vs '{current_schedule}' - {'CHANGED' if stored_schedule != current_schedule else 'SAME'}")
+        logger.info(f"  Estimate: '{stored_estimate}' vs '{current_estimate}' - {'CHANGED' if stored_estimate != current_estimate else 'SAME'}")
+        logger.info(f"  Gate: '{stored_gate}' vs '{current_gate}' - {'CHANGED' if stored_gate != current_gate else 'SAME'}")
+        if (stored_status != current_status or normalize_value(stored_schedule) != normalize_value(current_schedule)
+                or normalize_value(stored_estimate) != normalize_value(current_estimate)
+                or normalize_value(stored_gate) != normalize_value(current_gate)):
+            changed += 1
+    return changed
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.02
+    logging.basicConfig(level=logging.WARNING)
+    rng = random.Random(7)
+
+    before = [Flight.from_raw(raw, "D") for raw in make_feed(size, "d")["data"]]
+    after_raw = make_feed(size, "d")["data"]
+    for raw in rng.sample(after_raw, int(size * rate)):
+        raw[rng.choice(("flightstat", "estimate", "gatenumber"))] = "Delayed" if rng.random() < 0.5 else "99"
+    after = [Flight.from_raw(raw, "D") for raw in after_raw]
+    snapshot = {str(f.id): f for f in after}
+
+    monitored = {
+        i: {'flight_id': str(f.id), 'last_status': f.flightstat, 'last_schedule': f.schedule,
+            'last_estimate': f.estimate, 'last_gate': f.gatenumber}
+        for i, f in enumerate(before)
+    }
+    started = time.perf_counter()
+    legacy_changed = legacy_loop(monitored, snapshot)
+    legacy = time.perf_counter() - started
+
+    previous_rows = snapshot_rows(before)
+    started = time.perf_counter()
+    current_rows = snapshot_rows(after)
+    events = diff_snapshots(previous_rows, current_rows)
+    batched = time.perf_counter() - started
+
+    print(f"{size} flights, {rate:.0%} mutated")
+    print(f"  per-user loop    {legacy * 1000:8.2f} ms  changed={legacy_changed}")
+    print(f"  snapshot diff    {batched * 1000:8.2f} ms  changed={len(events)} (incl. building rows)")
+
+
+if __name__ == "__main__":
+    main()
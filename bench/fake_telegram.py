@@ -0,0 +1,250 @@
+"""Local stand-in for the Telegram Bot API used by the load test
+
+python-telegram-bot is pointed at it with ``base_url``; requests arrive as
+POST /bot<token>/<method> with form-encoded, JSON-valued parameters.
+Updates queued with ``push_command``/``push_callback``/``push_inline_query`` are handed out by
+long-polled getUpdates or, once the bot has called setWebhook, POSTed to the
+webhook URL the way Telegram does. Every call the bot makes is recorded with
+its arrival time.
+"""
+import json
+import socket
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+BOT_ID = 123456
+TOKEN = f"{BOT_ID}:BENCH"
+
+
+def _decode(raw: bytes, content_type: str) -> Dict[str, Any]:
+    if not raw:
+        return {}
+    if content_type.startswith("application/json"):
+        return json.loads(raw)
+    params = {}
+    for name, value in parse_qsl(raw.decode(), keep_blank_values=True):
+        try:
+            params[name] = json.loads(value)
+        except ValueError:
+            params[name] = value
+    return params
+
+
+class Call:
+    __slots__ = ("seq", "at", "method", "params", "result")
+
+    def __init__(self, seq: int, at: float, method: str, params: Dict[str, Any], result: Any) -> None:
+        self.seq = seq
+        self.at = at
+        self.method = method
+        self.params = params
+        self.result = result
+
+    @property
+    def chat_id(self) -> Optional[int]:
+        chat_id = self.params.get("chat_id")
+        return int(chat_id) if chat_id is not None else None
+
+
+class FakeTelegramServer:
+    """Threaded HTTP server answering the Bot API methods the bot uses.
+
+    ``latency`` delays every answer except getUpdates. ``on_call`` is invoked
+    (from the server thread) for every recorded call.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls: List[Call] = []
+        self.on_call: Optional[Callable[[Call], None]] = None
+        self._updates: List[Dict[str, Any]] = []
+        self._next_update_id = 1
+        self._next_message_id = 1000
+        self._changed = threading.Condition()
+        self.webhook_url: Optional[str] = None
+        self.webhook_secret: Optional[str] = None
+        self.webhook_failures = 0
+        self._deliveries = ThreadPoolExecutor(max_workers=40, thread_name_prefix="webhook-delivery")
+        self._methods = {
+            "getMe": self._get_me,
+            "setWebhook": self._set_webhook,
+            "deleteWebhook": self._delete_webhook,
+            "sendMessage": self._message,
+            "editMessageText": self._message,
+        }
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_POST(self):
+                method = self.path.rsplit("/", 1)[-1]
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                params = _decode(raw, self.headers.get("Content-Type", ""))
+                result = server.handle(method, params)
+                body = json.dumps({"ok": True, "result": result}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 256
+            daemon_threads = True
+
+            def handle_error(self, request, client_address):
+                pass  # the bot hanging up mid long poll on shutdown
+
+        self._httpd = Server(("127.0.0.1", 0), Handler)
+        self.port = self._httpd.server_address[1]
+        self.base_url = f"http://127.0.0.1:{self.port}/bot"
+
+    def handle(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "getUpdates":
+            return self._get_updates(params)
+        if self.latency:
+            time.sleep(self.latency)
+        result = self._methods.get(method, lambda params: True)(params)
+        with self._changed:
+            call = Call(len(self.calls), time.monotonic(), method, params, result)
+            self.calls.append(call)
+            self._changed.notify_all()
+        if self.on_call is not None:
+            self.on_call(call)
+        return result
+
+    def _get_me(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"id": BOT_ID, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+    def _set_webhook(self, params: Dict[str, Any]) -> bool:
+        self.webhook_url = params["url"]
+        self.webhook_secret = params.get("secret_token")
+        return True
+
+    def _delete_webhook(self, params: Dict[str, Any]) -> bool:
+        self.webhook_url = None
+        return True
+
+    def _deliver(self, update: Dict[str, Any]) -> None:
+        request = urllib.request.Request(self.webhook_url, data=json.dumps(update).encode(), method="POST",
+                                         headers={"Content-Type": "application/json"})
+        if self.webhook_secret:
+            request.add_header("X-Telegram-Bot-Api-Secret-Token", self.webhook_secret)
+        try:
+            urllib.request.urlopen(request, timeout=30).close()
+        except Exception:
+            self.webhook_failures += 1
+
+    def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        offset = int(params.get("offset") or 0)
+        deadline = time.monotonic() + float(params.get("timeout") or 0)
+        with self._changed:
+            # Updates below the offset are confirmed and can be dropped
+            self._updates = [update for update in self._updates if update["update_id"] >= offset]
+            while not self._updates and time.monotonic() < deadline:
+                self._changed.wait(deadline - time.monotonic())
+            return self._updates[:int(params.get("limit") or 100)]
+
+    def _message(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        with self._changed:
+            message_id = params.get("message_id")
+            if message_id is None:
+                message_id = self._next_message_id
+                self._next_message_id += 1
+        return {
+            "message_id": int(message_id),
+            "date": int(time.time()),
+            "chat": {"id": int(params["chat_id"]), "type": "private"},
+            "from": {"id": BOT_ID, "is_bot": True, "first_name": "Bench"},
+            "text": params.get("text", ""),
+        }
+
+    def _user(self, user_id: int) -> Dict[str, Any]:
+        return {"id": user_id, "is_bot": False, "first_name": f"User{user_id}", "language_code": "en"}
+
+    def _push(self, update: Dict[str, Any]) -> int:
+        with self._changed:
+            update["update_id"] = self._next_update_id
+            self._next_update_id += 1
+            seq = len(self.calls)
+            if self.webhook_url is None:
+                self._updates.append(update)
+                self._changed.notify_all()
+        if self.webhook_url is not None:
+            self._deliveries.submit(self._deliver, update)
+        return seq
+
+    def push_command(self, user_id: int, text: str) -> int:
+        """Queue a user message; returns the call sequence number to wait from"""
+        command = text.split()[0]
+        return self._push({"message": {
+            "message_id": self._next_message_id, "date": int(time.time()), "text": text,
+            "chat": {"id": user_id, "type": "private"}, "from": self._user(user_id),
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}] if command.startswith("/") else [],
+        }})
+
+    def push_callback(self, user_id: int, data: str, message_id: int) -> int:
+        """Queue an inline button press on ``message_id``"""
+        return self._push({"callback_query": {
+            "id": f"{user_id}-{self._next_update_id}", "from": self._user(user_id), "chat_instance": str(user_id),
+            "data": data,
+            "message": {"message_id": message_id, "date": int(time.time()), "text": "",
+                        "chat": {"id": user_id, "type": "private"}},
+        }})
+
+    def push_inline_query(self, user_id: int, query: str) -> tuple:
+        """Queue an inline query; returns (query id, call sequence number)"""
+        query_id = f"{user_id}-{self._next_update_id}"
+        return query_id, self._push({"inline_query": {
+            "id": query_id, "from": self._user(user_id), "query": query, "offset": "",
+        }})
+
+    def wait_for(self, chat_id: int, methods: tuple, after: int, timeout: float = 30) -> Optional[Call]:
+        """First call of one of ``methods`` to ``chat_id`` with a sequence number of at least ``after``"""
+        return self._wait(lambda call: call.method in methods and call.chat_id == chat_id, after, timeout)
+
+    def wait_for_answer(self, query_id: str, after: int, timeout: float = 30) -> Optional[Call]:
+        """The answerInlineQuery call for ``query_id``"""
+        return self._wait(lambda call: call.method == "answerInlineQuery" and call.params.get("inline_query_id") == query_id,
+                          after, timeout)
+
+    def _wait(self, matches: Callable[[Call], bool], after: int, timeout: float) -> Optional[Call]:
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                for call in self.calls[after:]:
+                    if matches(call):
+                        return call
+                after = len(self.calls)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+
+    def method_counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for call in list(self.calls):
+            counts[call.method] = counts.get(call.method, 0) + 1
+        return counts
+
+    def start(self) -> "FakeTelegramServer":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._deliveries.shutdown(wait=False)
+        self._httpd.shutdown()
+        self._httpd.server_close()
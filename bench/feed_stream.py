@@ -0,0 +1,65 @@
+"""Peak memory and time to first result: whole-document json.loads vs the streaming feed parser
+
+Run from the repository root:  python -m bench.feed_stream [rows]
+"""
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench.stub_feed import make_feed
+from feed_stream import iter_chunks, iter_feed_records
+from models import Flight
+
+
+def load_whole(body, target):
+    """The previous path: decode the document, then normalize every record"""
+    data = json.loads(body)
+    flights = [Flight.from_raw(raw, "D") for raw in data.get("data", []) if isinstance(raw, dict)]
+    return next(flight for flight in flights if flight.flightno == target)
+
+
+def load_streaming(body, target):
+    for raw in iter_feed_records(iter_chunks(body)):
+        if isinstance(raw, dict) and raw.get("flightno") == target:
+            return Flight.from_raw(raw, "D")
+    return None
+
+
+def measure(load, body, target):
+    load(body, target)  # warm timestamp caches
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    found = load(body, target)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert found is not None and found.flightno == target
+    return peak, elapsed
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    feed = make_feed(size, "d")
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as fixture:
+        json.dump(feed, fixture)
+    try:
+        with open(fixture.name, "rb") as handle:
+            body = handle.read()
+    finally:
+        os.unlink(fixture.name)
+    print(f"{size} rows, {len(body) / 1024 / 1024:.1f} MiB fixture")
+    for position in ("first", "middle", "last"):
+        index = {"first": 0, "middle": size // 2, "last": size - 1}[position]
+        target = feed["data"][index]["flightno"]
+        for name, load in (("json.loads", load_whole), ("streaming", load_streaming)):
+            peak, elapsed = measure(load, body, target)
+            print(f"  {position:<6} {name:<10} peak={peak / 1024 / 1024:7.2f} MiB  first-result={elapsed * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
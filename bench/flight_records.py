@@ -0,0 +1,72 @@
+"""Memory and allocation cost of normalized feed rows: per-flight dicts vs slotted Flight
+
+Run from the repository root:  python -m bench.flight_records [rows]
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from bench.stub_feed import make_feed
+from models import Flight
+
+REFRESHES = 20
+
+
+def normalize_dicts(data, departure):
+    """The previous _normalize_flights: a fresh 9-key dict per raw record"""
+    normalized = []
+    for raw in data.get("data", []):
+        if not isinstance(raw, dict):
+            continue
+        normalized.append({
+            "id": raw.get("id"),
+            "operator": raw.get("operator"),
+            "schedule": raw.get("schedule"),
+            "estimate": raw.get("estimate"),
+            "flightno": raw.get("flightno"),
+            "gatenumber": raw.get("gatenumber"),
+            "flightstat": raw.get("flightstat"),
+            "fromtolocation": raw.get("fromtolocation"),
+            "departure": departure,
+        })
+    return normalized
+
+
+def normalize_records(data, departure):
+    return [Flight.from_raw(raw, departure) for raw in data.get("data", []) if isinstance(raw, dict)]
+
+
+def measure(normalize, body):
+    # Every refresh parses a fresh payload, as _load_feed does
+    normalize(json.loads(body), "D")  # warm timestamp caches
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(body)
+    baseline, _ = tracemalloc.get_traced_memory()
+    rows = normalize(data, "D")
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+
+    payloads = [json.loads(body) for _ in range(REFRESHES)]
+    started = time.perf_counter()
+    for payload in payloads:
+        normalize(payload, "D")
+    elapsed = (time.perf_counter() - started) / REFRESHES
+    return retained - baseline, peak - baseline, elapsed
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    body = json.dumps(make_feed(size, "d"))
+    print(f"{size} rows per refresh")
+    for name, normalize in (("dict", normalize_dicts), ("Flight", normalize_records)):
+        retained, peak, elapsed = measure(normalize, body)
+        print(f"  {name:<7} retained={retained / 1024:8.1f} KiB  peak={peak / 1024:8.1f} KiB  "
+              f"per-row={retained / size:6.1f} B  normalize={elapsed * 1000:7.2f} ms/refresh")
+
+
+if __name__ == "__main__":
+    main()
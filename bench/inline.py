@@ -0,0 +1,124 @@
+"""Inline query latency: "@bot GA1234" answered from the in-memory snapshot
+
+Users type flight numbers into the inline box one character at a time
+("g", "ga", "ga 1", ...), one keystroke every --keystroke-interval seconds
+(0 sends the next one as soon as the answer arrives, which measures
+saturation), through real getUpdates polling and the bot's InlineQueryHandler.
+The feed stub serves a 10k-flight snapshot (two thirds DOM, one third
+INTER) and keeps mutating it, so answers are rebuilt whenever the store
+version changes.
+
+Reports the end-to-end answer latency (update queued -> answerInlineQuery
+received), the handler's own time, the inline answer cache and how many
+upstream feed requests were made while the queries ran (background
+refreshes only; queries never wait on them).
+
+Run from the repository root:
+    python -m bench.inline [--users 20] [--flights 10000] [--seconds 15] [--keystroke-interval 0.15]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from typing import List
+
+from bench.fake_telegram import TOKEN, FakeTelegramServer
+from bench.load_test import percentile, run_bot
+from bench.stub_feed import StubFeedServer
+
+
+def keystrokes(flight_no: str) -> List[str]:
+    typed = f"{flight_no[:2].lower()} {flight_no[2:]}"
+    return [typed[:end] for end in range(1, len(typed) + 1) if not typed[:end].endswith(" ")]
+
+
+def typist(telegram: FakeTelegramServer, user_id: int, flights: int, deadline: float, interval: float,
+           latencies: List[float], empty: List[int]) -> None:
+    rng = random.Random(user_id)
+    time.sleep(rng.uniform(0, interval))
+    while time.monotonic() < deadline:
+        for text in keystrokes(f"GA{100 + rng.randrange(flights)}"):
+            pushed = time.monotonic()
+            query_id, seq = telegram.push_inline_query(user_id, text)
+            answer = telegram.wait_for_answer(query_id, seq)
+            if answer is None:
+                return
+            latencies.append(answer.at - pushed)
+            if not answer.params.get("results"):
+                empty.append(1)
+            time.sleep(max(0.0, pushed + interval - time.monotonic()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--flights", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--keystroke-interval", type=float, default=0.15)
+    parser.add_argument("--mutation-rate", type=float, default=0.01, help="share of rows changed per second")
+    args = parser.parse_args()
+
+    dom_size = args.flights * 2 // 3
+    feed = StubFeedServer(dom_size=dom_size, inter_size=args.flights - dom_size, latency=0.05, etag=True)
+    telegram = FakeTelegramServer().start()
+    os.environ.update({"BOT_TOKEN": TOKEN, "API_DOM_URL": feed.dom_url, "API_INTER_URL": feed.inter_url,
+                       "SUBSCRIPTION_DB_PATH": ""})
+    logging.disable(logging.WARNING)
+
+    from telegram.ext import Application
+    import flight_handler
+    from main import register_handlers
+    from profiler import command_profiler
+
+    application = Application.builder().token(TOKEN).base_url(telegram.base_url).build()
+    register_handlers(application)
+    stop = threading.Event()
+    threading.Thread(target=run_bot, args=(application, stop), daemon=True).start()
+    feed.start(mutation_rate=args.mutation_rate)
+
+    # The first query finds an empty store and starts the feed load in the background
+    started = time.monotonic()
+    query_id, seq = telegram.push_inline_query(1, "ga 100")
+    first = telegram.wait_for_answer(query_id, seq)
+    while True:
+        query_id, seq = telegram.push_inline_query(1, "ga 100")
+        answer = telegram.wait_for_answer(query_id, seq)
+        if answer.params.get("results"):
+            break
+        time.sleep(0.05)
+    print(f"cold start: first answer {(first.at - started) * 1000:.0f} ms with {len(first.params.get('results') or [])} "
+          f"results (cache_time={first.params.get('cache_time')}), results after {(answer.at - started) * 1000:.0f} ms")
+
+    hits_before = sum(feed.hits.values())
+    deadline = time.monotonic() + args.seconds
+    latencies: List[float] = []
+    empty: List[int] = []
+    users = [threading.Thread(target=typist, args=(telegram, 100 + i, args.flights // 2, deadline,
+                                                       args.keystroke_interval, latencies, empty))
+             for i in range(args.users)]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    upstream = sum(feed.hits.values()) - hits_before
+
+    handler = command_profiler.summary().get("inline_query", {})
+    print(f"{args.users} users typing every {args.keystroke_interval * 1000:.0f} ms for {args.seconds:.0f}s against "
+          f"{args.flights} flights: {len(latencies)} queries "
+          f"({len(latencies) / args.seconds:.0f}/s), {len(empty)} without results")
+    print(f"  answer latency p50={percentile(latencies, 50) * 1000:.1f} ms  p95={percentile(latencies, 95) * 1000:.1f} ms  "
+          f"p99={percentile(latencies, 99) * 1000:.1f} ms  max={max(latencies) * 1000:.1f} ms")
+    print(f"  handler (incl. answerInlineQuery call): {handler}")
+    print(f"  inline answer cache: {flight_handler.inline_answers.stats()}")
+    print(f"  upstream feed requests while querying: {upstream} (background refreshes, {feed.mutations} row mutations)")
+    stop.set()
+    time.sleep(1.5)
+    feed.stop()
+    telegram.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
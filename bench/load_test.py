@@ -0,0 +1,216 @@
+"""End-to-end load test: the real bot against a local feed and a local Telegram Bot API
+
+N simulated users each go /start -> language -> domestic -> today's schedule
+-> flight search -> start monitoring, one step after the other, through real
+getUpdates long polling (or, with --webhook, main.run_webhook receiving
+POSTed updates) and the bot's real handlers. The feed stub keeps
+mutating rows while the monitor runs; a notification's delay is the time
+from the mutation of a watched flight to the alert reaching that user's chat.
+
+Reports per-step p50/p95/p99 latency, step throughput, upstream feed
+requests and Telegram calls by method.
+
+Run from the repository root:
+    python -m bench.load_test [--users 50] [--feed-size 300] [--mutation-rate 0.05]
+                              [--feed-latency 0.02] [--telegram-latency 0.0] [--monitor-seconds 15]
+                              [--cache-ttl SECONDS] [--webhook] [--webhook-workers 8]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from bench.fake_telegram import TOKEN, FakeTelegramServer
+from bench.stub_feed import StubFeedServer
+
+STEPS = ("start", "language", "flight_type", "schedule", "search", "monitor")
+REPLIES = ("sendMessage", "editMessageText")
+ALERT_PREFIX = "🚨 Flight Update Alert"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+class Recorder:
+    """Step latencies per user journey, and mutation-to-alert delays per watching chat"""
+
+    def __init__(self) -> None:
+        self.steps: Dict[str, List[float]] = {step: [] for step in STEPS}
+        self.failures: Dict[str, int] = {step: 0 for step in STEPS}
+        self.notification_delays: List[float] = []
+        self.watchers: Dict[str, List[int]] = {}  # flight id -> chats monitoring it
+        self._changed_at: Dict[int, float] = {}  # chat -> oldest change not yet alerted
+        self._lock = threading.Lock()
+
+    def watch(self, flight_id: str, chat_id: int) -> None:
+        with self._lock:
+            self.watchers.setdefault(flight_id, []).append(chat_id)
+
+    def on_mutation(self, flight_ids: List[str], at: float) -> None:
+        with self._lock:
+            for flight_id in flight_ids:
+                for chat_id in self.watchers.get(flight_id, ()):
+                    self._changed_at.setdefault(chat_id, at)
+
+    def on_call(self, call) -> None:
+        if call.method != "sendMessage" or not str(call.params.get("text", "")).startswith(ALERT_PREFIX):
+            return
+        with self._lock:
+            changed_at = self._changed_at.pop(call.chat_id, None)
+            if changed_at is not None:
+                self.notification_delays.append(call.at - changed_at)
+
+
+def user_journey(telegram: FakeTelegramServer, recorder: Recorder, user_id: int, flight_index: int,
+                 date_str: str) -> None:
+    flight_no, flight_id = f"GA{100 + flight_index}", f"d{flight_index}"
+    message_id = None
+    for step in STEPS:
+        pushed = time.monotonic()
+        if step == "start":
+            seq = telegram.push_command(user_id, "/start")
+        else:
+            data = {
+                "language": "lang_en",
+                "flight_type": "D",
+                "schedule": f"schedule_D_{date_str}",
+                "search": f"flight_search_{flight_no}_{date_str}",
+                "monitor": f"monitor_{flight_id}",
+            }[step]
+            seq = telegram.push_callback(user_id, data, message_id)
+        reply = telegram.wait_for(user_id, REPLIES, seq)
+        if reply is None:
+            recorder.failures[step] += 1
+            return
+        recorder.steps[step].append(reply.at - pushed)
+        message_id = reply.result["message_id"]
+    recorder.watch(flight_id, user_id)
+
+
+def run_bot(application, stop: threading.Event) -> None:
+    async def serve():
+        await application.initialize()
+        await application.updater.start_polling(poll_interval=0, timeout=1)
+        await application.start()
+        while not stop.is_set():
+            await asyncio.sleep(0.1)
+        await application.updater.stop()
+        await application.stop()
+        await application.shutdown()
+
+    asyncio.run(serve())
+
+
+def run_webhook_server(application, port: int) -> None:
+    from main import run_webhook
+
+    asyncio.run(run_webhook(application, f"http://127.0.0.1:{port}/telegram", port, free_port()))
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--feed-size", type=int, default=300)
+    parser.add_argument("--mutation-rate", type=float, default=0.05, help="share of rows changed per second")
+    parser.add_argument("--feed-latency", type=float, default=0.02)
+    parser.add_argument("--telegram-latency", type=float, default=0.0)
+    parser.add_argument("--monitor-seconds", type=float, default=15)
+    parser.add_argument("--cache-ttl", type=float, help="FEED_CACHE_TTL_SECONDS (default: the bot's own)")
+    parser.add_argument("--webhook", action="store_true", help="receive updates by webhook instead of polling")
+    parser.add_argument("--webhook-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    feed = StubFeedServer(dom_size=args.feed_size, inter_size=args.feed_size // 2, latency=args.feed_latency, etag=True)
+    telegram = FakeTelegramServer(latency=args.telegram_latency).start()
+    recorder = Recorder()
+    feed.on_mutation = recorder.on_mutation
+    telegram.on_call = recorder.on_call
+
+    os.environ["BOT_TOKEN"] = TOKEN
+    os.environ["API_DOM_URL"] = feed.dom_url
+    os.environ["API_INTER_URL"] = feed.inter_url
+    os.environ["MONITOR_INTERVAL_SECONDS"] = "1"
+    os.environ["ADAPTIVE_POLLING"] = "false"
+    os.environ["SUBSCRIPTION_DB_PATH"] = ""
+    if args.cache_ttl is not None:
+        os.environ["FEED_CACHE_TTL_SECONDS"] = str(args.cache_ttl)
+    os.environ["WEBHOOK_WORKERS"] = str(args.webhook_workers)
+    os.environ["WEBHOOK_SECRET_TOKEN"] = "load-test-secret"
+    logging.disable(logging.WARNING)
+
+    from telegram.ext import Application
+    import flight_handler
+    from main import register_handlers, run_monitoring_loop
+
+    application = Application.builder().token(TOKEN).base_url(telegram.base_url).build()
+    register_handlers(application)
+    stop = threading.Event()
+    if args.webhook:
+        bot_thread = threading.Thread(target=run_webhook_server, args=(application, free_port()), daemon=True)
+    else:
+        bot_thread = threading.Thread(target=run_bot, args=(application, stop), daemon=True)
+    bot_thread.start()
+    if args.webhook:
+        deadline = time.monotonic() + 10
+        while telegram.webhook_url is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+    monitor = threading.Thread(target=run_monitoring_loop, args=(application,), daemon=True)
+    feed.start(mutation_rate=args.mutation_rate)
+    monitor.start()
+
+    date_str = datetime.now().strftime('%Y-%m-%d')
+    started = time.monotonic()
+    users = [
+        threading.Thread(target=user_journey, args=(telegram, recorder, 1000 + i, i % args.feed_size, date_str))
+        for i in range(args.users)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    journeys_seconds = time.monotonic() - started
+    feed_hits_after_journeys = dict(feed.hits)
+
+    time.sleep(args.monitor_seconds)
+    flight_handler.should_exit = True
+    stop.set()
+    monitor.join(timeout=35)
+    bot_thread.join(timeout=5)
+
+    completed = sum(len(samples) for samples in recorder.steps.values())
+    print(f"{'webhook' if args.webhook else 'polling'}: {args.users} users, feed {args.feed_size}+{args.feed_size // 2} rows, "
+          f"feed latency {args.feed_latency * 1000:.0f} ms, telegram latency {args.telegram_latency * 1000:.0f} ms")
+    print(f"journeys: {journeys_seconds:.2f}s, {completed / journeys_seconds:.1f} steps/s, "
+          f"{len(recorder.steps['monitor'])}/{args.users} users monitoring")
+    for step in STEPS:
+        samples = recorder.steps[step]
+        print(f"  {step:<12} n={len(samples):<5} p50={percentile(samples, 50) * 1000:8.1f} ms  "
+              f"p95={percentile(samples, 95) * 1000:8.1f} ms  p99={percentile(samples, 99) * 1000:8.1f} ms  "
+              f"failed={recorder.failures[step]}")
+    delays = recorder.notification_delays
+    print(f"notifications over {args.monitor_seconds:.0f}s: {len(delays)} alerts, {feed.mutations} row mutations, "
+          f"delay p50={percentile(delays, 50) * 1000:.0f} ms p95={percentile(delays, 95) * 1000:.0f} ms "
+          f"p99={percentile(delays, 99) * 1000:.0f} ms")
+    print(f"upstream requests: during journeys {feed_hits_after_journeys}, total {feed.hits}, "
+          f"304 {feed.not_modified}")
+    print(f"telegram calls: {dict(sorted(telegram.method_counts().items()))}")
+    feed.stop()
+    telegram.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
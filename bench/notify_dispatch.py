@@ -0,0 +1,119 @@
+"""Fan-out latency of one change to many subscribers: sequential awaits vs NotificationDispatcher
+
+The fake Bot adds latency to every call (with a slow tail), answers a share of
+send_message calls with RetryAfter, and records the per-chat order of calls;
+the dispatcher run asserts delete-previous-then-send ordering in every chat.
+
+Run from the repository root:  python -m bench.notify_dispatch [subscribers]
+"""
+import asyncio
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from telegram.error import RetryAfter
+
+from dispatcher import NotificationDispatcher
+from flight_handler import notify_subscriber
+from models import Subscription
+
+LATENCY = 0.05
+SLOW_LATENCY = 1.0
+SLOW_SHARE = 0.05
+RETRY_AFTER_SHARE = 0.02
+NOTIFICATIONS_PER_CHAT = 2
+
+
+class FakeBot:
+    def __init__(self, seed=1):
+        self.random = random.Random(seed)
+        self.calls = {}
+        self.next_id = 0
+        self.throttled = 0
+
+    async def _latency(self):
+        await asyncio.sleep(SLOW_LATENCY if self.random.random() < SLOW_SHARE else LATENCY)
+
+    async def delete_message(self, chat_id, message_id):
+        await self._latency()
+        self.calls.setdefault(chat_id, []).append(("delete", message_id))
+
+    async def send_message(self, chat_id, text, reply_markup=None, parse_mode=None):
+        await self._latency()
+        if self.random.random() < RETRY_AFTER_SHARE:
+            self.throttled += 1
+            raise RetryAfter(1)
+        self.next_id += 1
+        self.calls.setdefault(chat_id, []).append(("send", self.next_id))
+        return SimpleNamespace(message_id=self.next_id)
+
+
+def check_order(bot, chats):
+    """Every chat must see send, delete(that send), send, ..."""
+    for chat_id in chats:
+        calls = bot.calls.get(chat_id, [])
+        expected_sends = NOTIFICATIONS_PER_CHAT
+        assert [kind for kind, _ in calls] == ["send"] + ["delete", "send"] * (expected_sends - 1), calls
+        for (_, sent_id), (_, deleted_id) in zip(calls[0::2], calls[1::2]):
+            assert sent_id == deleted_id, calls
+
+
+async def run_sequential(chats):
+    bot = FakeBot()
+    subscriptions = {chat_id: Subscription("f1", "GA123", "en") for chat_id in chats}
+    latencies = []
+    started = time.perf_counter()
+    for round_no in range(NOTIFICATIONS_PER_CHAT):
+        for chat_id in chats:
+            # As the monitor used to: await each send in turn, log and drop failures
+            try:
+                await notify_subscriber(bot, chat_id, subscriptions[chat_id], f"update {round_no}")
+            except RetryAfter:
+                continue
+            latencies.append(time.perf_counter() - started)
+    return latencies, bot.throttled
+
+
+async def run_dispatcher(chats):
+    bot = FakeBot()
+    dispatcher = NotificationDispatcher(bot, concurrency=32, global_rate=30, chat_rate=1)
+    subscriptions = {chat_id: Subscription("f1", "GA123", "en") for chat_id in chats}
+    latencies = []
+    started = time.perf_counter()
+
+    def job(chat_id, round_no):
+        async def deliver(chat_bot):
+            await notify_subscriber(chat_bot, chat_id, subscriptions[chat_id], f"update {round_no}")
+            latencies.append(time.perf_counter() - started)
+        return deliver
+
+    for round_no in range(NOTIFICATIONS_PER_CHAT):
+        for chat_id in chats:
+            dispatcher.submit(chat_id, job(chat_id, round_no))
+    await dispatcher.join()
+    check_order(bot, chats)
+    assert dispatcher.stats()["failed"] == 0
+    return latencies, bot.throttled
+
+
+def summary(latencies):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2]
+    return f"p50={p50:7.2f} s  last={latencies[-1]:7.2f} s"
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    chats = list(range(1000, 1000 + count))
+    print(f"{count} subscribers x {NOTIFICATIONS_PER_CHAT} notifications, {LATENCY * 1000:.0f} ms per call "
+          f"({SLOW_SHARE:.0%} take {SLOW_LATENCY:g} s), "
+          f"{RETRY_AFTER_SHARE:.0%} of sends answered with RetryAfter(1)")
+    for name, run in (("sequential", run_sequential), ("dispatcher", run_dispatcher)):
+        latencies, throttled = asyncio.run(run(chats))
+        lost = count * NOTIFICATIONS_PER_CHAT - len(latencies)
+        print(f"  {name:<10} {summary(latencies)}  retry_after={throttled:3d}  lost={lost}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Message rendering throughput: per-call get_text and += concatenation vs compiled templates and caching
+
+Measures the 20-item schedule view (cached: a SchedulePages lookup) and the
+status card sent with every update alert (cached: the render cache).
+
+Run from the repository root:  python -m bench.render [seconds per case]
+"""
+import sys
+import time
+from datetime import datetime
+
+from bench.stub_feed import make_feed
+from flight_store import FlightStore
+from language import TRANSLATIONS, get_month_names, get_status_emoji
+from models import Flight
+from rendering import SchedulePages, render_cache, render_flight_status, render_schedule_page
+
+
+def old_get_text(key, language='en', **kwargs):
+    if language not in TRANSLATIONS:
+        language = 'en'
+    text = TRANSLATIONS[language].get(key, TRANSLATIONS['en'].get(key, key))
+    try:
+        return text.format(**kwargs)
+    except (KeyError, ValueError):
+        return text
+
+
+def old_schedule(flights, date_obj, language):
+    if language == 'id':
+        month_names = get_month_names('id')
+        date_formatted = date_obj.strftime('%d %B %Y')
+        for eng_month, ind_month in month_names.items():
+            date_formatted = date_formatted.replace(eng_month, ind_month)
+    else:
+        date_formatted = date_obj.strftime('%d %B %Y')
+    message = f"{old_get_text('flight_schedules', language, date=date_formatted)}\n\n"
+    for i, flight in enumerate(flights, 1):
+        message += f"{i}. {flight.flightno}\n"
+        message += f"   📍 {flight.fromtolocation}\n"
+        message += f"   🕐 {flight.schedule}\n\n"
+    return message
+
+
+def old_status(flight_data, changes=None, language='en'):
+    status_emoji = get_status_emoji(flight_data.flightstat)
+    message = f"✈️ {old_get_text('flight_info_title', language, flight_no=flight_data.flightno)} Status*\n\n"
+    message += f"{old_get_text('schedule_label', language)} {flight_data.schedule}\n"
+    message += f"{old_get_text('estimate_label', language)} {flight_data.estimate}\n"
+    message += f"{old_get_text('gate_label', language)} {flight_data.gatenumber}\n"
+    message += f"{old_get_text('status_label', language)} {status_emoji} {flight_data.flightstat}\n"
+    message += f"{old_get_text('route_label', language)} {flight_data.fromtolocation}\n"
+    if changes:
+        message += f"\n{old_get_text('recent_changes', language)}\n"
+        for change in changes:
+            message += f"• {change}\n"
+    message += f"\n{old_get_text('last_updated', language, time=datetime.now().strftime('%H:%M:%S'))}"
+    return message
+
+
+def rate(render, seconds):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            render()
+        count += 100
+    return count / seconds
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    flights = [Flight.from_raw(row, "D") for row in make_feed(20, "d")["data"]]
+    day = datetime.now()
+    date_str = day.strftime('%Y-%m-%d')
+    store = FlightStore()
+    store.sync("D", flights)
+    pages = SchedulePages(page_size=20)
+    changes = ["Status: On Time → Boarding", "Gate: 3 → 4"]
+
+    for language in ("en", "id"):
+        assert old_schedule(flights, day, language) == render_schedule_page(flights, day, language)
+        assert pages.page(store, date_str, "D", language)[0] == render_schedule_page(flights, day, language)
+        old = old_status(flights[0], changes, language)
+        new = render_flight_status(flights[0], changes, language)
+        assert old.rsplit("\n", 1)[0] == new.rsplit("\n", 1)[0]
+
+    cases = {
+        "schedule (20 rows)": (
+            lambda: old_schedule(flights, day, "id"),
+            lambda: render_schedule_page(flights, day, "id"),
+            lambda: pages.page(store, date_str, "D", "id"),
+        ),
+        "status card": (
+            lambda: old_status(flights[0], changes, "id"),
+            lambda: (render_cache.clear(), render_flight_status(flights[0], changes, "id")),
+            lambda: render_flight_status(flights[0], changes, "id"),
+        ),
+    }
+    print(f"renders per second ({seconds:.1f}s per case, language 'id')")
+    for name, (old, compiled, cached) in cases.items():
+        old_rate, compiled_rate, cached_rate = rate(old, seconds), rate(compiled, seconds), rate(cached, seconds)
+        print(f"  {name:<19} before={old_rate:>10,.0f}  compiled={compiled_rate:>10,.0f} "
+              f"({compiled_rate / old_rate:.1f}x)  cached={cached_rate:>10,.0f} ({cached_rate / old_rate:.1f}x)")
+    print(f"render cache: {render_cache.stats()}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
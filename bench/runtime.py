@@ -0,0 +1,229 @@
+"""Startup/shutdown latency and a race stress test: three threads and loops vs SINGLE_LOOP
+
+Each runtime runs in its own subprocess against the local feed and Telegram
+stubs:
+
+* threads: main.py's default layout, with the polling, monitor and health
+  server threads each running their own event loop.
+* single: main.run_single_loop, where everything is a task on one loop.
+
+Startup is the time until the first /start is answered. Shutdown is the time
+from the stop request until the runtime has finished; in threads mode the
+monitor only notices the exit flag after its current sleep.
+
+In the stress run, half of the users subscribe and unsubscribe to overlapping
+flights in a tight loop. The other half hold subscriptions while the feed
+mutates and the monitor sends alerts. Afterwards the run checks that the
+registry's two indexes still agree and counts errors logged by the bot,
+including sends from a thread whose loop does not own the bot's HTTP client.
+
+Run from the repository root:  python -m bench.runtime [--stress-users 20] [--stress-seconds 10]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from bench.fake_telegram import TOKEN, FakeTelegramServer
+from bench.load_test import free_port, run_bot
+from bench.stub_feed import StubFeedServer
+
+MODES = ("threads", "single")
+REPLIES = ("sendMessage", "editMessageText")
+
+
+class ErrorCounter(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__(logging.ERROR)
+        self.errors = 0
+        self.cross_loop = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.errors += 1
+        if "different event loop" in record.getMessage() or "different loop" in record.getMessage():
+            self.cross_loop += 1
+
+
+class Runtime:
+    """Starts and stops the bot in one of the two layouts"""
+
+    def __init__(self, mode: str, application, port: int) -> None:
+        self.mode = mode
+        self.application = application
+        self.port = port
+        self._threads = []
+        self._loop = None
+        self._stop = None
+        self._polling_stop = threading.Event()
+
+    def start(self) -> None:
+        import main
+
+        if self.mode == "threads":
+            # As main.main() lays it out
+            self._threads = [
+                threading.Thread(target=main.run_monitoring_loop, args=(self.application,), daemon=True),
+                threading.Thread(target=run_bot, args=(self.application, self._polling_stop), daemon=True),
+            ]
+            threading.Thread(target=main.run_health_server, daemon=True).start()
+        else:
+            ready = threading.Event()
+
+            async def serve():
+                self._loop = asyncio.get_running_loop()
+                self._stop = asyncio.Event()
+                ready.set()
+                await main.run_single_loop(self.application, "", self.port, self._stop, admin_port=free_port())
+
+            self._threads = [threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        if self.mode == "single":
+            ready.wait()
+
+    def stop(self, timeout: float = 60) -> None:
+        import flight_handler
+
+        if self.mode == "threads":
+            flight_handler.should_exit = True
+            self._polling_stop.set()
+        else:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        for thread in self._threads:
+            thread.join(timeout)
+
+
+def registry_consistent(registry) -> bool:
+    by_user = {(user_id, flight_id) for user_id in registry.user_ids() for flight_id in registry.subscriptions_for(user_id)}
+    by_flight = {(user_id, watch.flight_id) for watch in registry.watches() for user_id in watch.subscribers}
+    return by_user == by_flight and registry.subscription_count() == len(by_flight)
+
+
+def churn(telegram: FakeTelegramServer, user_id: int, flights: int, deadline: float, seed: int) -> int:
+    """Odd users subscribe and unsubscribe in a loop; even users keep three
+    subscriptions so that alerts are being sent throughout"""
+    rng = random.Random(seed)
+    steps = 0
+    if user_id % 2 == 0:
+        for flight_id in rng.sample(range(flights), 3):
+            seq = telegram.push_callback(user_id, f"monitor_d{flight_id}", 1000)
+            telegram.wait_for(user_id, REPLIES, seq, timeout=10)
+            steps += 1
+        time.sleep(max(0.0, deadline - time.monotonic()))
+        return steps
+    while time.monotonic() < deadline:
+        flight_id = f"d{rng.randrange(flights)}"
+        for data in (f"monitor_{flight_id}", f"stop_monitor_{flight_id}"):
+            seq = telegram.push_callback(user_id, data, 1000)
+            if telegram.wait_for(user_id, REPLIES, seq, timeout=10) is None:
+                return steps
+            steps += 1
+    return steps
+
+
+def run_child(mode: str, stress_users: int, stress_seconds: float) -> dict:
+    feed = StubFeedServer(dom_size=200, inter_size=100, latency=0.01, etag=True)
+    telegram = FakeTelegramServer().start()
+    port = free_port()
+    os.environ.update({
+        "BOT_TOKEN": TOKEN, "API_DOM_URL": feed.dom_url, "API_INTER_URL": feed.inter_url,
+        "ADAPTIVE_POLLING": "false", "SUBSCRIPTION_DB_PATH": "", "HEALTH_PORT": str(port),
+        "ADMIN_PORT": str(free_port()),
+        "MONITOR_INTERVAL_SECONDS": "1" if stress_users else os.environ.get("MONITOR_INTERVAL_SECONDS", "10"),
+        "FEED_CACHE_TTL_SECONDS": "0.5",
+    })
+    from telegram.ext import Application
+    import flight_handler
+    from main import register_handlers
+
+    logging.disable(logging.WARNING)
+    counter = ErrorCounter()
+    logging.getLogger().handlers = [counter]
+
+    application = Application.builder().token(TOKEN).base_url(telegram.base_url).build()
+    register_handlers(application)
+    runtime = Runtime(mode, application, port)
+    feed.start(mutation_rate=0.3 if stress_users else 0.0)
+
+    started = time.monotonic()
+    runtime.start()
+    seq = telegram.push_command(1, "/start")
+    reply = telegram.wait_for(1, REPLIES, seq)
+    result = {"mode": mode, "startup_seconds": reply.at - started if reply else None}
+
+    # One active subscription, so shutdown includes the monitor's dispatcher
+    seq = telegram.push_callback(1, "monitor_d0", 1000)
+    telegram.wait_for(1, REPLIES, seq)
+
+    if stress_users:
+        deadline = time.monotonic() + stress_seconds
+        steps = []
+        users = [threading.Thread(target=lambda i=i: steps.append(churn(telegram, 100 + i, 20, deadline, i)))
+                 for i in range(stress_users)]
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        time.sleep(1.5)  # let the last ticks finish
+        result.update({
+            "stress_steps": sum(steps),
+            "alerts": sum(1 for call in list(telegram.calls)
+                          if call.method == "sendMessage" and str(call.params.get("text", "")).startswith("🚨")),
+            "registry_consistent": registry_consistent(flight_handler.registry),
+        })
+
+    stopping = time.monotonic()
+    runtime.stop()
+    result["shutdown_seconds"] = time.monotonic() - stopping
+    result["stopped"] = not any(thread.is_alive() for thread in runtime._threads)
+    result["errors"] = counter.errors
+    result["cross_loop_errors"] = counter.cross_loop
+    feed.stop()
+    telegram.stop()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stress-users", type=int, default=20)
+    parser.add_argument("--stress-seconds", type=float, default=10)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--child-stress", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.child_stress, args.stress_seconds)))
+        os._exit(0)  # the threads runtime's health server thread cannot be stopped
+
+    def child(mode: str, stress_users: int) -> dict:
+        output = subprocess.run(
+            [sys.executable, "-m", "bench.runtime", "--child", mode, "--child-stress", str(stress_users),
+             "--stress-seconds", str(args.stress_seconds)],
+            capture_output=True, text=True, timeout=300,
+        )
+        lines = output.stdout.strip().splitlines()
+        if output.returncode or not lines:
+            raise RuntimeError(f"{mode} run failed:\n{output.stderr[-2000:]}")
+        return json.loads(lines[-1])
+
+    print("startup / shutdown (MONITOR_INTERVAL_SECONDS=10, one active subscription)")
+    for mode in MODES:
+        result = child(mode, 0)
+        print(f"  {mode:<8} startup={result['startup_seconds'] * 1000:7.0f} ms  "
+              f"shutdown={result['shutdown_seconds'] * 1000:7.0f} ms  stopped={result['stopped']}")
+    print(f"stress: {args.stress_users} users (half churning monitor/stop, half watching) on 20 flights for {args.stress_seconds:.0f}s")
+    for mode in MODES:
+        result = child(mode, args.stress_users)
+        print(f"  {mode:<8} steps={result['stress_steps']:<6} alerts={result['alerts']:<5} "
+              f"registry_consistent={result['registry_consistent']}  errors={result['errors']} "
+              f"(cross-loop sends: {result['cross_loop_errors']})")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
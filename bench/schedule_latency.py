@@ -0,0 +1,91 @@
+"""p50/p99 latency of 50 concurrent /schedule callbacks, blocking vs pooled async fetch
+
+Run from the repository root:  python -m bench.schedule_latency
+"""
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from types import SimpleNamespace
+
+from bench.stub_feed import StubFeedServer
+
+CONCURRENCY = 50
+
+
+class FakeQuery:
+    def __init__(self, user_id: int) -> None:
+        self.from_user = SimpleNamespace(id=user_id)
+        self.message = SimpleNamespace(chat_id=user_id)
+
+    async def edit_message_text(self, text, reply_markup=None, parse_mode=None):
+        return SimpleNamespace(message_id=1)
+
+    def get_bot(self):
+        return None
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_round(handler_module):
+    date_str = datetime.now().strftime('%Y-%m-%d')
+
+    # Every callback "arrives" at the same instant, so latency includes the
+    # time a handler spent queued behind others blocking the loop.
+    arrived = time.perf_counter()
+
+    async def one(user_id):
+        context = SimpleNamespace(user_data={'language': 'en'})
+        await handler_module.handle_schedule_request(FakeQuery(user_id), 'D', date_str, user_id, context)
+        return time.perf_counter() - arrived
+
+    return await asyncio.gather(*(one(i) for i in range(CONCURRENCY)))
+
+
+def main() -> None:
+    server = StubFeedServer().start()
+    os.environ.setdefault("BOT_TOKEN", "bench")
+    os.environ["API_DOM_URL"] = server.dom_url
+    os.environ["API_INTER_URL"] = server.inter_url
+    logging.disable(logging.WARNING)
+
+    import flight_handler
+    from flight_bot import FlightScheduleBot
+
+    class BlockingFlightScheduleBot(FlightScheduleBot):
+        """The previous behaviour: a fresh blocking request per call on the event loop"""
+
+        async def _fetch_feed(self, url, departure, state=None):
+            with urllib.request.urlopen(url, timeout=30) as response:
+                return self._normalize_flights(json.loads(response.read())["data"], departure)
+
+    async def measure(bot):
+        flight_handler.flight_bot = bot
+        await run_round(flight_handler)  # warm-up: opens pooled connections
+        bot.feed_cache.clear()  # measure the cold fetch path, not cache hits
+        samples = await run_round(flight_handler)
+        if hasattr(bot, "aclose"):
+            await bot.aclose()
+        return samples
+
+    results = {
+        "blocking": asyncio.run(measure(BlockingFlightScheduleBot())),
+        "async pooled": asyncio.run(measure(FlightScheduleBot())),
+    }
+    print(f"{CONCURRENCY} concurrent /schedule callbacks, stub latency {server.latency * 1000:.0f} ms")
+    for name, samples in results.items():
+        print(f"  {name:<13} p50={percentile(samples, 50) * 1000:8.1f} ms  "
+              f"p99={percentile(samples, 99) * 1000:8.1f} ms  mean={statistics.mean(samples) * 1000:8.1f} ms")
+    server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
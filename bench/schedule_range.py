@@ -0,0 +1,103 @@
+"""Date-range and time-window schedule queries: scanning every row vs bisecting date partitions
+
+A synthetic 10k-flight feed over three days. "Before" is the old
+approach: scan every flight for the date in its schedule string, then
+compare the time. "After" is FlightStore.flights_in_range, which bisects
+each date partition's time index.
+
+It then simulates 30 day rollovers of a feed that keeps old days in it, and
+counts the date partitions and cached schedule dates left behind, with and
+without eviction.
+
+Run from the repository root:  python -m bench.schedule_range [flights] [seconds per case]
+"""
+import sys
+import time
+from datetime import datetime, time as Time, timedelta
+
+from flight_store import FlightStore
+from models import Flight
+from rendering import SchedulePages
+
+
+def synthetic_feed(size: int, first: datetime, days: int, prefix: str = "f"):
+    step = days * 24 * 3600 / size
+    flights = []
+    for i in range(size):
+        at = first + timedelta(seconds=int(i * step))
+        flights.append(Flight.from_raw({
+            "id": f"{prefix}{i}", "operator": "Garuda Indonesia", "schedule": at.strftime('%Y-%m-%d %H:%M'),
+            "estimate": at.strftime('%H:%M'), "flightno": f"GA{100 + i}", "gatenumber": str(1 + i % 30),
+            "flightstat": "On Time", "fromtolocation": "Jakarta",
+        }, "D"))
+    return flights
+
+
+def old_range(flights, dates, start, end):
+    found = []
+    for date_str in dates:
+        for flight in flights:
+            if str(date_str) in str(flight.schedule):
+                clock = str(flight.schedule)[11:16]
+                if start <= clock <= end:
+                    found.append(flight)
+    return found
+
+
+def timed(query, seconds):
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        query()
+        count += 1
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def rollover(past_days: int, days: int = 30):
+    first = datetime(2026, 1, 1)
+    today = first
+    store = FlightStore(past_days=past_days, clock=lambda: today)
+    pages = SchedulePages()
+    flights = []
+    for day in range(days):
+        today = first + timedelta(days=day)
+        # The feed adds the day after tomorrow and never drops old rows
+        flights = flights + synthetic_feed(300, today + timedelta(days=2), 1, prefix=f"d{day}-")
+        store.sync("D", flights)
+        for offset in range(3):
+            pages.page(store, (today + timedelta(days=offset)).strftime('%Y-%m-%d'), "D", "en")
+    return len(store.dates()), len(pages._dates), len(store)
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    flights = synthetic_feed(size, today, 3)
+    store = FlightStore()
+    store.sync("D", flights)
+    dates = [(today + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(3)]
+
+    print(f"{size} flights over 3 days; microseconds per query ({seconds:.1f}s per case)")
+    cases = (
+        ("today, 14:00-18:00", dates[:1], Time(14, 0), Time(18, 0)),
+        ("next 3 days, 14:00-18:00", dates, Time(14, 0), Time(18, 0)),
+        ("next 3 days, whole day", dates, Time(0, 0), Time(23, 59)),
+        ("tomorrow, 07:00-07:30", dates[1:2], Time(7, 0), Time(7, 30)),
+    )
+    for name, days, start, end in cases:
+        before = old_range(flights, days, start.strftime('%H:%M'), end.strftime('%H:%M'))
+        after = store.flights_in_range(days[0], len(days), start, end)
+        assert [flight.id for flight in before] == [flight.id for flight in after], name
+        old_us = timed(lambda: old_range(flights, days, start.strftime('%H:%M'), end.strftime('%H:%M')), seconds)
+        new_us = timed(lambda: store.flights_in_range(days[0], len(days), start, end), seconds)
+        print(f"  {name:<26} {len(after):>5} flights  scan={old_us:10.1f} us  bisect={new_us:8.1f} us "
+              f"({old_us / new_us:.0f}x)")
+
+    print("30 day rollovers, feed keeping every past day (partitions, cached schedule dates, rows):")
+    for label, past_days in (("without eviction", 365), ("SCHEDULE_PAST_DAYS=1", 1)):
+        print(f"  {label:<21} {rollover(past_days)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Flight-number lookup: full scan with an exact match vs the prefix trie search index
+
+Builds a synthetic 10k-flight snapshot over several carriers and times the
+lookup /flight used to do (scan every row for an exact, case-insensitive
+flight number on today's date) against FlightStore's index for exact,
+differently typed ("ga 0410", "GIA410"), prefix and one-typo queries.
+
+Run from the repository root:  python -m bench.search [flights] [seconds per case]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+
+from flight_store import FlightStore
+from models import Flight
+
+CARRIERS = ("GA", "QG", "JT", "ID", "QZ", "IU", "IW", "SJ", "8B", "SQ")
+
+
+def synthetic_feed(size: int, date: str, seed: int = 1):
+    rng = random.Random(seed)
+    numbers = rng.sample([(carrier, number) for carrier in CARRIERS for number in range(1, 10000)], size)
+    return [
+        Flight.from_raw({
+            "id": f"f{i}", "operator": carrier, "schedule": f"{date} {(i // 12) % 24:02d}:{(i * 5) % 60:02d}",
+            "estimate": "", "flightno": f"{carrier}{number}", "gatenumber": str(1 + i % 30),
+            "flightstat": "On Time", "fromtolocation": "Jakarta",
+        }, "D" if i % 3 else "I")
+        for i, (carrier, number) in enumerate(numbers)
+    ]
+
+
+def old_lookup(flights, flight_code, date):
+    wanted = flight_code.upper()
+    for flight in flights:
+        if str(flight.flightno).upper() == wanted and date in str(flight.schedule):
+            return flight
+    return None
+
+
+def timed(lookup, queries, seconds):
+    count = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        for query in queries:
+            lookup(query)
+        count += len(queries)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    date = datetime.now().strftime('%Y-%m-%d')
+    flights = synthetic_feed(size, date)
+    store = FlightStore()
+    started = time.perf_counter()
+    store.sync("D", [flight for flight in flights if flight.departure == "D"])
+    store.sync("I", [flight for flight in flights if flight.departure == "I"])
+    build_ms = (time.perf_counter() - started) * 1000
+
+    rng = random.Random(2)
+    sample = rng.sample(flights, 200)
+    exact = [flight.flightno for flight in sample]
+    typed = [f"{flight.flightno[:2].lower()} 0{flight.flightno[2:]}" for flight in sample]
+    prefixes = [flight.flightno[:4] for flight in sample]
+    typos = [flight.flightno[:-1] + "X" for flight in sample]  # one substitution, matches no prefix
+
+    for query, flight in zip(typed, sample):
+        assert store.get_by_flight_no(query, date) is not None
+    assert all(store.search(query, date) for query in prefixes)
+
+    print(f"{size} flights, store + index sync {build_ms:.0f} ms, {len(store.search_index)} indexed; "
+          f"microseconds per lookup ({seconds:.1f}s per case)")
+    cases = (
+        ("full scan, exact", lambda query: old_lookup(flights, query, date), exact),
+        ("full scan, typed 'ga 0410'", lambda query: old_lookup(flights, query, date), typed),
+        ("index, exact", lambda query: store.get_by_flight_no(query, date), exact),
+        ("index, typed 'ga 0410'", lambda query: store.get_by_flight_no(query, date), typed),
+        ("index, prefix (top 5)", lambda query: store.search(query, date), prefixes),
+        ("index, typo (top 5)", lambda query: store.search(query, date), typos),
+    )
+    for name, lookup, queries in cases:
+        found = sum(1 for query in queries if lookup(query))
+        print(f"  {name:<27} {timed(lookup, queries, seconds):10.1f} us  found {found}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
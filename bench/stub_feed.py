@@ -0,0 +1,138 @@
+"""Local stand-in for the airport DOM/INTER flight feeds used by the benchmarks"""
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+def make_feed(size: int, prefix: str, date: str = None) -> Dict[str, Any]:
+    date = date or datetime.now().strftime('%Y-%m-%d')
+    rows: List[Dict[str, Any]] = []
+    for i in range(size):
+        hour, minute = (i // 12) % 24, (i * 5) % 60
+        rows.append({
+            "id": f"{prefix}{i}",
+            "operator": "Garuda Indonesia",
+            "schedule": f"{date} {hour:02d}:{minute:02d}",
+            "estimate": f"{hour:02d}:{minute:02d}",
+            "flightno": f"GA{100 + i}",
+            "gatenumber": str(1 + i % 30),
+            "flightstat": "On Time",
+            "fromtolocation": "Jakarta",
+        })
+    return {"data": rows}
+
+
+STATUSES = ("On Time", "Check-in", "Gate Open", "Boarding", "Delayed", "Final Call")
+
+
+class StubFeedServer:
+    """Threaded HTTP server serving /dom and /inter with keep-alive and a fixed delay.
+
+    ``mutate`` changes the status or gate of a share of the rows, like the
+    real feeds do over a day; ``start(mutation_rate=...)`` does so every
+    ``mutation_interval`` seconds and ``on_mutation`` hears about each batch.
+    """
+
+    def __init__(self, dom_size: int = 300, inter_size: int = 150, latency: float = 0.02, etag: bool = False,
+                 seed: int = 1) -> None:
+        self.latency = latency
+        self.etag = etag
+        self.hits = {"dom": 0, "inter": 0}
+        self.not_modified = {"dom": 0, "inter": 0}
+        self.feeds = {"dom": make_feed(dom_size, "d"), "inter": make_feed(inter_size, "i")}
+        self.bodies = {name: json.dumps(feed).encode() for name, feed in self.feeds.items()}
+        self.mutations = 0
+        self.on_mutation = None
+        self._random = random.Random(seed)
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; without this
+                # keep-alive clients stall on delayed ACKs.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                feed = self.path.strip("/")
+                if feed not in server.bodies:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                with server._lock:
+                    server.hits[feed] += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                body = server.bodies[feed]
+                tag = f'"{hashlib.md5(body).hexdigest()}"'
+                if server.etag and self.headers.get("If-None-Match") == tag:
+                    with server._lock:
+                        server.not_modified[feed] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", tag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if server.etag:
+                    self.send_header("ETag", tag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 256
+            daemon_threads = True
+
+        self._httpd = Server(("127.0.0.1", 0), Handler)
+        self.port = self._httpd.server_address[1]
+        self.dom_url = f"http://127.0.0.1:{self.port}/dom"
+        self.inter_url = f"http://127.0.0.1:{self.port}/inter"
+
+    def mutate(self, rate: float) -> List[str]:
+        """Change status or gate on ``rate`` of all rows; returns the changed flight ids"""
+        changed: List[str] = []
+        with self._lock:
+            for name, feed in self.feeds.items():
+                rows = feed["data"]
+                for row in self._random.sample(rows, int(len(rows) * rate)):
+                    if self._random.random() < 0.5:
+                        row["flightstat"] = self._random.choice([s for s in STATUSES if s != row["flightstat"]])
+                    else:
+                        row["gatenumber"] = str(int(row["gatenumber"]) % 30 + 1)
+                    changed.append(row["id"])
+                self.bodies[name] = json.dumps(feed).encode()
+            self.mutations += len(changed)
+        if self.on_mutation is not None:
+            self.on_mutation(changed, time.monotonic())
+        return changed
+
+    def _mutate_forever(self, rate: float, interval: float) -> None:
+        while not self._stopped.wait(interval):
+            self.mutate(rate)
+
+    def start(self, mutation_rate: float = 0.0, mutation_interval: float = 1.0) -> "StubFeedServer":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        if mutation_rate:
+            threading.Thread(target=self._mutate_forever, args=(mutation_rate, mutation_interval), daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
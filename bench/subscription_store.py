@@ -0,0 +1,57 @@
+"""Warm-restart time of the SQLite subscription store
+
+Save N subscriptions spread over N/20 flights, then time a fresh
+SubscriptionStore + SubscriptionRegistry.restore, as at bot startup.
+Crash recovery is covered by tests/test_subscription_store.py.
+
+Run from the repository root:  python -m bench.subscription_store [subscriptions]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from models import Flight
+from subscription_store import SubscriptionStore
+from subscriptions import SubscriptionRegistry
+
+
+def populate(path, count):
+    store = SubscriptionStore(path)
+    registry = SubscriptionRegistry(store)
+    for user_id in range(count):
+        flight_no = f"GA{user_id % (count // 20 or 1)}"
+        flight = Flight(flight_no, "Garuda", "2026-10-18 10:00", "10:00", flight_no, "3", "On Time", "Jakarta", "D")
+        subscription = registry.subscribe(user_id, flight, "en")
+        subscription.last_message_id = user_id
+        registry.save_subscription(user_id, subscription)
+    store.close()
+
+
+def measure_startup(count):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "subscriptions.db")
+        started = time.perf_counter()
+        populate(path, count)
+        print(f"  wrote {count} subscriptions in {time.perf_counter() - started:.2f} s "
+              f"({os.path.getsize(path) / 1024 / 1024:.1f} MiB)")
+        started = time.perf_counter()
+        store = SubscriptionStore(path)
+        registry = SubscriptionRegistry()
+        restored = registry.restore(store)
+        messages = store.load_messages()
+        elapsed = time.perf_counter() - started
+        store.close()
+        assert restored == count, restored
+        print(f"  restart: {restored} subscriptions on {len(registry)} flights, "
+              f"{len(messages)} message ids in {elapsed * 1000:.0f} ms")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("warm restart")
+    measure_startup(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,5 +6,34 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 API_DOM_URL = os.getenv("API_DOM_URL")
 API_INTER_URL = os.getenv("API_INTER_URL")
 MONITOR_INTERVAL_SECONDS = int(os.getenv("MONITOR_INTERVAL_SECONDS", "10"))
+POLL_MIN_SECONDS = float(os.getenv("POLL_MIN_SECONDS", str(MONITOR_INTERVAL_SECONDS)))
+POLL_MAX_SECONDS = float(os.getenv("POLL_MAX_SECONDS", "900"))
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "true").lower() in ("1", "true", "yes")
+FEED_CACHE_TTL_SECONDS = float(os.getenv("FEED_CACHE_TTL_SECONDS", "5"))
+SCHEDULE_PAGE_SIZE = int(os.getenv("SCHEDULE_PAGE_SIZE", "20"))
+SCHEDULE_RANGE_DAYS = int(os.getenv("SCHEDULE_RANGE_DAYS", "3"))
+SCHEDULE_MAX_RANGE_DAYS = max(SCHEDULE_RANGE_DAYS, int(os.getenv("SCHEDULE_MAX_RANGE_DAYS", "7")))
+SCHEDULE_PAST_DAYS = int(os.getenv("SCHEDULE_PAST_DAYS", "1"))
+NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY", "16"))
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+SUBSCRIPTION_DB_PATH = os.getenv("SUBSCRIPTION_DB_PATH", "subscriptions.db")
+HEALTH_MAX_TICK_AGE_SECONDS = float(os.getenv("HEALTH_MAX_TICK_AGE_SECONDS", str(max(60, 3 * MONITOR_INTERVAL_SECONDS))))
+HEALTH_MAX_FEED_AGE_SECONDS = float(os.getenv("HEALTH_MAX_FEED_AGE_SECONDS", "600"))
+HEALTH_MAX_LOOP_LAG_SECONDS = float(os.getenv("HEALTH_MAX_LOOP_LAG_SECONDS", "5"))
+PROFILING = os.getenv("PROFILING", "false").lower() in ("1", "true", "yes")
+PROFILE_SLOW_SECONDS = float(os.getenv("PROFILE_SLOW_SECONDS", "0.25"))
+HEALTH_PORT = int(os.getenv("HEALTH_PORT", "8000"))
+ADMIN_HOST = os.getenv("ADMIN_HOST", "127.0.0.1")
+ADMIN_PORT = int(os.getenv("ADMIN_PORT", "8001"))
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "8"))
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "32"))
+SINGLE_LOOP = os.getenv("SINGLE_LOOP", "false").lower() in ("1", "true", "yes")
+USE_UVLOOP = os.getenv("USE_UVLOOP", "false").lower() in ("1", "true", "yes")
+SEARCH_SUGGESTIONS = int(os.getenv("SEARCH_SUGGESTIONS", "5"))
+INLINE_RESULTS = int(os.getenv("INLINE_RESULTS", "10"))
+INLINE_CACHE_SECONDS = int(os.getenv("INLINE_CACHE_SECONDS", "10"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
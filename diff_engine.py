@@ -0,0 +1,83 @@
+import logging
+from typing import Any, Iterable, List, Mapping, Optional, Tuple
+from models import Flight
+
+logger = logging.getLogger(__name__)
+
+# A flight reduced to the fields change detection cares about:
+# (status key, schedule, estimate, gate, status as displayed). The status key
+# is trimmed and lower-cased so a change of case alone is not reported.
+FlightRow = Tuple[Optional[str], Optional[str], Optional[str], Optional[str], Any]
+
+TRACKED_FIELDS = ("status", "schedule", "estimate", "gate")
+
+def _clean(value: Any) -> Optional[str]:
+    return None if value is None else str(value).strip()
+
+def make_row(status: Any, schedule: Any, estimate: Any, gate: Any) -> FlightRow:
+    status_text = _clean(status)
+    return (status_text.lower() if status_text is not None else None, _clean(schedule), _clean(estimate), _clean(gate), status)
+
+def flight_row(flight: Flight) -> FlightRow:
+    return make_row(flight.flightstat, flight.schedule, flight.estimate, flight.gatenumber)
+
+class FieldChange:
+    __slots__ = ("field", "old", "new")
+
+    def __init__(self, field: str, old: Any, new: Any) -> None:
+        self.field = field
+        self.old = old
+        self.new = new
+
+    def describe(self) -> str:
+        if self.field == "gate":
+            return f"Gate: {self.old or 'N/A'} → {self.new or 'N/A'}"
+        return f"{self.field.capitalize()}: {self.old} → {self.new}"
+
+    def __repr__(self) -> str:
+        return f"FieldChange({self.field!r}, {self.old!r}, {self.new!r})"
+
+class ChangeEvent:
+    """All tracked fields that changed for one flight between two snapshots"""
+
+    __slots__ = ("flight_id", "changes", "row")
+
+    def __init__(self, flight_id: str, changes: List[FieldChange], row: FlightRow) -> None:
+        self.flight_id = flight_id
+        self.changes = changes
+        self.row = row
+
+    @property
+    def fields(self) -> List[str]:
+        return [change.field for change in self.changes]
+
+    def describe(self) -> List[str]:
+        return [change.describe() for change in self.changes]
+
+    def __repr__(self) -> str:
+        return f"ChangeEvent({self.flight_id!r}, {self.changes!r})"
+
+def snapshot_rows(flights: Iterable[Flight]) -> dict:
+    """Row form of a whole feed snapshot, keyed by flight id"""
+    return {str(flight.id): flight_row(flight) for flight in flights}
+
+def diff_snapshots(previous: Mapping[str, FlightRow], current: Mapping[str, FlightRow]) -> List[ChangeEvent]:
+    """Changed rows and fields between two snapshots, in one pass.
+
+    Rows are compared as whole tuples first, so unchanged flights cost one
+    comparison; only rows that differ are broken down field by field.
+    Flights present in just one of the snapshots produce no event.
+    """
+    events: List[ChangeEvent] = []
+    for flight_id, new in current.items():
+        old = previous.get(flight_id)
+        if old is None or old is new or old == new:
+            continue
+        changes = [
+            FieldChange(field, old[4] if field == "status" else a, new[4] if field == "status" else b)
+            for field, a, b in zip(TRACKED_FIELDS, old, new)
+            if a != b
+        ]
+        if changes:
+            events.append(ChangeEvent(flight_id, changes, new))
+    return events
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+from telegram.error import RetryAfter
+from config import NOTIFY_CONCURRENCY, TELEGRAM_CHAT_RATE, TELEGRAM_GLOBAL_RATE
+from metrics import NOTIFICATION_SEND_SECONDS, TELEGRAM_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# A queued notification: receives a rate-limited stand-in for the Bot
+Job = Callable[[Any], Awaitable[Any]]
+
+class TokenBucket:
+    """Classic token bucket; ``reserve`` hands out tokens on credit.
+
+    Callers that find the bucket empty still take a token and are told how
+    long to wait for it, so concurrent waiters are served in arrival order
+    without a lock. ``pause`` also holds back callers that reserved a token
+    before it was called: ``acquire`` does not return before the pause ends.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take one token; returns the seconds to wait before it may be used"""
+        self._refill()
+        self.tokens -= 1
+        delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(delay, self.paused_until - self.updated)
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            # A pause that started while this caller slept holds it too
+            delay = self.paused_until - self.clock()
+
+    def pause(self, seconds: float) -> None:
+        """Hand out nothing for ``seconds`` (e.g. after a 429), not even tokens already reserved"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+        self.paused_until = max(self.paused_until, self.updated + seconds)
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+class _ChatBot:
+    """Bot stand-in bound to one chat: every API call goes through the dispatcher's limits"""
+
+    __slots__ = ("_dispatcher", "_chat_id")
+
+    def __init__(self, dispatcher: "NotificationDispatcher", chat_id: Any) -> None:
+        self._dispatcher = dispatcher
+        self._chat_id = chat_id
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        method = getattr(self._dispatcher.bot, name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._dispatcher.call(self._chat_id, method, *args, **kwargs)
+
+        return call
+
+def _retry_seconds(error: RetryAfter) -> float:
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+class NotificationDispatcher:
+    """Sends notifications concurrently within Telegram's rate limits.
+
+    Jobs for one chat run one after another in submission order, so a
+    delete-previous-then-send pair never interleaves with the next
+    notification for the same chat; different chats proceed in parallel, at
+    most ``concurrency`` at a time. Every API call takes a token from the
+    global bucket and from the chat's bucket. A RetryAfter pauses the global
+    bucket for the requested time and the call is retried.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, bot: Any, concurrency: int = NOTIFY_CONCURRENCY, global_rate: float = TELEGRAM_GLOBAL_RATE,
+                 chat_rate: float = TELEGRAM_CHAT_RATE, chat_burst: float = 2, max_retries: int = 3) -> None:
+        self.bot = bot
+        self.concurrency = concurrency
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.global_bucket = TokenBucket(global_rate)
+        # Least recently used first, so idle buckets are found at the front
+        self._chat_buckets: "OrderedDict[Any, TokenBucket]" = OrderedDict()
+        self._queues: Dict[Any, Deque[Job]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "api_calls": 0, "retry_after": 0}
+
+    def submit(self, chat_id: Any, job: Job) -> None:
+        """Queue ``job`` behind anything already pending for ``chat_id``"""
+        self._stats["submitted"] += 1
+        queue = self._queues.get(chat_id)
+        if queue is not None:
+            queue.append(job)
+            return
+        queue = self._queues[chat_id] = deque([job])
+        task = asyncio.get_running_loop().create_task(self._drain(chat_id, queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drain(self, chat_id: Any, queue: Deque[Job]) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            while queue:
+                async with self._semaphore:
+                    started = time.perf_counter()
+                    try:
+                        await queue[0](_ChatBot(self, chat_id))
+                        self._stats["completed"] += 1
+                        NOTIFICATION_SEND_SECONDS.observe(time.perf_counter() - started)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self._stats["failed"] += 1
+                        logger.error(f"Notification to chat {chat_id} failed: {e}")
+                queue.popleft()
+        finally:
+            del self._queues[chat_id]
+            self._evict_idle_buckets()
+
+    def _evict_idle_buckets(self) -> None:
+        """Forget chat buckets that have refilled; a new one starts just as full.
+
+        Every chat bucket has the same rate and capacity, so they refill in
+        the order they were last used and the scan stops at the first busy one.
+        """
+        buckets = self._chat_buckets
+        while buckets:
+            chat_id = next(iter(buckets))
+            if not buckets[chat_id].idle:
+                return
+            del buckets[chat_id]
+
+    async def call(self, chat_id: Any, method: Callable[..., Awaitable[Any]], /, *args: Any, **kwargs: Any) -> Any:
+        """Invoke one Bot API method under the global and per-chat limits"""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            await self.global_bucket.acquire()
+            self._stats["api_calls"] += 1
+            try:
+                return await method(*args, **kwargs)
+            except RetryAfter as e:
+                self._stats["retry_after"] += 1
+                TELEGRAM_ERRORS.labels(getattr(method, "__name__", "unknown"), "RetryAfter").inc()
+                attempt += 1
+                delay = _retry_seconds(e)
+                if attempt > self.max_retries:
+                    raise
+                logger.warning(f"Telegram flood control for chat {chat_id}: retrying in {delay:g}s (attempt {attempt})")
+                self.global_bucket.pause(delay)
+            except Exception as e:
+                TELEGRAM_ERRORS.labels(getattr(method, "__name__", "unknown"), type(e).__name__).inc()
+                raise
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats, pending=self.pending, chats=len(self._queues))
+
+    async def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait for everything queued so far; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._tasks:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            _, pending = await asyncio.wait(set(self._tasks), timeout=remaining)
+            if pending and remaining is not None and time.monotonic() >= deadline:
+                return False
+        return True
@@ -0,0 +1,140 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator, List
+
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",]}"
+
+class FeedArrayParser:
+    """Incremental parser for feed documents shaped like {"data": [{...}, ...], ...}.
+
+    Text is fed in arbitrary pieces and each element of the ``key`` array is
+    returned as soon as it is complete, so a caller never holds the whole
+    decoded document and can stop as soon as it has what it needs. Other
+    top-level keys are parsed and discarded.
+    """
+
+    def __init__(self, key: str = "data") -> None:
+        self.key = key
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._current_key = None
+
+    def feed(self, text: str) -> List[Any]:
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        self._buf += text
+        items: List[Any] = []
+        self._parse(items, final=False)
+        return items
+
+    def close(self) -> List[Any]:
+        """Parse whatever is left; raises ValueError if the document is incomplete"""
+        items: List[Any] = []
+        self._parse(items, final=True)
+        if self._state != "done":
+            raise ValueError(f"Truncated feed document (parser state {self._state!r})")
+        return items
+
+    def _skip_whitespace(self) -> None:
+        buf, pos, end = self._buf, self._pos, len(self._buf)
+        while pos < end and buf[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+
+    def _decode(self, final: bool) -> Any:
+        """Decode the value at the cursor; raises IndexError when more input is needed"""
+        try:
+            value, end = self._decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            raise IndexError
+        # A bare number or literal is only complete once a delimiter follows it:
+        # "-3." or "2.5e" decode as -3 and 2.5 but may continue in the next chunk
+        if self._buf[self._pos] not in '{["':
+            if end == len(self._buf):
+                if not final:
+                    raise IndexError
+            elif self._buf[end] not in _DELIMITERS:
+                if final:
+                    raise ValueError(f"Invalid value at offset {self._pos} of feed document")
+                raise IndexError
+        self._pos = end
+        return value
+
+    def _parse(self, items: List[Any], final: bool) -> None:
+        buf = self._buf
+        while True:
+            self._skip_whitespace()
+            if self._pos >= len(buf):
+                return
+            char = buf[self._pos]
+            state = self._state
+            try:
+                if state == "start":
+                    if char != "{":
+                        raise ValueError("Feed document is not a JSON object")
+                    self._pos += 1
+                    self._state = "key"
+                elif state == "key":
+                    if char == "}":
+                        self._pos += 1
+                        self._state = "done"
+                    elif char == ",":
+                        self._pos += 1
+                    else:
+                        self._current_key = self._decode(final)
+                        self._state = "colon"
+                elif state == "colon":
+                    if char != ":":
+                        raise ValueError("Expected ':' in feed document")
+                    self._pos += 1
+                    self._state = "value"
+                elif state == "value":
+                    if self._current_key == self.key and char == "[":
+                        self._pos += 1
+                        self._state = "items"
+                    else:
+                        self._decode(final)
+                        self._state = "key"
+                elif state == "items":
+                    if char == "]":
+                        self._pos += 1
+                        self._state = "key"
+                    elif char == ",":
+                        self._pos += 1
+                    else:
+                        items.append(self._decode(final))
+                else:
+                    raise ValueError("Trailing data after feed document")
+            except IndexError:
+                return
+
+class FeedRecordReader:
+    """FeedArrayParser over UTF-8 bytes, for a body read one chunk at a time"""
+
+    def __init__(self, key: str = "data") -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._parser = FeedArrayParser(key)
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        return self._parser.feed(self._decoder.decode(chunk))
+
+    def close(self) -> List[Any]:
+        """Parse whatever is left; raises ValueError if the document is incomplete"""
+        return self._parser.feed(self._decoder.decode(b"", final=True)) + self._parser.close()
+
+def iter_feed_records(chunks: Iterable[bytes], key: str = "data") -> Iterator[Any]:
+    reader = FeedRecordReader(key)
+    for chunk in chunks:
+        yield from reader.feed(chunk)
+    yield from reader.close()
+
+def iter_chunks(body: bytes, size: int = 64 * 1024) -> Iterator[bytes]:
+    view = memoryview(body)
+    for start in range(0, len(body), size):
+        yield bytes(view[start:start + size])
@@ -1,75 +1,372 @@
+import asyncio
+import concurrent.futures
+import hashlib
 import logging
-from typing import Any, Dict, List, Optional
-import requests
-from config import API_DOM_URL, API_INTER_URL
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+import httpx
+from config import API_DOM_URL, API_INTER_URL, FEED_CACHE_TTL_SECONDS, SEARCH_SUGGESTIONS
+from feed_stream import FeedRecordReader
+from flight_store import FlightStore, normalize_flight_no, schedule_date
+from health_state import health_state
+from metrics import UPSTREAM_FETCH_SECONDS
+from models import Flight
 
 logger = logging.getLogger(__name__)
-class FlightScheduleBot:
+
+HTTP_TIMEOUT_SECONDS = 30
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+FEED_CHUNK_BYTES = 64 * 1024
+
+T = TypeVar("T")
+
+NOT_MODIFIED = object()  # _fetch_feed result when the feed has not changed since the last load
+
+class _FeedState:
+    """What we remember about the last successful load of one feed URL"""
+
+    __slots__ = ("etag", "last_modified", "digest", "flights", "pending")
+
     def __init__(self) -> None:
-        pass
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.digest: Optional[bytes] = None
+        self.flights: Optional[List[Flight]] = None
+        # Validators of a downloaded body, adopted once it parses
+        self.pending: Tuple[Optional[str], Optional[str], Optional[bytes]] = (None, None, None)
+
+class _CacheEntry(Generic[T]):
+    __slots__ = ("value", "fetched_at", "expires_at")
+
+    def __init__(self, value: T, fetched_at: float, expires_at: float) -> None:
+        self.value = value
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+class FeedCache(Generic[T]):
+    """TTL cache with stale-while-revalidate and coalesced upstream loads.
+
+    A fresh entry is returned as is. An expired entry is still returned while
+    a single background refresh runs. Concurrent misses share one load. The
+    in-flight load is a concurrent.futures.Future so that callers on other
+    event loops (the bot runs several) can await it too.
+    """
+
+    def __init__(self, loader: Callable[[str], Awaitable[Optional[T]]], ttl: float) -> None:
+        self._loader = loader
+        self.ttl = ttl
+        self._entries: Dict[str, _CacheEntry[T]] = {}
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    async def get(self, key: str, allow_stale: bool = True) -> Optional[T]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at:
+                self.hits += 1
+                return entry.value
+            future = self._inflight.get(key)
+            if entry is not None and allow_stale:
+                self.stale_hits += 1
+                if future is None:
+                    self._start_refresh(key)
+                return entry.value
+            self.misses += 1
+            if future is None:
+                future = self._start_refresh(key)
+            else:
+                self.coalesced += 1
+        return await asyncio.wrap_future(future)
 
-    def _fetch_api(self, url: str) -> Optional[Dict[str, Any]]:
+    def peek(self, key: str) -> Optional[T]:
+        """The cached value, fresh or expired, without waiting on upstream.
+
+        A missing or expired entry starts a background load (unless one is
+        already running) so that later callers find it fresh.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at:
+                self.hits += 1
+                return entry.value
+            if key not in self._inflight:
+                self._start_refresh(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.stale_hits += 1
+            return entry.value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def age(self, key: str) -> Optional[float]:
+        """Seconds since the last successful load of ``key``, if any"""
+        entry = self._entries.get(key)
+        return None if entry is None else time.monotonic() - entry.fetched_at
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+            }
+
+    def _start_refresh(self, key: str) -> concurrent.futures.Future:
+        # Caller holds self._lock
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._inflight[key] = future
+        self.refreshes += 1
+        task = asyncio.get_running_loop().create_task(self._refresh(key, future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return future
+
+    async def _refresh(self, key: str, future: concurrent.futures.Future) -> None:
+        value: Optional[T] = None
         try:
-            response = requests.get(url, timeout=30)
-            if response.status_code == 200:
-                return response.json()
-            logger.warning(f"API returned non-200 status {response.status_code} for {url}")
-            return None
-        except requests.RequestException as exc:
+            value = await self._loader(key)
+        except asyncio.CancelledError:
+            logger.info(f"Feed cache refresh cancelled for {key}")
+            raise
+        except Exception as exc:
+            logger.error(f"Feed cache refresh failed for {key}: {exc!r}")
+        finally:
+            self._finish_refresh(key, future, value)
+
+    def _finish_refresh(self, key: str, future: concurrent.futures.Future, value: Optional[T]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if value is not None:
+                self._entries[key] = _CacheEntry(value, now, now + self.ttl)
+            else:
+                self.refresh_failures += 1
+                if entry is not None:
+                    # Keep serving the last good copy, but do not retry
+                    # upstream more than once per TTL while it is failing.
+                    entry.expires_at = now + self.ttl
+                    value = entry.value
+            del self._inflight[key]
+        future.set_result(value)
+
+class FlightScheduleBot:
+    FEED_URLS = {"D": API_DOM_URL, "I": API_INTER_URL}
+
+    def __init__(self, cache_ttl: float = FEED_CACHE_TTL_SECONDS) -> None:
+        # httpx clients are bound to the loop they were created on, and the
+        # bot runs handlers and the monitor on separate loops, so keep one
+        # pooled client per loop.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self.feed_cache: FeedCache[List[Flight]] = FeedCache(self._load_feed, cache_ttl)
+        self.store = FlightStore()
+        self._feed_states: Dict[str, _FeedState] = {url: _FeedState() for url in self.FEED_URLS.values()}
+        self.fetch_stats = {"downloads": 0, "not_modified": 0, "unchanged_payload": 0, "parsed": 0}
+        # get_flight_info calls waiting on a feed load: (flight no, date, future)
+        self._lookups: List[Tuple[str, str, concurrent.futures.Future]] = []
+        self._lookups_lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS, limits=HTTP_POOL_LIMITS)
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client owned by the running loop"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def _fetch_feed(self, url: str, departure: str, state: Optional[_FeedState] = None) -> Any:
+        """Download a feed and turn it into Flight rows as the body arrives.
+
+        Each chunk is parsed on a worker thread, so the whole body is never
+        held and the loop keeps answering (inline queries in particular)
+        during a 10k-row load. Lookups waiting on the load are answered as
+        soon as their flight has been parsed.
+
+        With ``state`` (and a previous load to fall back on) the request is
+        conditional on the stored ETag/Last-Modified, and a 200 whose body
+        hashes the same as last time is dropped; both return NOT_MODIFIED.
+        Returns None on failure.
+        """
+        conditional = state is not None and state.flights is not None
+        headers = {}
+        if conditional:
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+        try:
+            async with self._get_client().stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and conditional:
+                    self.fetch_stats["not_modified"] += 1
+                    return NOT_MODIFIED
+                if response.status_code != 200:
+                    logger.warning(f"API returned non-200 status {response.status_code} for {url}")
+                    return None
+                self.fetch_stats["downloads"] += 1
+                digest = hashlib.blake2b(digest_size=16)
+                reader = FeedRecordReader()
+                flights: List[Flight] = []
+                async for chunk in response.aiter_bytes(FEED_CHUNK_BYTES):
+                    digest.update(chunk)
+                    parsed = await asyncio.to_thread(self._parse_chunk, reader, chunk, departure)
+                    flights.extend(parsed)
+                    self._answer_lookups(parsed)
+                parsed = self._normalize_flights(reader.close(), departure)
+                flights.extend(parsed)
+                self._answer_lookups(parsed)
+                if conditional and digest.digest() == state.digest:
+                    self.fetch_stats["unchanged_payload"] += 1
+                    return NOT_MODIFIED
+                if state is not None:
+                    state.pending = (response.headers.get("ETag"), response.headers.get("Last-Modified"), digest.digest())
+                return flights
+        except httpx.HTTPError as exc:
             logger.error(f"API request failed for {url}: {exc}")
             return None
+        except ValueError as exc:
+            logger.error(f"Could not parse feed from {url}: {exc}")
+            return None
+
+    def _normalize_flights(self, records: Iterable[Any], departure: str) -> List[Flight]:
+        return [Flight.from_raw(raw, departure) for raw in records if isinstance(raw, dict)]
+
+    def _parse_chunk(self, reader: FeedRecordReader, chunk: bytes, departure: str) -> List[Flight]:
+        return self._normalize_flights(reader.feed(chunk), departure)
+
+    def _answer_lookups(self, flights: List[Flight]) -> None:
+        """Resolve the get_flight_info calls whose flight is among ``flights``"""
+        if not self._lookups or not flights:
+            return
+        with self._lookups_lock:
+            for flight_no, date, future in self._lookups:
+                if future.done():
+                    continue
+                for flight in flights:
+                    if (normalize_flight_no(flight.flightno) == flight_no
+                            and (flight.date or schedule_date(flight.schedule)) == date):
+                        future.set_result(flight)
+                        break
+
+    async def _load_feed(self, departure: str) -> Optional[List[Flight]]:
+        url = self.FEED_URLS[departure]
+        state = self._feed_states[url]
+        started = time.perf_counter()
+        flights = await self._fetch_feed(url, departure, state)
+        result = "not_modified" if flights is NOT_MODIFIED else "error" if flights is None else "ok"
+        UPSTREAM_FETCH_SECONDS.labels(departure, result).observe(time.perf_counter() - started)
+        if flights is NOT_MODIFIED:
+            health_state.record_feed(departure, ok=True)
+            # Same list object as before, so the store and the monitor's
+            # diff see nothing to do either
+            return state.flights
+        if flights is None:
+            health_state.record_feed(departure, ok=False)
+            return None
+        health_state.record_feed(departure, ok=True)
+        self.fetch_stats["parsed"] += 1
+        state.etag, state.last_modified, state.digest = state.pending
+        state.flights = flights
+        return flights
 
-    def _normalize_flights(self, data: Optional[Dict[str, Any]], departure: str) -> List[Dict[str, Any]]:
-        if not data:
-            return []
-        flights = data.get("data", [])
-        normalized: List[Dict[str, Any]] = []
-        for raw in flights:
-            if not isinstance(raw, dict):
+    async def _refresh_store(self, allow_stale: bool = True) -> FlightStore:
+        """Get DOM and INTER concurrently and sync any new snapshot into the store.
+
+        A failed feed leaves its previously indexed flights (if any) in place.
+        """
+        results = await asyncio.gather(
+            *(self.feed_cache.get(departure, allow_stale) for departure in self.FEED_URLS),
+            return_exceptions=True,
+        )
+        for departure, result in zip(self.FEED_URLS, results):
+            if isinstance(result, BaseException):
+                logger.error(f"API request failed for {self.FEED_URLS[departure]}: {result!r}")
                 continue
-            item = {
-                "id": raw.get("id"),
-                "operator": raw.get("operator"),
-                "schedule": raw.get("schedule"),
-                "estimate": raw.get("estimate"),
-                "flightno": raw.get("flightno"),
-                "gatenumber": raw.get("gatenumber"),
-                "flightstat": raw.get("flightstat"),
-                "fromtolocation": raw.get("fromtolocation"),
-                "departure": departure,
-            }
-            normalized.append(item)
-        return normalized
-
-    def _get_all_flights_for_date(self, date: str) -> List[Dict[str, Any]]:
-        dom = self._fetch_api(API_DOM_URL)
-        inter = self._fetch_api(API_INTER_URL)
-        dom_list = self._normalize_flights(dom, "D")
-        inter_list = self._normalize_flights(inter, "I")
-        all_flights = dom_list + inter_list
-        # Filter by date if schedule contains date string
-        filtered = [f for f in all_flights if f.get("schedule") and str(date) in str(f.get("schedule"))]
-        # Sort by schedule text when possible
+            if result is not None:
+                self.store.sync(departure, result)
+        return self.store
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {**self.feed_cache.stats(), **self.fetch_stats}
+
+    async def get_store(self) -> FlightStore:
+        """The flight store, refreshed if the cached feeds have expired"""
+        return await self._refresh_store()
+
+    def peek_store(self) -> FlightStore:
+        """The flight store as it is, without waiting on upstream or on indexing.
+
+        For latency-bound paths such as inline queries: expired feeds are
+        refreshed in the background, and a newer cached snapshot is synced
+        into the store on a worker thread; either shows up on a later call.
+        The worker builds the new indexes beside the current ones and swaps
+        them in whole, so reads on the loop meanwhile are never torn.
+        """
+        for departure in self.FEED_URLS:
+            flights = self.feed_cache.peek(departure)
+            if flights is not None and not self.store.has_snapshot(departure, flights):
+                asyncio.get_running_loop().run_in_executor(None, self.store.sync, departure, flights)
+        return self.store
+
+    async def get_flights_by_date(self, date: str) -> List[Flight]:
+        return (await self._refresh_store()).flights_on(date)
+
+    async def get_flight_info(self, flight_code: str, date: str) -> Optional[Flight]:
+        """The flight with this number on ``date``.
+
+        While a feed has never been loaded, the lookup does not wait for the
+        whole download: the first exact match the load parses answers it,
+        and the load carries on into the store in the background.
+        """
+        if all(self.feed_cache.age(departure) is not None for departure in self.FEED_URLS):
+            return (await self._refresh_store()).get_by_flight_no(flight_code, date)
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        lookup = (normalize_flight_no(flight_code), str(date), future)
+        with self._lookups_lock:
+            self._lookups.append(lookup)
+        refresh = asyncio.ensure_future(self._refresh_store())
+        self._tasks.add(refresh)
+        refresh.add_done_callback(self._tasks.discard)
         try:
-            filtered.sort(key=lambda x: str(x.get("schedule")))
-        except Exception:
-            pass
-        return filtered
-
-    def get_flights_by_date(self, date: str) -> List[Dict[str, Any]]:
-        return self._get_all_flights_for_date(date)
-
-    def get_flight_info(self, flight_code: str, date: str) -> Optional[Dict[str, Any]]:
-        flights = self._get_all_flights_for_date(date)
-        for f in flights:
-            if str(f.get("flightno", "")).upper() == flight_code.upper():
-                return f
-        return None
-
-    def get_flight_info_by_id(self, flight_id: str) -> Optional[Dict[str, Any]]:
-        dom = self._normalize_flights(self._fetch_api(API_DOM_URL), "D")
-        inter = self._normalize_flights(self._fetch_api(API_INTER_URL), "I")
-        for f in dom + inter:
-            if str(f.get("id")) == str(flight_id):
-                return f
-        return None
\ No newline at end of file
+            await asyncio.wait([refresh, asyncio.wrap_future(future)], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            with self._lookups_lock:
+                self._lookups.remove(lookup)
+            future.cancel()
+        if not future.cancelled():
+            return future.result()
+        return refresh.result().get_by_flight_no(flight_code, date)
+
+    async def search_flights(self, query: str, date: Optional[str] = None, departure: Optional[str] = None,
+                             limit: int = SEARCH_SUGGESTIONS) -> List[Flight]:
+        return (await self._refresh_store()).search(query, date, departure, limit)
+
+    async def get_flight_info_by_id(self, flight_id: str) -> Optional[Flight]:
+        return (await self._refresh_store()).get_by_id(flight_id)
+
+    async def get_flight_snapshot(self, allow_stale: bool = True) -> Dict[str, Flight]:
+        """Fetch both feeds once and return every flight keyed by its id"""
+        return (await self._refresh_store(allow_stale)).snapshot_by_id()
@@ -1,23 +1,62 @@
-from datetime import datetime
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from datetime import datetime, time as Time, timedelta
+from telegram import (InlineKeyboardButton, InlineKeyboardMarkup, InlineQueryResultArticle, InlineQueryResultsButton,
+                      InputTextMessageContent, Update)
 from telegram.ext import ContextTypes
 from flight_bot import FlightScheduleBot
+from subscriptions import SubscriptionRegistry
+from dispatcher import NotificationDispatcher
+from subscription_store import SubscriptionStore
+from health_state import health_state
+from profiler import command_profiler, profiled, watch_loop
+from metrics import (ACTIVE_SUBSCRIPTIONS, FEED_CACHE_HIT_RATIO, FEED_CACHE_REQUESTS, MONITOR_TICK_SECONDS,
+                     WATCHED_FLIGHTS)
+from diff_engine import diff_snapshots, flight_row
+from scheduler import FixedPollPolicy, PhasePollPolicy, PollScheduler, is_final_status
 import asyncio
 import logging
+import re
+import time
 import traceback
-from config import MONITOR_INTERVAL_SECONDS
-from language import get_text, get_status_emoji, get_month_names
+from config import (ADAPTIVE_POLLING, INLINE_CACHE_SECONDS, INLINE_RESULTS, MONITOR_INTERVAL_SECONDS,
+                    SCHEDULE_MAX_RANGE_DAYS, SCHEDULE_RANGE_DAYS, SUBSCRIPTION_DB_PATH)
+from language import get_text, get_status_emoji
+from rendering import RenderCache, range_heading, render_cache, render_flight_status, render_range_page, schedule_pages
 
 logger = logging.getLogger(__name__)
 flight_bot = FlightScheduleBot()
 
-monitored_flights = {}
+registry = SubscriptionRegistry()
+poll_scheduler = PollScheduler(PhasePollPolicy() if ADAPTIVE_POLLING else FixedPollPolicy())
 should_exit = False
 user_message_history = {}
+_TIME_WINDOW_RE = re.compile(r"^(\d{1,2})(?::?(\d{2}))?\s*[-–]\s*(\d{1,2})(?::?(\d{2}))?$")
+notification_dispatcher = None
+subscription_store = None
+
+def _feed_cache_hit_ratio():
+    stats = flight_bot.feed_cache.stats()
+    served = stats['hits'] + stats['stale_hits']
+    lookups = served + stats['misses'] + stats['coalesced']
+    return served / lookups if lookups else 0.0
+
+# Read at scrape time, so the hot paths pay nothing for these
+ACTIVE_SUBSCRIPTIONS.set_function(registry.subscription_count)
+WATCHED_FLIGHTS.set_function(lambda: len(registry))
+FEED_CACHE_HIT_RATIO.set_function(_feed_cache_hit_ratio)
+for _result, _key in (('hit', 'hits'), ('stale', 'stale_hits'), ('miss', 'misses'), ('coalesced', 'coalesced')):
+    FEED_CACHE_REQUESTS.labels(_result).set_function(lambda key=_key: flight_bot.feed_cache.stats()[key])
 
 def is_user_monitoring(user_id):
-    """Check if user is currently monitoring a flight"""
-    return user_id in monitored_flights
+    """Check if user is currently monitoring at least one flight"""
+    return registry.is_watching(user_id)
+
+def user_language_for(user_id, context):
+    """Language from the user's settings, else from one of their subscriptions"""
+    language = context.user_data.get('language')
+    if language is None:
+        for subscription in registry.subscriptions_for(user_id).values():
+            return subscription.language
+    return language or 'en'
 
 async def auto_delete_previous_message(bot, user_id, chat_id=None):
     """Auto delete previous message to prevent message accumulation"""
@@ -34,6 +73,28 @@ async def auto_delete_previous_message(bot, user_id, chat_id=None):
 def store_message_id(user_id, message_id):
     """Store message ID for auto-delete functionality"""
     user_message_history[user_id] = message_id
+    if subscription_store is not None:
+        subscription_store.put_message(user_id, message_id)
+
+def open_subscription_store(path=SUBSCRIPTION_DB_PATH):
+    """Reload saved subscriptions and message ids, then keep persisting every change"""
+    global subscription_store
+    if not path:
+        return None
+    started = time.perf_counter()
+    store = SubscriptionStore(path)
+    count = registry.restore(store)
+    user_message_history.update(store.load_messages())
+    subscription_store = store
+    logger.info(f"Restored {count} subscriptions to {len(registry)} flights from {path} in {time.perf_counter() - started:.2f}s")
+    return store
+
+def close_subscription_store():
+    """Write out pending changes; called on shutdown"""
+    global subscription_store
+    if subscription_store is not None:
+        subscription_store.close()
+        subscription_store = None
 
 async def safe_edit_message(query, text, reply_markup=None, parse_mode=None):
     """Safely edit message with error handling"""
@@ -54,19 +115,12 @@ async def safe_edit_message(query, text, reply_markup=None, parse_mode=None):
             parse_mode=parse_mode
         )
 
+@profiled("start")
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
 
     await auto_delete_previous_message(update.get_bot(), user_id)
 
-    if is_user_monitoring(user_id):
-        user_language = context.user_data.get('language', 'en')
-        sent_message = await update.message.reply_text(
-            get_text('currently_monitoring', user_language)
-        )
-        store_message_id(user_id, sent_message.message_id)
-        return
-
     user_language = context.user_data.get('language')
     if user_language is None:
         welcome_message = f"""
@@ -115,6 +169,7 @@ async def show_flight_type_selection(update: Update, context: ContextTypes.DEFAU
         sent_message = await update.edit_message_text(welcome_message, reply_markup=reply_markup)
         store_message_id(user_id, sent_message.message_id)
 
+@profiled("button")
 async def button(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     choice = query.data
@@ -126,6 +181,9 @@ async def button(update: Update, context: ContextTypes.DEFAULT_TYPE):
         language = choice.split('_')[1]
         was_changing_language = context.user_data.get('language') is not None
         context.user_data['language'] = language
+        for subscription in registry.subscriptions_for(user_id).values():
+            subscription.language = language
+            registry.save_subscription(user_id, subscription)
         if was_changing_language:
             language_name = "English" if language == 'en' else "Bahasa Indonesia"
             confirmation_message = f"✅ {get_text('language_changed', language, language_name=language_name)}\n\n"
@@ -146,20 +204,21 @@ async def button(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     user_language = context.user_data.get('language', 'en')
-    if is_user_monitoring(user_id) and not choice.startswith("stop_monitor_"):
-        sent_message = await safe_edit_message(query, get_text('currently_monitoring', user_language))
-        store_message_id(user_id, sent_message.message_id)
-        return
     if choice in ['I', 'D']:
         context.user_data['flight_type'] = choice
         flight_type_name = get_text('international', user_language) if choice == 'I' else get_text('domestic', user_language)
 
-        from datetime import timedelta
         today = datetime.now()
         keyboard = [
             [
                 InlineKeyboardButton(get_text('schedule', user_language), callback_data=f"schedule_{choice}_{today.strftime('%Y-%m-%d')}"),
                 InlineKeyboardButton(get_text('search_flight', user_language), callback_data=f"search_flight_{choice}")
+            ],
+            [
+                InlineKeyboardButton(get_text('schedule_tomorrow', user_language),
+                                     callback_data=f"schedule_{choice}_{(today + timedelta(days=1)).strftime('%Y-%m-%d')}"),
+                InlineKeyboardButton(get_text('schedule_next_days', user_language, days=SCHEDULE_RANGE_DAYS),
+                                     callback_data=f"range_{choice}_{today.strftime('%Y-%m-%d')}_{SCHEDULE_RANGE_DAYS}_-_0")
             ]
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
@@ -177,25 +236,13 @@ async def button(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif choice.startswith("monitor_"):
         flight_id = choice.split('_')[1]
         logger.info(f"Attempting to monitor flight with ID: {flight_id}")
-        flight_info = flight_bot.get_flight_info_by_id(flight_id)
+        flight_info = await flight_bot.get_flight_info_by_id(flight_id)
         logger.info(f"Flight info retrieved: {flight_info is not None}")
         if flight_info:
-            monitored_flights[user_id] = {
-                'flight_id': flight_id,
-                'last_status': flight_info['flightstat'],
-                'last_schedule': str(flight_info['schedule']) if flight_info['schedule'] else None,
-                'last_estimate': str(flight_info['estimate']) if flight_info['estimate'] else None,
-                'last_gate': str(flight_info['gatenumber']) if flight_info['gatenumber'] else None,
-                'flight_no': flight_info['flightno'],
-                'last_seen': datetime.now(),
-                'notification_count': 0,
-                'check_count': 0,
-                'last_message_id': None,
-                'language': user_language
-            }
-
-            logger.info(f"User {user_id} started monitoring flight {flight_info['flightno']} (ID: {flight_id})")
-            logger.info(f"Initial monitoring data: {monitored_flights[user_id]}")
+            subscription = registry.subscribe(user_id, flight_info, user_language)
+
+            logger.info(f"User {user_id} started monitoring flight {flight_info.flightno} (ID: {flight_id})")
+            logger.info(f"Initial monitoring data: {subscription.as_dict()}")
 
             keyboard = [
                 [InlineKeyboardButton(get_text('stop_monitoring', user_language), callback_data=f"stop_monitor_{flight_id}")]
@@ -203,25 +250,26 @@ async def button(update: Update, context: ContextTypes.DEFAULT_TYPE):
             reply_markup = InlineKeyboardMarkup(keyboard)
             sent_message = await safe_edit_message(
                 query,
-                f"{get_text('monitoring_started', user_language, flight_no=flight_info['flightno'])}\n\n"
-                f"{get_text('current_status', user_language)} {flight_info['flightstat']}\n"
-                f"{get_text('schedule_label', user_language)} {flight_info['schedule']}\n"
-                f"{get_text('estimate_label', user_language)} {flight_info['estimate']}\n"
-                f"{get_text('gate_label', user_language)} {flight_info['gatenumber']}\n\n"
+                f"{get_text('monitoring_started', user_language, flight_no=flight_info.flightno)}\n\n"
+                f"{get_text('current_status', user_language)} {flight_info.flightstat}\n"
+                f"{get_text('schedule_label', user_language)} {flight_info.schedule}\n"
+                f"{get_text('estimate_label', user_language)} {flight_info.estimate}\n"
+                f"{get_text('gate_label', user_language)} {flight_info.gatenumber}\n\n"
                 f"{get_text('monitoring_notifications', user_language)}\n\n"
                 f"{get_text('monitoring_interval', user_language)}",
                 reply_markup=reply_markup
             )
             if sent_message:
-                monitored_flights[user_id]['last_message_id'] = sent_message.message_id
+                subscription.last_message_id = sent_message.message_id
+                registry.save_subscription(user_id, subscription)
                 store_message_id(user_id, sent_message.message_id)
 
     elif choice.startswith("stop_monitor_"):
         flight_id = choice.split('_')[-1]
-        if user_id in monitored_flights:
-            flight_no = monitored_flights[user_id].get('flight_no', flight_id)
-            user_lang = monitored_flights[user_id].get('language', 'en')
-            del monitored_flights[user_id]
+        removed = registry.unsubscribe(user_id, flight_id)
+        if removed:
+            flight_no = removed[0].flight_no or flight_id
+            user_lang = removed[0].language
             logger.info(f"User {user_id} stopped monitoring flight {flight_no}")
             sent_message = await safe_edit_message(
                 query,
@@ -238,7 +286,16 @@ async def button(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if len(parts) >= 3:
             flight_type = parts[1]
             date_str = parts[2]
-            await handle_schedule_request(query, flight_type, date_str, user_id, context)
+            page = int(parts[3]) if len(parts) >= 4 and parts[3].isdigit() else 0
+            await handle_schedule_request(query, flight_type, date_str, user_id, context, page)
+
+    elif choice.startswith("range_"):
+        parts = choice.split('_')
+        if len(parts) == 6 and parts[3].isdigit() and parts[5].isdigit():
+            window = parse_time_window(parts[4]) if parts[4] != '-' else (None, None)
+            if window is not None:
+                days = min(max(int(parts[3]), 1), SCHEDULE_MAX_RANGE_DAYS)
+                await handle_range_request(query, parts[1], parts[2], days, window, user_id, context, int(parts[5]))
 
     elif choice.startswith("search_flight_"):
         flight_type = choice.split('_')[2]
@@ -266,47 +323,33 @@ async def handle_back_to_menu(query, context):
     """Handle back to menu button for callback queries"""
     user_id = query.from_user.id
     user_language = context.user_data.get('language', 'en')
-    if is_user_monitoring(user_id):
-        await query.edit_message_text(
-            get_text('currently_monitoring', user_language)
-        )
-        return
-
     await show_flight_type_selection(query, context, user_language)
 
-async def handle_schedule_request(query, flight_type, date_str, user_id, context):
+def schedule_page_markup(flight_type, date_str, page, pages, language, prefix=None):
+    """Previous/next buttons for a schedule page, then search and menu.
+    Page buttons send ``<prefix>_<page>`` (by default the date's schedule)."""
+    prefix = prefix or f"schedule_{flight_type}_{date_str}"
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton(get_text('previous_page', language), callback_data=f"{prefix}_{page - 1}"))
+    if page < pages - 1:
+        navigation.append(InlineKeyboardButton(get_text('next_page', language), callback_data=f"{prefix}_{page + 1}"))
+    keyboard = [navigation] if navigation else []
+    keyboard += [
+        [InlineKeyboardButton(get_text('search_specific_flight', language), callback_data=f"search_flight_{flight_type}")],
+        [InlineKeyboardButton(get_text('back_to_menu', language), callback_data="back_to_menu")]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+async def handle_schedule_request(query, flight_type, date_str, user_id, context, page=0):
     """Handle schedule button clicks"""
     try:
-        user_language = context.user_data.get('language', 'en')
-        if user_id in monitored_flights:
-            user_language = monitored_flights[user_id].get('language', user_language)
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-        flights = flight_bot.get_flights_by_date(date_str)
-        filtered_flights = []
-        for flight in flights:
-            if flight['departure'] == flight_type:
-                filtered_flights.append(flight)
-        filtered_flights = filtered_flights[:20]
-        if filtered_flights:
-            if user_language == 'id':
-                month_names = get_month_names('id')
-                date_formatted = date_obj.strftime('%d %B %Y')
-                for eng_month, ind_month in month_names.items():
-                    date_formatted = date_formatted.replace(eng_month, ind_month)
-            else:
-                date_formatted = date_obj.strftime('%d %B %Y')
-            message = f"{get_text('flight_schedules', user_language, date=date_formatted)}\n\n"
-            for i, flight in enumerate(filtered_flights, 1):
-                message += f"{i}. {flight['flightno']}\n"
-                message += f"   📍 {flight['fromtolocation']}\n"
-                message += f"   🕐 {flight['schedule']}\n\n"
-
-            keyboard = [
-                [InlineKeyboardButton(get_text('search_specific_flight', user_language), callback_data=f"search_flight_{flight_type}")],
-                [InlineKeyboardButton(get_text('back_to_menu', user_language), callback_data="back_to_menu")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-
+        user_language = user_language_for(user_id, context)
+        store = await flight_bot.get_store()
+        schedule_page = schedule_pages.page(store, date_str, flight_type, user_language, page)
+        if schedule_page:
+            message, page, pages = schedule_page
+            reply_markup = schedule_page_markup(flight_type, date_str, page, pages, user_language)
             sent_message = await safe_edit_message(query, message, reply_markup=reply_markup)
             store_message_id(user_id, sent_message.message_id)
         else:
@@ -327,11 +370,70 @@ async def handle_schedule_request(query, flight_type, date_str, user_id, context
         sent_message = await safe_edit_message(query, get_text('error_loading_schedules', user_language))
         store_message_id(user_id, sent_message.message_id)
 
+def parse_time_window(text):
+    """(start, end) from "14:00-18:00", "14-18" or "1400-1800"; None if it is not a window"""
+    match = _TIME_WINDOW_RE.match(text.strip())
+    if not match:
+        return None
+    start_hour, start_minute, end_hour, end_minute = (int(value or 0) for value in match.groups())
+    try:
+        start, end = Time(start_hour, start_minute), Time(end_hour, end_minute)
+    except ValueError:
+        return None
+    return (start, end) if start <= end else None
+
+def parse_date_range(text, today):
+    """(first date, number of days) from "today", "tomorrow", "3days" or YYYY-MM-DD (English or Indonesian)"""
+    text = text.strip().lower()
+    if text in ('today', 'hariini'):
+        return today.strftime('%Y-%m-%d'), 1
+    if text in ('tomorrow', 'besok'):
+        return (today + timedelta(days=1)).strftime('%Y-%m-%d'), 1
+    match = re.match(r"^(\d+)(?:d|days?|hari)$", text)
+    if match:
+        days = int(match.group(1))
+        return (today.strftime('%Y-%m-%d'), days) if 1 <= days <= SCHEDULE_MAX_RANGE_DAYS else None
+    try:
+        return datetime.strptime(text, '%Y-%m-%d').strftime('%Y-%m-%d'), 1
+    except ValueError:
+        return None
+
+def range_callback_prefix(flight_type, first, days, window):
+    start, end = window
+    if start is None and end is None:
+        window_token = "-"
+    else:
+        window_token = f"{(start or Time.min).strftime('%H%M')}-{(end or Time(23, 59)).strftime('%H%M')}"
+    return f"range_{flight_type}_{first}_{days}_{window_token}"
+
+async def handle_range_request(query, flight_type, first, days, window, user_id, context, page=0):
+    """Handle multi-day and time-window schedule buttons"""
+    user_language = user_language_for(user_id, context)
+    try:
+        store = await flight_bot.get_store()
+        start, end = window
+        range_page = render_range_page(store, first, days, start, end, flight_type, user_language, page)
+        if range_page:
+            message, page, pages = range_page
+            reply_markup = schedule_page_markup(flight_type, first, page, pages, user_language,
+                                                prefix=range_callback_prefix(flight_type, first, days, window))
+        else:
+            heading = range_heading(datetime.strptime(first, '%Y-%m-%d'), days, start, end, user_language)
+            message = (f"{get_text('no_flights_found', user_language, flight_type=flight_type, date=heading)}\n\n"
+                       f"{get_text('check_flight_type', user_language)}")
+            reply_markup = InlineKeyboardMarkup([
+                [InlineKeyboardButton(get_text('back_to_menu', user_language), callback_data="back_to_menu")]
+            ])
+        sent_message = await safe_edit_message(query, message, reply_markup=reply_markup)
+        store_message_id(user_id, sent_message.message_id)
+    except Exception as e:
+        logger.error(f"Error in handle_range_request: {e}")
+        sent_message = await safe_edit_message(query, get_text('error_loading_schedules', user_language))
+        store_message_id(user_id, sent_message.message_id)
+
 async def handle_search_flight_request(query, flight_type, user_id, context):
     """Handle search flight button clicks"""
-    user_language = context.user_data.get('language', 'en')
-    if user_id in monitored_flights:
-        user_language = monitored_flights[user_id].get('language', user_language)
+    user_language = user_language_for(user_id, context)
     keyboard = [
         [InlineKeyboardButton(get_text('back_to_menu', user_language), callback_data="back_to_menu")]
     ]
@@ -349,31 +451,37 @@ async def handle_search_flight_request(query, flight_type, user_id, context):
     )
     store_message_id(user_id, sent_message.message_id)
 
+def suggestion_rows(flights, date_str):
+    """One button per suggested flight, opening it like a search result"""
+    return [
+        [InlineKeyboardButton(f"✈️ {flight.flightno} · {flight.fromtolocation}",
+                              callback_data=f"flight_search_{flight.flightno}_{date_str}")]
+        for flight in flights
+    ]
+
 async def handle_flight_search_result(query, flight_code, date_str, user_id, flight_type, context):
     """Handle flight search result button clicks"""
     try:
-        user_language = context.user_data.get('language', 'en')
-        if user_id in monitored_flights:
-            user_language = monitored_flights[user_id].get('language', user_language)
-        flight_info = flight_bot.get_flight_info(flight_code, date_str)
+        user_language = user_language_for(user_id, context)
+        flight_info = await flight_bot.get_flight_info(flight_code, date_str)
         if flight_info:
-            status_emoji = get_status_emoji(flight_info['flightstat'])
+            status_emoji = get_status_emoji(flight_info.flightstat)
 
             message = f"""
-{get_text('flight_info_title', user_language, flight_no=flight_info['flightno'])}
+{get_text('flight_info_title', user_language, flight_no=flight_info.flightno)}
 
-{get_text('schedule_label', user_language)} {flight_info['schedule']}
-{get_text('estimate_label', user_language)} {flight_info['estimate']}
+{get_text('schedule_label', user_language)} {flight_info.schedule}
+{get_text('estimate_label', user_language)} {flight_info.estimate}
 
-{get_text('gate_label', user_language)} {flight_info['gatenumber']}
-{get_text('status_label', user_language)} {status_emoji} {flight_info['flightstat']}
-{get_text('route_label', user_language)} {flight_info['fromtolocation']}
+{get_text('gate_label', user_language)} {flight_info.gatenumber}
+{get_text('status_label', user_language)} {status_emoji} {flight_info.flightstat}
+{get_text('route_label', user_language)} {flight_info.fromtolocation}
             """
 
-            logger.info(f"Creating monitoring button for flight: {flight_info.get('flightno')} with ID: {flight_info.get('id')}")
+            logger.info(f"Creating monitoring button for flight: {flight_info.flightno} with ID: {flight_info.id}")
             keyboard = [
                 [
-                    InlineKeyboardButton(get_text('start_monitoring', user_language), callback_data=f"monitor_{flight_info.get('id', 'unknown')}"),
+                    InlineKeyboardButton(get_text('start_monitoring', user_language), callback_data=f"monitor_{flight_info.id}"),
                     InlineKeyboardButton(get_text('dont_monitor', user_language), callback_data="dont_monitor")
                 ],
                 [InlineKeyboardButton(get_text('back_to_menu', user_language), callback_data="back_to_menu")]
@@ -383,7 +491,8 @@ async def handle_flight_search_result(query, flight_code, date_str, user_id, fli
             sent_message = await safe_edit_message(query, message, reply_markup=reply_markup)
             store_message_id(user_id, sent_message.message_id)
         else:
-            keyboard = [
+            suggestions = await flight_bot.search_flights(flight_code, date_str, flight_type)
+            keyboard = suggestion_rows(suggestions, date_str) + [
                 [InlineKeyboardButton(get_text('search_again', user_language), callback_data=f"search_flight_{flight_type}")],
                 [InlineKeyboardButton(get_text('back_to_menu', user_language), callback_data="back_to_menu")]
             ]
@@ -391,7 +500,8 @@ async def handle_flight_search_result(query, flight_code, date_str, user_id, fli
 
             sent_message = await safe_edit_message(
                 query,
-                get_text('flight_not_found', user_language, flight_code=flight_code, date=date_str),
+                get_text('did_you_mean' if suggestions else 'flight_not_found', user_language,
+                         flight_code=flight_code, date=date_str),
                 reply_markup=reply_markup
             )
             store_message_id(user_id, sent_message.message_id)
@@ -400,14 +510,10 @@ async def handle_flight_search_result(query, flight_code, date_str, user_id, fli
         sent_message = await safe_edit_message(query, get_text('error_loading_flight_info', user_language))
         store_message_id(user_id, sent_message.message_id)
 
+@profiled("flight_info")
 async def flight_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     user_language = context.user_data.get('language', 'en')
-    if is_user_monitoring(user_id):
-        await update.message.reply_text(
-            get_text('currently_monitoring', user_language)
-        )
-        return
     flight_type = context.user_data.get('flight_type', None)
     if flight_type is None:
         await update.message.reply_text(
@@ -415,38 +521,39 @@ async def flight_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    if len(context.args) != 1:
+    if not context.args:
         await update.message.reply_text(
             f"{get_text('incorrect_format', user_language)}\n\n"
             f"{get_text('use_flight_format', user_language)}"
         )
         return
 
-    flight_code = context.args[0].upper()
+    # "/flight GA 410" arrives as two arguments
+    flight_code = " ".join(context.args).upper()
     date_str = datetime.now().strftime('%Y-%m-%d')
 
-    flight_info = flight_bot.get_flight_info(flight_code, date_str)
+    flight_info = await flight_bot.get_flight_info(flight_code, date_str)
 
     if flight_info:
-        if (flight_type == 'D' and not flight_info['departure'].startswith('I')) or (flight_type == 'I' and flight_info['departure'].startswith('I')):
-            status_emoji = get_status_emoji(flight_info['flightstat'])
+        if (flight_type == 'D' and not flight_info.departure.startswith('I')) or (flight_type == 'I' and flight_info.departure.startswith('I')):
+            status_emoji = get_status_emoji(flight_info.flightstat)
 
             message = f"""
-{get_text('flight_info_title', user_language, flight_no=flight_info['flightno'])}
+{get_text('flight_info_title', user_language, flight_no=flight_info.flightno)}
 
-{get_text('schedule_label', user_language)} {flight_info['schedule']}
-{get_text('estimate_label', user_language)} {flight_info['estimate']}
+{get_text('schedule_label', user_language)} {flight_info.schedule}
+{get_text('estimate_label', user_language)} {flight_info.estimate}
 
-{get_text('gate_label', user_language)} {flight_info['gatenumber']}
-{get_text('status_label', user_language)} {status_emoji} {flight_info['flightstat']}
-{get_text('route_label', user_language)} {flight_info['fromtolocation']}
+{get_text('gate_label', user_language)} {flight_info.gatenumber}
+{get_text('status_label', user_language)} {status_emoji} {flight_info.flightstat}
+{get_text('route_label', user_language)} {flight_info.fromtolocation}
             """
             await update.message.reply_text(message)
 
-            logger.info(f"Creating monitoring button for flight: {flight_info.get('flightno')} with ID: {flight_info.get('id')}")
+            logger.info(f"Creating monitoring button for flight: {flight_info.flightno} with ID: {flight_info.id}")
             keyboard = [
                 [
-                    InlineKeyboardButton(get_text('start_monitoring', user_language), callback_data=f"monitor_{flight_info.get('id', 'unknown')}"),
+                    InlineKeyboardButton(get_text('start_monitoring', user_language), callback_data=f"monitor_{flight_info.id}"),
                     InlineKeyboardButton(get_text('dont_monitor', user_language), callback_data="dont_monitor")
                 ]
             ]
@@ -456,30 +563,78 @@ async def flight_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 reply_markup=reply_markup
             )
         else:
-            flight_type_name = get_text('domestic', user_language) if flight_info['departure'].startswith ('D') else get_text('international', user_language)
-            actual_type = get_text('international', user_language) if flight_info['departure'].startswith('I') else get_text('domestic', user_language)
+            flight_type_name = get_text('domestic', user_language) if flight_info.departure.startswith ('D') else get_text('international', user_language)
+            actual_type = get_text('international', user_language) if flight_info.departure.startswith('I') else get_text('domestic', user_language)
             await update.message.reply_text(
                 f"❌ Flight {flight_code} is a {actual_type} flight, but you selected {flight_type_name} flights.\n\n"
                 f"{get_text('select_flight_type_first', user_language)}"
             )
             return
     else:
-        await update.message.reply_text(
-            get_text('flight_not_found', user_language, flight_code=flight_code, date=date_str)
-        )
+        suggestions = await flight_bot.search_flights(flight_code, date_str, flight_type)
+        if suggestions:
+            await update.message.reply_text(
+                get_text('did_you_mean', user_language, flight_code=flight_code, date=date_str),
+                reply_markup=InlineKeyboardMarkup(suggestion_rows(suggestions, date_str))
+            )
+        else:
+            await update.message.reply_text(
+                get_text('flight_not_found', user_language, flight_code=flight_code, date=date_str)
+            )
+
+# Inline result titles and descriptions per (flight row, language): rebuilt only for rows that changed
+inline_answers = RenderCache(maxsize=8192)
+
+def inline_article(flight, language):
+    title, description = inline_answers.get_or_render(("inline", flight.values(), language), lambda: (
+        f"✈️ {flight.flightno} · {flight.fromtolocation}",
+        f"{flight.schedule} · {get_status_emoji(flight.flightstat)} {flight.flightstat} · "
+        f"{get_text('gate_label', language)} {flight.gatenumber}",
+    ))
+    # The status card ends with the current time, so it is put together per answer (its body is cached)
+    return InlineQueryResultArticle(
+        id=f"{flight.departure}-{flight.id}",
+        title=title,
+        description=description,
+        input_message_content=InputTextMessageContent(render_flight_status(flight, language=language)),
+    )
+
+def inline_results(store, text, date_str, language):
+    """Articles for an inline query: today's best matches, each sending its status card"""
+    return [inline_article(flight, language) for flight in store.search(text, date_str, limit=INLINE_RESULTS)]
+
+@profiled("inline_query")
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answer "@bot GA410" from the in-memory snapshot; never waits on the feeds"""
+    query = update.inline_query
+    user_language = context.user_data.get('language', 'en')
+    store = flight_bot.peek_store()
+    date_str = datetime.now().strftime('%Y-%m-%d')
+    results = inline_results(store, query.query, date_str, user_language) if query.query.strip() else ()
+    await query.answer(
+        results,
+        # Do not let Telegram hold on to answers given before the first feed load
+        cache_time=INLINE_CACHE_SECONDS if len(store) else 0,
+        is_personal=True,
+        button=None if results else InlineQueryResultsButton(get_text('inline_open_bot', user_language),
+                                                             start_parameter="inline"),
+    )
 
+@profiled("schedule_info")
 async def schedule_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     user_language = context.user_data.get('language', 'en')
-    if is_user_monitoring(user_id):
-        await update.message.reply_text(
-            get_text('currently_monitoring', user_language)
-        )
-        return
-    if len(context.args) != 1:
+    # /schedule <date|today|tomorrow|Ndays> [HH:MM-HH:MM], or just a window for today
+    today = datetime.now()
+    date_range = parse_date_range(context.args[0], today) if context.args else None
+    window_text = " ".join(context.args[1:] if date_range else context.args)
+    window = parse_time_window(window_text) if window_text else (None, None)
+    if date_range is None and window_text and window is not None:
+        date_range = (today.strftime('%Y-%m-%d'), 1)
+    if date_range is None or window is None:
         await update.message.reply_text(
             f"{get_text('incorrect_format', user_language)}\n\n"
-            f"Use: /schedule [date]"
+            f"{get_text('use_schedule_format', user_language, days=SCHEDULE_MAX_RANGE_DAYS)}"
         )
         return
 
@@ -490,51 +645,52 @@ async def schedule_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
-    date_str = context.args[0]
-    try:
-        date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-    except ValueError:
-        await update.message.reply_text(
-            f"{get_text('incorrect_format', user_language)}\n\n"
-            f"Use format: YYYY-MM-DD"
-        )
-        return
-
+    date_str, days = date_range
     await update.message.reply_text(get_text('searching_schedules', user_language))
-    flights = flight_bot.get_flights_by_date(date_str)
-
-    filtered_flights = []
-
-    for flight in flights:
-        if flight['departure'] == flight_type:
-            filtered_flights.append(flight)
-    filtered_flights = filtered_flights[:20]
-
-    if filtered_flights:
-        if user_language == 'id':
-            month_names = get_month_names('id')
-            date_formatted = date_obj.strftime('%d %B %Y')
-            for eng_month, ind_month in month_names.items():
-                date_formatted = date_formatted.replace(eng_month, ind_month)
+    store = await flight_bot.get_store()
+    if days > 1 or window != (None, None):
+        start, end = window
+        range_page = render_range_page(store, date_str, days, start, end, flight_type, user_language)
+        if range_page:
+            message, page, pages = range_page
+            await update.message.reply_text(message, reply_markup=schedule_page_markup(
+                flight_type, date_str, page, pages, user_language,
+                prefix=range_callback_prefix(flight_type, date_str, days, window)
+            ))
         else:
-            date_formatted = date_obj.strftime('%d %B %Y')
-        message = f"{get_text('flight_schedules', user_language, date=date_formatted)}\n\n"
-        for i, flight in enumerate(filtered_flights, 1):
-            message += f"{i}. *{flight['flightno']}*\n"
-            message += f"   📍 {flight['fromtolocation']}\n"
-            message += f"   🕐 {flight['schedule']}\n\n"
-        await update.message.reply_text(message)
+            heading = range_heading(datetime.strptime(date_str, '%Y-%m-%d'), days, start, end, user_language)
+            await update.message.reply_text(
+                get_text('no_flights_type', user_language, flight_type=flight_type, date=heading)
+            )
+        return
+    schedule_page = schedule_pages.page(store, date_str, flight_type, user_language)
+
+    if schedule_page:
+        message, page, pages = schedule_page
+        await update.message.reply_text(message, reply_markup=schedule_page_markup(flight_type, date_str, page, pages, user_language))
     else:
         await update.message.reply_text(
             get_text('no_flights_type', user_language, flight_type=flight_type, date=date_str)
         )
 
+@profiled("stop_monitor")
 async def stop_monitor(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
     user_language = context.user_data.get('language', 'en')
-    if user_id in monitored_flights:
-        flight_no = monitored_flights[user_id].get('flight_no', 'Unknown')
-        del monitored_flights[user_id]
+    flight_ids = None
+    if context.args:
+        # /stop_monitor GA410 stops just that flight; no argument stops all
+        wanted = context.args[0].upper()
+        flight_ids = [fid for fid, sub in registry.subscriptions_for(user_id).items()
+                      if str(sub.flight_no).upper() == wanted]
+    removed = []
+    if flight_ids is None:
+        removed = registry.unsubscribe(user_id)
+    else:
+        for flight_id in flight_ids:
+            removed.extend(registry.unsubscribe(user_id, flight_id))
+    if removed:
+        flight_no = ', '.join(str(sub.flight_no or 'Unknown') for sub in removed)
         logger.info(f"User {user_id} manually stopped monitoring flight {flight_no}")
         await update.message.reply_text(
             f"{get_text('monitoring_stopped', user_language, flight_no=flight_no)}\n\n"
@@ -552,34 +708,63 @@ async def debug_monitor(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     debug_message = f"{get_text('debug_info', user_language)}\n\n"
     debug_message += f"{get_text('your_user_id', user_language)} `{user_id}`\n"
-    debug_message += f"{get_text('total_monitored', user_language)} {len(monitored_flights)}\n\n"
+    debug_message += f"{get_text('total_monitored', user_language)} {len(registry)}\n\n"
 
-    if user_id in monitored_flights:
-        flight_data = monitored_flights[user_id]
+    subscriptions = registry.subscriptions_for(user_id)
+    if subscriptions:
         debug_message += f"{get_text('you_are_monitoring', user_language)}\n"
-        debug_message += f"Flight: {flight_data['flight_no']}\n"
-        debug_message += f"{get_text('flight_id', user_language)} {flight_data['flight_id']}\n"
-        debug_message += f"Last Status: {flight_data['last_status']}\n"
-        debug_message += f"Last Schedule: {flight_data['last_schedule']}\n"
-        debug_message += f"Last Estimate: {flight_data['last_estimate']}\n"
-        debug_message += f"{get_text('notifications_sent', user_language)} {flight_data.get('notification_count', 0)}\n"
-        debug_message += f"{get_text('checks_performed', user_language)} {flight_data.get('check_count', 0)}\n"
-        debug_message += f"{get_text('last_seen', user_language)} {flight_data.get('last_seen', 'N/A')}\n\n"
-        try:
-            current_flight = flight_bot.get_flight_info_by_id(flight_data['flight_id'])
-            if current_flight:
-                debug_message += f"✅ {get_text('live_api_check', user_language)} {get_text('success', user_language)}\n"
-                debug_message += f"Current Status: {current_flight['flightstat']}\n"
-                debug_message += f"Current Schedule: {current_flight['schedule']}\n"
-                debug_message += f"Current Estimate: {current_flight['estimate']}\n"
-            else:
-                debug_message += f"❌ {get_text('live_api_check', user_language)} {get_text('flight_not_found_debug', user_language)}\n"
-        except Exception as e:
-            debug_message += f"❌ {get_text('live_api_check', user_language)} {get_text('error', user_language)} - {str(e)}*\n"
+        for flight_id, subscription in subscriptions.items():
+            watch = registry.get_watch(flight_id)
+            if watch is None:
+                continue
+            debug_message += f"Flight: {watch.flight_no}\n"
+            debug_message += f"{get_text('flight_id', user_language)} {flight_id}\n"
+            debug_message += f"Last Status: {watch.last_status}\n"
+            debug_message += f"Last Schedule: {watch.last_schedule}\n"
+            debug_message += f"Last Estimate: {watch.last_estimate}\n"
+            debug_message += f"{get_text('notifications_sent', user_language)} {subscription.notification_count}\n"
+            debug_message += f"{get_text('checks_performed', user_language)} {watch.check_count}\n"
+            debug_message += f"{get_text('last_seen', user_language)} {watch.last_seen}\n\n"
+            try:
+                current_flight = await flight_bot.get_flight_info_by_id(flight_id)
+                if current_flight:
+                    debug_message += f"✅ {get_text('live_api_check', user_language)} {get_text('success', user_language)}\n"
+                    debug_message += f"Current Status: {current_flight.flightstat}\n"
+                    debug_message += f"Current Schedule: {current_flight.schedule}\n"
+                    debug_message += f"Current Estimate: {current_flight.estimate}\n\n"
+                else:
+                    debug_message += f"❌ {get_text('live_api_check', user_language)} {get_text('flight_not_found_debug', user_language)}\n\n"
+            except Exception as e:
+                debug_message += f"❌ {get_text('live_api_check', user_language)} {get_text('error', user_language)} - {str(e)}*\n\n"
     else:
         debug_message += f"{get_text('not_monitoring_debug', user_language)}\n"
 
-    debug_message += f"\n{get_text('all_monitored_users', user_language)} {list(monitored_flights.keys())}"
+    debug_message += f"\n{get_text('all_monitored_users', user_language)} {registry.user_ids()}"
+    cache_stats = flight_bot.cache_stats()
+    render_stats = render_cache.stats()
+    debug_message += (
+        f"\nFeed cache: hits={cache_stats['hits']} stale={cache_stats['stale_hits']} "
+        f"misses={cache_stats['misses']} coalesced={cache_stats['coalesced']} refreshes={cache_stats['refreshes']}"
+        f"\nFeed fetches: downloads={cache_stats['downloads']} not_modified={cache_stats['not_modified']} "
+        f"unchanged={cache_stats['unchanged_payload']} parsed={cache_stats['parsed']}"
+        f"\nRender cache: hits={render_stats['hits']} misses={render_stats['misses']} size={render_stats['size']}"
+    )
+    if notification_dispatcher is not None:
+        dispatch_stats = notification_dispatcher.stats()
+        debug_message += (
+            f"\nNotifications: sent={dispatch_stats['completed']} failed={dispatch_stats['failed']} "
+            f"pending={dispatch_stats['pending']} retry_after={dispatch_stats['retry_after']}"
+        )
+    for name, stats in command_profiler.summary().items():
+        debug_message += (
+            f"\n{name}: n={stats['count']} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms max={stats['max_ms']}ms"
+        )
+    if subscription_store is not None:
+        store_stats = subscription_store.stats()
+        debug_message += (
+            f"\nSubscription store: flushes={store_stats['flushes']} rows={store_stats['rows_written']} "
+            f"pending={store_stats['pending']} failures={store_stats['flush_failures']}"
+        )
 
     await update.message.reply_text(debug_message)
 
@@ -602,6 +787,7 @@ async def test_notification(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"{get_text('failed_to_send', user_language)} {str(e)}"
         )
 
+@profiled("change_language")
 async def change_language(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Change user's language preference"""
     user_id = update.effective_user.id
@@ -609,13 +795,6 @@ async def change_language(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await auto_delete_previous_message(update.get_bot(), user_id)
 
-    if is_user_monitoring(user_id):
-        sent_message = await update.message.reply_text(
-            get_text('currently_monitoring', user_language)
-        )
-        store_message_id(user_id, sent_message.message_id)
-        return
-
     welcome_message = f"""
 {get_text('welcome_title', user_language)}
 
@@ -641,231 +820,241 @@ def normalize_value(value):
     except Exception:
         return str(value)
 
-def safe_string_compare(val1, val2):
-    """Safely compare two values as trimmed strings, handling None values"""
-    str1 = normalize_value(val1)
-    str2 = normalize_value(val2)
-    return str1 == str2
-
 def normalize_status(value):
     v = normalize_value(value)
     return v.lower() if isinstance(v, str) else v
 
 def format_flight_status_message(flight_data, changes=None, language='en'):
     """Format flight status message with current data"""
-    status_emoji = get_status_emoji(flight_data['flightstat'])
+    return render_flight_status(flight_data, changes, language)
 
-    message = f"✈️ {get_text('flight_info_title', language, flight_no=flight_data['flightno'])} Status*\n\n"
-    message += f"{get_text('schedule_label', language)} {flight_data['schedule']}\n"
-    message += f"{get_text('estimate_label', language)} {flight_data['estimate']}\n"
-    message += f"{get_text('gate_label', language)} {flight_data['gatenumber']}\n"
-    message += f"{get_text('status_label', language)} {status_emoji} {flight_data['flightstat']}\n"
-    message += f"{get_text('route_label', language)} {flight_data['fromtolocation']}\n"
-
-    if changes:
-        message += f"\n{get_text('recent_changes', language)}\n"
-        for change in changes:
-            message += f"• {change}\n"
+async def notify_subscriber(bot, user_id, subscription, text, reply_markup=None, parse_mode=None):
+    """Replace the subscriber's previous notification for this flight with a new one"""
+    last_message_id = subscription.last_message_id
+    if last_message_id:
+        try:
+            await bot.delete_message(chat_id=user_id, message_id=last_message_id)
+            logger.info(f"Deleted previous notification message {last_message_id} for user {user_id}")
+        except Exception as delete_error:
+            logger.warning(f"Could not delete previous message {last_message_id} for user {user_id}: {delete_error}")
+    sent_message = await bot.send_message(
+        chat_id=user_id,
+        text=text,
+        reply_markup=reply_markup,
+        parse_mode=parse_mode
+    )
+    subscription.last_message_id = sent_message.message_id
+    return sent_message
 
-    message += f"\n{get_text('last_updated', language, time=datetime.now().strftime('%H:%M:%S'))}"
+def stop_monitoring_markup(flight_id, language):
+    keyboard = [
+        [InlineKeyboardButton(get_text('stop_monitoring', language), callback_data=f"stop_monitor_{flight_id}")]
+    ]
+    return InlineKeyboardMarkup(keyboard)
 
-    return message
+def queue_notification(dispatcher, user_id, subscription, text, kind, reply_markup=None, parse_mode=None, flag=None):
+    """Hand a notification to the dispatcher without waiting for Telegram.
 
-async def monitor_flight_status(application=None):
-    """Enhanced real-time monitoring system with proper change detection"""
-    global should_exit
-    logger.info("🔄 Starting enhanced flight monitoring system...")
+    ``flag`` names a Subscription attribute that is set while the message is
+    queued or sent and cleared again if delivery fails, so the next tick
+    retries instead of queueing a duplicate.
+    """
+    if flag:
+        setattr(subscription, flag, True)
 
-    while not should_exit:
+    async def deliver(bot):
         try:
-            if not monitored_flights:
-                await asyncio.sleep(MONITOR_INTERVAL_SECONDS)
-                continue
+            await notify_subscriber(bot, user_id, subscription, text, reply_markup=reply_markup, parse_mode=parse_mode)
+        except Exception as e:
+            if flag:
+                setattr(subscription, flag, False)
+            registry.save_subscription(user_id, subscription)
+            logger.error(f"Failed to send {kind} notification to user {user_id}: {e}")
+            return
+        subscription.notification_count += 1
+        registry.save_subscription(user_id, subscription)
+        logger.info(f"Sent {kind} notification to user {user_id} for flight {subscription.flight_no}")
+
+    dispatcher.submit(user_id, deliver)
+
+def notify_flight_unavailable(dispatcher, watch):
+    for user_id, subscription in list(watch.subscribers.items()):
+        if subscription.missing_notified:
+            continue
+        user_lang = subscription.language
+        queue_notification(
+            dispatcher, user_id, subscription,
+            f"{get_text('flight_unavailable', user_lang, flight_no=watch.flight_no, flight_id=watch.flight_id)}\n\n"
+            f"{get_text('last_known_status', user_lang)} {watch.last_status}\n"
+            f"{get_text('last_schedule', user_lang)} {watch.last_schedule}\n"
+            f"{get_text('last_estimate', user_lang)} {watch.last_estimate}\n\n"
+            f"{get_text('monitoring_continue', user_lang)}",
+            'temporary unavailable', parse_mode='Markdown', flag='missing_notified'
+        )
 
-            users_to_remove = []
+def notify_flight_changes(dispatcher, watch, current_flight, changes):
+    """Fan one flight's change out to all of its subscribers"""
+    messages = {}
+    for user_id, subscription in list(watch.subscribers.items()):
+        user_lang = subscription.language
+        if user_lang not in messages:
+            messages[user_lang] = (
+                f"{get_text('flight_update_alert', user_lang)}\n\n"
+                + format_flight_status_message(current_flight, changes, user_lang)
+            )
+        queue_notification(
+            dispatcher, user_id, subscription, messages[user_lang], 'update',
+            reply_markup=stop_monitoring_markup(watch.flight_id, user_lang)
+        )
 
-            logger.info(f"Monitoring {len(monitored_flights)} flights: {list(monitored_flights.keys())}")
+def notify_final_status(dispatcher, watch, current_flight, current_status):
+    for user_id, subscription in list(watch.subscribers.items()):
+        if subscription.final_notified:
+            continue
+        user_lang = subscription.language
+        final_message = f"{get_text('final_status', user_lang, flight_no=current_flight.flightno)}\n\n"
+        final_message += format_flight_status_message(current_flight, language=user_lang)
+        final_message += (
+            f"\n\n{get_text('reached_final_status', user_lang, status=current_status)}\n"
+            f"{get_text('program_exit', user_lang)}"
+        )
+        queue_notification(
+            dispatcher, user_id, subscription, final_message, 'final status',
+            reply_markup=stop_monitoring_markup(watch.flight_id, user_lang), flag='final_notified'
+        )
 
-            for user_id, monitoring_data in list(monitored_flights.items()):
-                try:
-                    flight_id = monitoring_data['flight_id']
-
-                    check_count = monitoring_data.get('check_count', 0) + 1
-                    monitored_flights[user_id]['check_count'] = check_count
-
-                    current_flight = flight_bot.get_flight_info_by_id(flight_id)
-
-                    if current_flight is None:
-                        logger.warning(f"Flight ID {flight_id} currently unavailable from API for user {user_id}")
-
-                        bot = application.bot if application and hasattr(application, 'bot') else None
-                        if bot and not monitoring_data.get('missing_notified'):
-                            try:
-                                last_message_id = monitoring_data.get('last_message_id')
-                                if last_message_id:
-                                    try:
-                                        await bot.delete_message(chat_id=user_id, message_id=last_message_id)
-                                        logger.info(f"Deleted previous notification message {last_message_id} for user {user_id} before unavailable notification")
-                                    except Exception as delete_error:
-                                        logger.warning(f"Could not delete previous message {last_message_id} for user {user_id}: {delete_error}")
-
-                                user_lang = monitoring_data.get('language', 'en')
-                                sent_message = await bot.send_message(
-                                    chat_id=user_id,
-                                    text=(
-                                        f"{get_text('flight_unavailable', user_lang, flight_no=monitoring_data['flight_no'], flight_id=flight_id)}\n\n"
-                                        f"{get_text('last_known_status', user_lang)} {monitoring_data['last_status']}\n"
-                                        f"{get_text('last_schedule', user_lang)} {monitoring_data['last_schedule']}\n"
-                                        f"{get_text('last_estimate', user_lang)} {monitoring_data['last_estimate']}\n\n"
-                                        f"{get_text('monitoring_continue', user_lang)}"
-                                    ),
-                                    parse_mode='Markdown'
-                                )
-                                monitored_flights[user_id]['last_message_id'] = sent_message.message_id
-                                monitored_flights[user_id]['missing_notified'] = True
-                                logger.info(f"Sent temporary unavailable notification to user {user_id}")
-                            except Exception as e:
-                                logger.error(f"Failed to send temporary unavailable notification to user {user_id}: {e}")
-                        continue
-
-                    changes = []
-                    status_changed = False
-
-                    current_status = normalize_status(current_flight.get('flightstat'))
-                    current_schedule = normalize_value(current_flight.get('schedule'))
-                    current_estimate = normalize_value(current_flight.get('estimate'))
-                    current_gate = normalize_value(current_flight.get('gatenumber'))
-
-                    stored_status = normalize_status(monitoring_data['last_status'])
-                    stored_schedule = normalize_value(monitoring_data['last_schedule'])
-                    stored_estimate = normalize_value(monitoring_data['last_estimate'])
-                    stored_gate = normalize_value(monitoring_data.get('last_gate'))
-
-                    logger.info(f"Flight {current_flight['flightno']} comparison (check #{check_count}):")
-                    logger.info(f"  Status: '{stored_status}' vs '{current_status}' - {'CHANGED' if stored_status != current_status else 'SAME'}")
-                    logger.info(f"  Schedule: '{stored_schedule}' vs '{current_schedule}' - {'CHANGED' if stored_schedule != current_schedule else 'SAME'}")
-                    logger.info(f"  Estimate: '{stored_estimate}' vs '{current_estimate}' - {'CHANGED' if stored_estimate != current_estimate else 'SAME'}")
-                    logger.info(f"  Gate: '{stored_gate}' vs '{current_gate}' - {'CHANGED' if stored_gate != current_gate else 'SAME'}")
-
-                    if stored_status != current_status:
-                        changes.append(f"Status: {monitoring_data['last_status']} → {current_flight.get('flightstat')}")
-                        status_changed = True
-                        logger.info(f"STATUS CHANGE DETECTED for flight {current_flight['flightno']}: '{stored_status}' → '{current_status}'")
-
-                    if not safe_string_compare(stored_schedule, current_schedule):
-                        changes.append(f"Schedule: {stored_schedule} → {current_schedule}")
-                        status_changed = True
-                        logger.info(f"SCHEDULE CHANGE DETECTED for flight {current_flight['flightno']}: '{stored_schedule}' → '{current_schedule}'")
-
-                    if not safe_string_compare(stored_estimate, current_estimate):
-                        changes.append(f"Estimate: {stored_estimate} → {current_estimate}")
-                        status_changed = True
-                        logger.info(f"ESTIMATE CHANGE DETECTED for flight {current_flight['flightno']}: '{stored_estimate}' → '{current_estimate}'")
-
-                    if not safe_string_compare(stored_gate, current_gate):
-                        changes.append(f"Gate: {stored_gate or 'N/A'} → {current_gate or 'N/A'}")
-                        status_changed = True
-                        logger.info(f"GATE CHANGE DETECTED for flight {current_flight['flightno']}: '{stored_gate}' → '{current_gate}'")
-
-                    bot = application.bot if application and hasattr(application, 'bot') else None
-
-                    if bot and status_changed:
-                        try:
-                            last_message_id = monitoring_data.get('last_message_id')
-                            if last_message_id:
-                                try:
-                                    await bot.delete_message(chat_id=user_id, message_id=last_message_id)
-                                    logger.info(f"Deleted previous notification message {last_message_id} for user {user_id}")
-                                except Exception as delete_error:
-                                    logger.warning(f"Could not delete previous message {last_message_id} for user {user_id}: {delete_error}")
-
-                            user_lang = monitoring_data.get('language', 'en')
-                            notification_message = f"{get_text('flight_update_alert', user_lang)}\n\n"
-                            notification_message += format_flight_status_message(current_flight, changes, user_lang)
-
-                            keyboard = [
-                                [InlineKeyboardButton(get_text('stop_monitoring', user_lang), callback_data=f"stop_monitor_{flight_id}")]
-                            ]
-                            reply_markup = InlineKeyboardMarkup(keyboard)
-
-                            sent_message = await bot.send_message(
-                                chat_id=user_id,
-                                text=notification_message,
-                                reply_markup=reply_markup
-                            )
-
-                            new_message_id = sent_message.message_id
-
-                            logger.info(f"Sent update notification to user {user_id} for flight {current_flight['flightno']} - Changes: {changes}")
-
-                            monitored_flights[user_id].update({
-                                'last_status': current_status,
-                                'last_schedule': current_schedule,
-                                'last_estimate': current_estimate,
-                                'last_gate': current_gate,
-                                'last_seen': datetime.now(),
-                                'notification_count': monitoring_data.get('notification_count', 0) + 1,
-                                'last_message_id': new_message_id
-                            })
-
-                        except Exception as e:
-                            logger.error(f"Failed to send update notification to user {user_id}: {e}")
-                    else:
-                        monitored_flights[user_id]['last_seen'] = datetime.now()
-
-                    final_statuses = ['Departed, Gate Close']
-                    if current_status in final_statuses:
-                        if bot and not monitoring_data.get('final_notified'):
-                            try:
-                                last_message_id = monitoring_data.get('last_message_id')
-                                if last_message_id:
-                                    try:
-                                        await bot.delete_message(chat_id=user_id, message_id=last_message_id)
-                                        logger.info(f"Deleted previous notification message {last_message_id} for user {user_id} before final status")
-                                    except Exception as delete_error:
-                                        logger.warning(f"Could not delete previous message {last_message_id} for user {user_id}: {delete_error}")
-
-                                user_lang = monitoring_data.get('language', 'en')
-                                final_message = f"{get_text('final_status', user_lang, flight_no=current_flight['flightno'])}\n\n"
-                                final_message += format_flight_status_message(current_flight, language=user_lang)
-                                final_message += (
-                                    f"\n\n{get_text('reached_final_status', user_lang, status=current_status)}\n"
-                                    f"{get_text('program_exit', user_lang)}"
-                                )
-                                keyboard = [
-                                    [InlineKeyboardButton(get_text('stop_monitoring', user_lang), callback_data=f"stop_monitor_{flight_id}")]
-                                ]
-                                reply_markup = InlineKeyboardMarkup(keyboard)
-                                await bot.send_message(
-                                    chat_id=user_id,
-                                    text=final_message,
-                                    reply_markup=reply_markup
-                                )
-                                monitored_flights[user_id]['final_notified'] = True
-                                logger.info(f"Sent final status notification to user {user_id}")
-                            except Exception as e:
-                                logger.error(f"Failed to send final status to user {user_id}: {e}")
-                        users_to_remove.append(user_id)
-                        logger.info(f"Auto-stopping monitoring for user {user_id} - flight reached final status: {current_status}")
+def monitor_sleep_seconds():
+    """Sleep until the next flight is due, but wake at the base interval to pick up new subscriptions"""
+    next_due = poll_scheduler.seconds_until_next()
+    if next_due is None:
+        return MONITOR_INTERVAL_SECONDS
+    return min(next_due, MONITOR_INTERVAL_SECONDS)
+
+async def sleep_unless_stopped(seconds, stop=None):
+    """asyncio.sleep that returns early once ``stop`` is set"""
+    if stop is None:
+        await asyncio.sleep(seconds)
+        return
+    try:
+        await asyncio.wait_for(stop.wait(), seconds)
+    except asyncio.TimeoutError:
+        pass
+
+async def monitor_flight_status(application=None, stop=None):
+    """Enhanced real-time monitoring system with proper change detection.
 
+    Each watched flight has its own next-check time in ``poll_scheduler``,
+    set by its phase (see scheduler.PhasePollPolicy). A tick only runs when
+    some flight is due: it takes one snapshot of both feeds, diffs the due
+    flights once and fans the result out to their subscribers.
+
+    ``stop`` (an asyncio.Event on the same loop) ends the loop without
+    waiting out the current sleep; the monitor sets it itself once nobody
+    is monitoring any more.
+    """
+    global should_exit, notification_dispatcher
+    logger.info("🔄 Starting enhanced flight monitoring system...")
+    bot = application.bot if application and hasattr(application, 'bot') else None
+    # Sends are queued and delivered concurrently, so a slow or rate-limited
+    # chat no longer holds up the tick or the other subscribers
+    dispatcher = notification_dispatcher = NotificationDispatcher(bot) if bot else None
+    lag_probe = asyncio.ensure_future(health_state.watch_loop_lag("monitor"))
+    watchdog = watch_loop("monitor")
+
+    while not should_exit and not (stop is not None and stop.is_set()):
+        try:
+            poll_scheduler.sync(watch.flight_id for watch in registry.watches())
+            due_ids = poll_scheduler.pop_due()
+            if not due_ids:
+                health_state.record_tick()
+                await sleep_unless_stopped(monitor_sleep_seconds(), stop)
+                continue
+
+            tick_started = time.perf_counter()
+            flights_to_remove = []
+            watches = [watch for watch in map(registry.get_watch, due_ids) if watch is not None]
+
+            logger.info(f"Checking {len(watches)} of {len(registry)} flights for {registry.subscription_count()} subscriptions")
+
+            # One download of both feeds per tick, shared by every watcher.
+            # Never diff against a stale copy; an expired entry waits for the
+            # (coalesced) refresh instead.
+            snapshot = await flight_bot.get_flight_snapshot(allow_stale=False)
+            now = datetime.now()
+
+            current_rows = {}
+            present = {}
+            for watch in watches:
+                watch.check_count += 1
+                current_flight = snapshot.get(watch.flight_id)
+                poll_scheduler.reschedule(watch.flight_id, current_flight, now)
+                if current_flight is None:
+                    logger.warning(f"Flight ID {watch.flight_id} currently unavailable from API for {len(watch.subscribers)} subscribers")
+                    if dispatcher:
+                        notify_flight_unavailable(dispatcher, watch)
+                    continue
+                present[watch.flight_id] = (watch, current_flight)
+                current_rows[watch.flight_id] = flight_row(current_flight)
+                if not watch.seeded:
+                    # Restored without its last known state; nothing to compare against yet
+                    watch.seed(current_rows[watch.flight_id])
+                    registry.save_watch(watch)
+
+            # Diff every watched flight against its last known state in one pass
+            events = diff_snapshots({fid: watch.row for fid, (watch, _) in present.items()}, current_rows)
+            logger.debug(f"Tick compared {len(current_rows)} flights, {len(events)} changed")
+
+            for event in events:
+                watch, current_flight = present[event.flight_id]
+                try:
+                    changes = event.describe()
+                    logger.info(f"CHANGE DETECTED for flight {current_flight.flightno} ({event.flight_id}): {changes}")
+                    watch.apply(event.row)
+                    registry.save_watch(watch)
+                    if dispatcher:
+                        notify_flight_changes(dispatcher, watch, current_flight, changes)
                 except Exception as e:
-                    logger.error(f"Error processing monitored flight for user {user_id}: {e}")
+                    logger.error(f"Error processing monitored flight {watch.flight_id}: {e}")
                     logger.error(traceback.format_exc())
-                    continue
-
-            for user_id in users_to_remove:
-                if user_id in monitored_flights:
-                    del monitored_flights[user_id]
-                    logger.info(f"Removed user {user_id} from monitoring list")
 
-            if not monitored_flights and users_to_remove:
+            for watch, current_flight in present.values():
+                watch.last_seen = datetime.now()
+                current_status = normalize_value(current_flight.flightstat)
+                if is_final_status(current_status):
+                    try:
+                        if dispatcher:
+                            notify_final_status(dispatcher, watch, current_flight, current_status)
+                    except Exception as e:
+                        logger.error(f"Error processing monitored flight {watch.flight_id}: {e}")
+                        logger.error(traceback.format_exc())
+                    flights_to_remove.append(watch.flight_id)
+                    logger.info(f"Auto-stopping monitoring of flight {watch.flight_id} - reached final status: {current_status}")
+
+            for flight_id in flights_to_remove:
+                poll_scheduler.remove(flight_id)
+                user_ids = registry.drop_flight(flight_id)
+                logger.info(f"Removed flight {flight_id} from monitoring for users {user_ids}")
+
+            if not registry and flights_to_remove:
                 should_exit = True
+                if stop is not None:
+                    stop.set()
                 logger.info("All users removed from monitoring. Setting exit flag to True.")
 
+            tick_seconds = time.perf_counter() - tick_started
+            MONITOR_TICK_SECONDS.observe(tick_seconds)
+            command_profiler.record("monitor_tick", tick_seconds)
+            health_state.record_tick()
+
         except Exception as e:
             logger.error(f"Error in monitor_flight_status main loop: {e}")
             logger.error(traceback.format_exc())
 
-        await asyncio.sleep(MONITOR_INTERVAL_SECONDS)
+        await sleep_unless_stopped(monitor_sleep_seconds(), stop)
 
-    logger.info("🛑 Monitoring loop exiting due to exit flag being set.")
\ No newline at end of file
+    lag_probe.cancel()
+    if watchdog is not None:
+        watchdog.cancel()
+    if dispatcher and not await dispatcher.join(timeout=30):
+        logger.warning(f"Monitoring loop exiting with {dispatcher.pending} notifications undelivered")
+    logger.info("🛑 Monitoring loop exiting due to exit flag being set.")
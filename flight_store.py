@@ -0,0 +1,325 @@
+import logging
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date as Date, datetime, time as Time, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from config import SCHEDULE_PAST_DAYS
+from models import Flight
+from search import FlightSearchIndex
+
+logger = logging.getLogger(__name__)
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+def normalize_flight_no(flight_no: Any) -> str:
+    return str(flight_no or "").strip().upper()
+
+def schedule_date(schedule: Any) -> Optional[str]:
+    """Return the YYYY-MM-DD part of a schedule value, if it has one"""
+    if not schedule:
+        return None
+    match = _DATE_RE.search(str(schedule))
+    return match.group(0) if match else None
+
+def _schedule_key(flight: Flight) -> str:
+    return str(flight.schedule)
+
+def _seconds(moment: Any) -> int:
+    return moment.hour * 3600 + moment.minute * 60 + moment.second
+
+def _time_key(flight: Flight) -> Tuple[int, str]:
+    """Sort key within a date partition: time of day, with unparsed schedules first"""
+    return (_seconds(flight.schedule_at) if flight.schedule_at is not None else -1, str(flight.schedule))
+
+def _window(partition: Optional[Tuple[List[Flight], List[int]]], start: Optional[Time],
+            end: Optional[Time]) -> List[Flight]:
+    if not partition:
+        return []
+    flights, times = partition
+    if start is None and end is None:
+        return flights
+    low = bisect_left(times, _seconds(start) if start is not None else 0)
+    high = bisect_right(times, _seconds(end)) if end is not None else len(times)
+    return flights[low:high]
+
+class _Snapshot:
+    """The store's indexes as readers see them.
+
+    A published snapshot is never changed again: ``FlightStore`` applies
+    a sync to a draft made by ``edit`` and then publishes the draft whole.
+    """
+
+    __slots__ = ("by_id", "by_flight_no", "by_date", "sorted_dates", "date_versions", "search_index",
+                 "oldest_date", "version")
+
+    def __init__(self) -> None:
+        self.by_id: Dict[str, Flight] = {}
+        self.by_flight_no: Dict[str, Dict[Tuple[str, str], Flight]] = {}
+        self.by_date: Dict[str, Dict[Tuple[str, str], Flight]] = {}
+        # date -> (flights sorted by time of day, their times in seconds)
+        self.sorted_dates: Dict[str, Tuple[List[Flight], List[int]]] = {}
+        self.date_versions: Dict[str, int] = {}
+        self.search_index = FlightSearchIndex()
+        self.oldest_date: Optional[str] = None
+        self.version = 0
+
+    def edit(self) -> "_Snapshot":
+        """A draft of the next snapshot. The top-level maps are copied here;
+        the buckets inside them and the trie's nodes are copied by the
+        writer as it first changes them."""
+        draft = _Snapshot.__new__(_Snapshot)
+        draft.by_id = dict(self.by_id)
+        draft.by_flight_no = dict(self.by_flight_no)
+        draft.by_date = dict(self.by_date)
+        draft.sorted_dates = dict(self.sorted_dates)
+        draft.date_versions = dict(self.date_versions)
+        draft.search_index = self.search_index.copy()
+        draft.oldest_date = self.oldest_date
+        draft.version = self.version
+        return draft
+
+class FlightStore:
+    """In-memory index over the latest DOM/INTER feed snapshots.
+
+    Flights are indexed by id, by normalized flight number, by schedule
+    date and in a prefix trie of canonical flight numbers for search. Each
+    date partition is kept sorted by time of day, with a parallel list of
+    times so that a time window is two bisects. ``sync`` applies a new
+    feed snapshot incrementally: only added, removed and changed rows touch
+    the indexes, and only the date partitions they belong to are re-sorted.
+
+    ``sync`` may run on any thread. It edits a copy of the indexes and
+    swaps it in with one assignment, and every read takes the indexes from
+    one such snapshot, so readers never see a half-applied sync and need
+    no lock.
+
+    When the day rolls over (by ``clock``, checked on every sync), partitions
+    more than ``past_days`` before the new day are dropped and not rebuilt
+    from rows that are still in the feeds, so the partitions stay bounded
+    however long the bot runs.
+    """
+
+    FEED_PRIORITY = ("D", "I")
+
+    def __init__(self, past_days: int = SCHEDULE_PAST_DAYS, clock: Callable[[], datetime] = datetime.now) -> None:
+        self.past_days = max(0, past_days)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._sources: Dict[str, List[Flight]] = {}
+        self._rows: Dict[str, Dict[str, Flight]] = {departure: {} for departure in self.FEED_PRIORITY}
+        self._snapshot = _Snapshot()
+        self._draft: Optional[_Snapshot] = None
+        # (index name, bucket key) of the buckets the draft already owns
+        self._copied: Set[Tuple[str, str]] = set()
+        self._today: Optional[str] = None
+
+    @property
+    def by_id(self) -> Dict[str, Flight]:
+        return self._snapshot.by_id
+
+    @property
+    def by_flight_no(self) -> Dict[str, Dict[Tuple[str, str], Flight]]:
+        return self._snapshot.by_flight_no
+
+    @property
+    def search_index(self) -> FlightSearchIndex:
+        return self._snapshot.search_index
+
+    @property
+    def oldest_date(self) -> Optional[str]:
+        return self._snapshot.oldest_date
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def sync(self, departure: str, flights: List[Flight]) -> bool:
+        """Load a feed snapshot; returns False when it is the one already loaded"""
+        with self._lock:
+            try:
+                self._roll_over(self.clock().strftime('%Y-%m-%d'))
+                if self._sources.get(departure) is flights:
+                    return False
+                self._sources[departure] = flights
+                old_rows = self._rows.setdefault(departure, {})
+                new_rows: Dict[str, Flight] = {}
+                for flight in flights:
+                    new_rows.setdefault(str(flight.id), flight)
+
+                dirty_dates: Set[str] = set()
+                for flight_id, flight in old_rows.items():
+                    current = new_rows.get(flight_id)
+                    if current is None or current != flight:
+                        self._remove(departure, flight_id, flight, dirty_dates)
+                for flight_id, flight in new_rows.items():
+                    previous = old_rows.get(flight_id)
+                    if previous is None or previous != flight:
+                        self._add(departure, flight_id, flight, dirty_dates)
+                    else:
+                        # Unchanged row: keep the indexed object, drop the new copy
+                        new_rows[flight_id] = previous
+                self._rows[departure] = new_rows
+
+                if dirty_dates or len(old_rows) != len(new_rows):
+                    draft = self._edit()
+                    for date in dirty_dates:
+                        bucket = draft.by_date.get(date)
+                        if bucket:
+                            keyed = sorted(((_time_key(flight), flight) for flight in bucket.values()), key=lambda item: item[0])
+                            draft.sorted_dates[date] = ([flight for _, flight in keyed], [key[0] for key, _ in keyed])
+                        else:
+                            draft.by_date.pop(date, None)
+                            draft.sorted_dates.pop(date, None)
+                    draft.version += 1
+                    for date in dirty_dates:
+                        draft.date_versions[date] = draft.version
+                logger.debug(f"Flight store synced feed {departure}: {len(new_rows)} flights, {len(dirty_dates)} dates re-sorted")
+                return True
+            finally:
+                self._publish()
+
+    def has_snapshot(self, departure: str, flights: List[Flight]) -> bool:
+        """Whether ``flights`` is the snapshot last synced for ``departure``"""
+        return self._sources.get(departure) is flights
+
+    def roll_over(self, today: str) -> int:
+        """Start the day ``today`` (YYYY-MM-DD); returns the number of partitions evicted"""
+        with self._lock:
+            try:
+                return self._roll_over(today)
+            finally:
+                self._publish()
+
+    def _edit(self) -> _Snapshot:
+        # Caller holds self._lock
+        if self._draft is None:
+            self._draft = self._snapshot.edit()
+            self._copied.clear()
+        return self._draft
+
+    def _publish(self) -> None:
+        # Caller holds self._lock
+        if self._draft is not None:
+            self._snapshot, self._draft = self._draft, None
+
+    def _bucket(self, index: Dict[str, Dict[Tuple[str, str], Flight]], name: str, key: str) -> Dict[Tuple[str, str], Flight]:
+        """The draft's own copy of ``index[key]``, created if missing"""
+        bucket = index.get(key)
+        if bucket is None or (name, key) not in self._copied:
+            bucket = index[key] = dict(bucket or ())
+            self._copied.add((name, key))
+        return bucket
+
+    def _roll_over(self, today: str) -> int:
+        # Caller holds self._lock
+        if today == self._today:
+            return 0
+        self._today = today
+        cutoff = (Date.fromisoformat(today) - timedelta(days=self.past_days)).isoformat()
+        oldest_date = self._snapshot.oldest_date
+        if oldest_date is not None and cutoff <= oldest_date:
+            return 0
+        draft = self._edit()
+        draft.oldest_date = cutoff
+        expired = [date for date in draft.by_date if date < cutoff]
+        for date in expired:
+            del draft.by_date[date]
+            draft.sorted_dates.pop(date, None)
+            draft.date_versions.pop(date, None)
+        if expired:
+            draft.version += 1
+            logger.info(f"Flight store evicted {len(expired)} date partitions before {cutoff}")
+        return len(expired)
+
+    def _add(self, departure: str, flight_id: str, flight: Flight, dirty_dates: Set[str]) -> None:
+        draft = self._edit()
+        key = (departure, flight_id)
+        owner = draft.by_id.get(flight_id)
+        if owner is None or self._priority(departure) <= self._priority(owner.departure):
+            draft.by_id[flight_id] = flight
+        self._bucket(draft.by_flight_no, "flight_no", normalize_flight_no(flight.flightno))[key] = flight
+        draft.search_index.add(key, flight)
+        date = flight.date or schedule_date(flight.schedule)
+        if date and (draft.oldest_date is None or date >= draft.oldest_date):
+            self._bucket(draft.by_date, "date", date)[key] = flight
+            dirty_dates.add(date)
+
+    def _remove(self, departure: str, flight_id: str, flight: Flight, dirty_dates: Set[str]) -> None:
+        draft = self._edit()
+        key = (departure, flight_id)
+        if draft.by_id.get(flight_id) is flight:
+            del draft.by_id[flight_id]
+            for other in self.FEED_PRIORITY:
+                fallback = self._rows.get(other, {}).get(flight_id) if other != departure else None
+                if fallback is not None:
+                    draft.by_id[flight_id] = fallback
+                    break
+        flight_no = normalize_flight_no(flight.flightno)
+        if flight_no in draft.by_flight_no:
+            bucket = self._bucket(draft.by_flight_no, "flight_no", flight_no)
+            bucket.pop(key, None)
+            if not bucket:
+                del draft.by_flight_no[flight_no]
+        draft.search_index.remove(key, flight)
+        date = flight.date or schedule_date(flight.schedule)
+        if date and date in draft.by_date:
+            self._bucket(draft.by_date, "date", date).pop(key, None)
+            dirty_dates.add(date)
+
+    def _priority(self, departure: Optional[str]) -> int:
+        return self.FEED_PRIORITY.index(departure) if departure in self.FEED_PRIORITY else len(self.FEED_PRIORITY)
+
+    def get_by_id(self, flight_id: Any) -> Optional[Flight]:
+        return self._snapshot.by_id.get(str(flight_id))
+
+    def get_by_flight_no(self, flight_no: str, date: Optional[str] = None) -> Optional[Flight]:
+        """Earliest-scheduled flight with this number, optionally on ``date``.
+        "GA 0410" and "GIA410" find GA410 too (see ``search.search_key``)."""
+        snapshot = self._snapshot
+        matches: Iterable[Flight] = snapshot.by_flight_no.get(normalize_flight_no(flight_no), {}).values()
+        if not matches:
+            matches = snapshot.search_index.exact(flight_no)
+        if date is not None:
+            matches = [f for f in matches if (f.date or schedule_date(f.schedule)) == str(date)]
+        return min(matches, key=_schedule_key, default=None)
+
+    def search(self, query: str, date: Optional[str] = None, departure: Optional[str] = None,
+               limit: int = 5) -> List[Flight]:
+        """Ranked candidates for a typed, possibly partial, flight number"""
+        return self._snapshot.search_index.search(query, date, departure, limit)
+
+    def flights_on(self, date: str) -> List[Flight]:
+        """Flights scheduled on ``date``, sorted by time of day"""
+        partition = self._snapshot.sorted_dates.get(str(date))
+        return partition[0] if partition else []
+
+    def flights_between(self, date: str, start: Optional[Time] = None, end: Optional[Time] = None) -> List[Flight]:
+        """Flights on ``date`` scheduled from ``start`` to ``end`` (both inclusive), in order.
+
+        Two bisects on the partition's times; either bound may be left open.
+        """
+        return _window(self._snapshot.sorted_dates.get(str(date)), start, end)
+
+    def flights_in_range(self, first: str, days: int = 1, start: Optional[Time] = None,
+                         end: Optional[Time] = None) -> List[Flight]:
+        """``flights_between`` for ``days`` consecutive dates from ``first``, date by date"""
+        sorted_dates = self._snapshot.sorted_dates
+        day = Date.fromisoformat(str(first))
+        flights: List[Flight] = []
+        for offset in range(max(1, days)):
+            flights.extend(_window(sorted_dates.get((day + timedelta(days=offset)).isoformat()), start, end))
+        return flights
+
+    def date_version(self, date: str) -> int:
+        """Store version at which the flights on ``date`` last changed"""
+        return self._snapshot.date_versions.get(str(date), 0)
+
+    def snapshot_by_id(self) -> Dict[str, Flight]:
+        return dict(self._snapshot.by_id)
+
+    def dates(self) -> List[str]:
+        return sorted(self._snapshot.by_date)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.by_id)
@@ -1,6 +1,13 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, Response
+from health_state import health_state
+from metrics import CONTENT_TYPE, REGISTRY
+from profiler import command_profiler, loop_watchdog
 
 app = FastAPI()
+# Metrics and profiling are only served on the admin listener (ADMIN_HOST,
+# loopback by default), never on the public health port
+admin_app = FastAPI()
 
 
 @app.get("/health")
@@ -8,3 +15,34 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+def _check_response(ok: bool, checks: dict) -> JSONResponse:
+    return JSONResponse({"status": "ok" if ok else "fail", "checks": checks}, status_code=200 if ok else 503)
+
+
+@app.get("/health/live")
+def live() -> JSONResponse:
+    """Fails when a bot thread died, the monitor loop stalled or an event loop lags"""
+    return _check_response(*health_state.liveness())
+
+
+@app.get("/health/ready")
+def ready() -> JSONResponse:
+    """Liveness, plus no feed failing for longer than HEALTH_MAX_FEED_AGE_SECONDS"""
+    return _check_response(*health_state.readiness())
+
+
+@admin_app.get("/debug/profile")
+def profile() -> dict:
+    """Per-command latency, event-loop lag and watchdog stalls"""
+    _, checks = health_state.liveness()
+    return {
+        "commands": command_profiler.summary(),
+        "loop_lag": checks["loop_lag"],
+        "profiling": command_profiler.enabled,
+        "blocked_loop_stalls": loop_watchdog.stalls,
+    }
+
+
+@admin_app.get("/metrics")
+def metrics() -> Response:
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
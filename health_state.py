@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from config import HEALTH_MAX_FEED_AGE_SECONDS, HEALTH_MAX_LOOP_LAG_SECONDS, HEALTH_MAX_TICK_AGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_PROBE_SECONDS = 1.0
+
+def _timestamp(wall: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(wall).isoformat(timespec="seconds") if wall is not None else None
+
+class _FeedHealth:
+    __slots__ = ("last_success", "last_success_wall", "last_failure", "consecutive_failures")
+
+    def __init__(self) -> None:
+        self.last_success: Optional[float] = None
+        self.last_success_wall: Optional[float] = None
+        self.last_failure: Optional[float] = None
+        self.consecutive_failures = 0
+
+class HealthState:
+    """Heartbeats from the bot's threads, judged by /health/live and /health/ready.
+
+    Live: the registered threads are running, the monitor loop completed an
+    iteration recently and no event loop is lagging. Ready: live, and no feed
+    has been failing for longer than the allowed age of its last good load.
+    Feeds are only fetched on demand, so an idle feed is never held against
+    readiness; only failures are.
+    """
+
+    def __init__(self, max_tick_age: float = HEALTH_MAX_TICK_AGE_SECONDS,
+                 max_feed_age: float = HEALTH_MAX_FEED_AGE_SECONDS,
+                 max_loop_lag: float = HEALTH_MAX_LOOP_LAG_SECONDS) -> None:
+        self.max_tick_age = max_tick_age
+        self.max_feed_age = max_feed_age
+        self.max_loop_lag = max_loop_lag
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._last_tick: Optional[float] = None
+        self._last_tick_wall: Optional[float] = None
+        self._feeds: Dict[str, _FeedHealth] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._loop_lag: Dict[str, Tuple[float, float]] = {}  # name -> (lag, measured at)
+
+    def record_tick(self) -> None:
+        self._last_tick = time.monotonic()
+        self._last_tick_wall = time.time()
+
+    def record_feed(self, feed: str, ok: bool) -> None:
+        with self._lock:
+            health = self._feeds.get(feed)
+            if health is None:
+                health = self._feeds[feed] = _FeedHealth()
+            if ok:
+                health.last_success = time.monotonic()
+                health.last_success_wall = time.time()
+                health.consecutive_failures = 0
+            else:
+                health.last_failure = time.monotonic()
+                health.consecutive_failures += 1
+
+    def register_thread(self, name: str, thread: threading.Thread) -> None:
+        self._threads[name] = thread
+
+    async def watch_loop_lag(self, name: str, interval: float = LOOP_LAG_PROBE_SECONDS) -> None:
+        """Run on an event loop: how late do sleeps wake up on it?"""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self._loop_lag[name] = (max(0.0, loop.time() - started - interval), time.monotonic())
+
+    def _tick_check(self, now: float) -> Dict[str, Any]:
+        reference = self._last_tick if self._last_tick is not None else self.started
+        age = now - reference
+        return {
+            "ok": age <= self.max_tick_age,
+            "last_tick_at": _timestamp(self._last_tick_wall),
+            "age_seconds": round(age, 3),
+            "max_age_seconds": self.max_tick_age,
+        }
+
+    def _thread_checks(self) -> Dict[str, Any]:
+        return {name: {"ok": thread.is_alive(), "alive": thread.is_alive()} for name, thread in list(self._threads.items())}
+
+    def _lag_checks(self, now: float) -> Dict[str, Any]:
+        checks = {}
+        for name, (lag, measured_at) in list(self._loop_lag.items()):
+            # A probe that has not reported for a while is itself a lagging loop
+            effective = max(lag, now - measured_at - LOOP_LAG_PROBE_SECONDS)
+            checks[name] = {"ok": effective <= self.max_loop_lag, "lag_seconds": round(effective, 3),
+                            "max_lag_seconds": self.max_loop_lag}
+        return checks
+
+    def _feed_checks(self, now: float) -> Dict[str, Any]:
+        checks = {}
+        with self._lock:
+            for feed, health in self._feeds.items():
+                reference = health.last_success if health.last_success is not None else self.started
+                failing = health.last_failure is not None and (health.last_success is None or health.last_failure > health.last_success)
+                age = now - reference
+                checks[feed] = {
+                    "ok": not (failing and age > self.max_feed_age),
+                    "last_success_at": _timestamp(health.last_success_wall),
+                    "age_seconds": round(age, 3) if health.last_success is not None else None,
+                    "consecutive_failures": health.consecutive_failures,
+                    "max_age_seconds": self.max_feed_age,
+                }
+        return checks
+
+    def liveness(self) -> Tuple[bool, Dict[str, Any]]:
+        now = time.monotonic()
+        checks = {"monitor_tick": self._tick_check(now), "threads": self._thread_checks(), "loop_lag": self._lag_checks(now)}
+        ok = checks["monitor_tick"]["ok"] and all(check["ok"] for group in ("threads", "loop_lag") for check in checks[group].values())
+        return ok, checks
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        ok, checks = self.liveness()
+        checks["feeds"] = self._feed_checks(time.monotonic())
+        return ok and all(check["ok"] for check in checks["feeds"].values()), checks
+
+health_state = HealthState()
@@ -1,4 +1,6 @@
-from typing import Dict, Any
+from datetime import date
+from string import Formatter
+from typing import Dict, Any, Tuple
 
 TRANSLATIONS = {
     'en': {
@@ -14,6 +16,8 @@ TRANSLATIONS = {
         'indonesian': 'Bahasa Indonesia',
 
         'schedule': '📅 Schedule',
+        'schedule_tomorrow': '📅 Tomorrow',
+        'schedule_next_days': '🗓️ Next {days} days',
         'search_flight': '🔍 Search Flight',
         'back_to_menu': '🏠 Back to Menu',
         'start_monitoring': 'Start Monitoring 🔔',
@@ -34,7 +38,7 @@ TRANSLATIONS = {
         'monitoring_started': '✅ You are now monitoring flight {flight_no}!',
         'current_status': '📊 Current Status:',
         'monitoring_notifications': '🔔 You will receive notifications when the status or timing changes.',
-        'monitoring_interval': '💡 Monitoring system will check for updates every 10 seconds.',
+        'monitoring_interval': '💡 Monitoring system checks for updates more often as departure gets closer.',
         'monitoring_stopped': '🚫 You have stopped monitoring flight {flight_no}.',
         'can_use_commands': '✅ You can now use all bot commands again. Type /start to begin.',
 
@@ -47,11 +51,13 @@ TRANSLATIONS = {
         'status_boarding': '🎫',
         'status_checkin': '📋',
 
-        'currently_monitoring': '⚠️ You are currently monitoring a flight. Please stop monitoring first using /stop_monitor before using other commands.',
         'select_flight_type_first': '❌ You need to select a flight type first! Please choose from Domestic or International by typing /start.',
         'incorrect_format': '❌ Incorrect format!',
         'use_flight_format': 'Use: /flight [Flight_Code]',
+        'use_schedule_format': 'Use: /schedule [YYYY-MM-DD | today | tomorrow | 2-{days}days] [HH:MM-HH:MM]',
         'flight_not_found': '❌ Flight {flight_code} not found for today ({date}).',
+        'did_you_mean': '🔎 Flight {flight_code} not found for today ({date}). Did you mean:',
+        'inline_open_bot': '✈️ Type a flight number, or open the bot',
         'no_flights_found': '❌ No {flight_type} flights found on {date}.',
         'check_flight_type': 'Please check the flight type or try again later.',
         'error_loading_schedules': '❌ Error loading flight schedules. Please try again.',
@@ -67,6 +73,9 @@ TRANSLATIONS = {
         'search_again': '🔍 Search Again',
 
         'flight_schedules': '📅 Flight Schedules {date}',
+        'page_indicator': '📄 Page {page} of {pages}',
+        'previous_page': '◀️ Previous',
+        'next_page': 'Next ▶️',
         'no_flights_type': '❌ No flights of type {flight_type} on {date}.',
 
         'flight_update_alert': '🚨 Flight Update Alert!',
@@ -120,6 +129,8 @@ TRANSLATIONS = {
         'indonesian': 'Bahasa Indonesia',
 
         'schedule': '📅 Jadwal',
+        'schedule_tomorrow': '📅 Besok',
+        'schedule_next_days': '🗓️ {days} hari ke depan',
         'search_flight': '🔍 Cari Penerbangan',
         'back_to_menu': '🏠 Kembali ke Menu',
         'start_monitoring': 'Mulai Pantau 🔔',
@@ -140,7 +151,7 @@ TRANSLATIONS = {
         'monitoring_started': '✅ Anda sekarang memantau penerbangan {flight_no}!',
         'current_status': '📊 Status Saat Ini:',
         'monitoring_notifications': '🔔 Anda akan menerima notifikasi ketika status atau waktu berubah.',
-        'monitoring_interval': '💡 Sistem pemantauan akan memeriksa pembaruan setiap 10 detik.',
+        'monitoring_interval': '💡 Sistem pemantauan akan memeriksa pembaruan lebih sering menjelang keberangkatan.',
         'monitoring_stopped': '🚫 Anda telah menghentikan pemantauan penerbangan {flight_no}.',
         'can_use_commands': '✅ Anda sekarang dapat menggunakan semua perintah bot lagi. Ketik /start untuk memulai.',
 
@@ -153,11 +164,13 @@ TRANSLATIONS = {
         'status_boarding': '🎫',
         'status_checkin': '📋',
 
-        'currently_monitoring': '⚠️ Anda sedang memantau penerbangan. Silakan hentikan pemantauan terlebih dahulu menggunakan /stop_monitor sebelum menggunakan perintah lain.',
         'select_flight_type_first': '❌ Anda perlu memilih jenis penerbangan terlebih dahulu! Silakan pilih Domestik atau Internasional dengan mengetik /start.',
         'incorrect_format': '❌ Format tidak benar!',
         'use_flight_format': 'Gunakan: /flight [Kode_Penerbangan]',
+        'use_schedule_format': 'Gunakan: /schedule [YYYY-MM-DD | hariini | besok | 2-{days}hari] [JJ:MM-JJ:MM]',
         'flight_not_found': '❌ Penerbangan {flight_code} tidak ditemukan untuk hari ini ({date}).',
+        'did_you_mean': '🔎 Penerbangan {flight_code} tidak ditemukan untuk hari ini ({date}). Mungkin maksud Anda:',
+        'inline_open_bot': '✈️ Ketik nomor penerbangan, atau buka bot',
         'no_flights_found': '❌ Tidak ada penerbangan {flight_type} ditemukan pada {date}.',
         'check_flight_type': 'Silakan periksa jenis penerbangan atau coba lagi nanti.',
         'error_loading_schedules': '❌ Gagal memuat jadwal penerbangan. Silakan coba lagi.',
@@ -173,6 +186,9 @@ TRANSLATIONS = {
         'search_again': '🔍 Cari Lagi',
 
         'flight_schedules': '📅 Jadwal Penerbangan {date}',
+        'page_indicator': '📄 Halaman {page} dari {pages}',
+        'previous_page': '◀️ Sebelumnya',
+        'next_page': 'Berikutnya ▶️',
         'no_flights_type': '❌ Tidak ada penerbangan jenis {flight_type} pada {date}.',
 
         'flight_update_alert': '🚨 Peringatan Pembaruan Penerbangan!',
@@ -214,15 +230,52 @@ TRANSLATIONS = {
     }
 }
 
+class Template:
+    """One translated string, parsed once: text without placeholders is
+    returned as is, the rest goes through the bound ``str.format``"""
+
+    __slots__ = ("text", "fields", "_format")
+
+    def __init__(self, text: str) -> None:
+        try:
+            self.fields = frozenset(name for _, name, _, _ in Formatter().parse(text) if name is not None)
+        except ValueError:
+            self.fields = frozenset()
+        if self.fields:
+            self.text = text
+            self._format = text.format
+        else:
+            try:
+                self.text = text.format()
+            except (KeyError, ValueError):
+                self.text = text
+            self._format = None
+
+    def render(self, kwargs: Dict[str, Any]) -> str:
+        if self._format is None:
+            return self.text
+        try:
+            return self._format(**kwargs)
+        except (KeyError, ValueError):
+            return self.text
+
+def _compile_templates() -> Dict[str, Dict[str, Template]]:
+    english = {key: Template(text) for key, text in TRANSLATIONS['en'].items()}
+    compiled = {'en': english}
+    for language, texts in TRANSLATIONS.items():
+        if language != 'en':
+            # Missing keys fall back to English, resolved here instead of per call
+            compiled[language] = {**english, **{key: Template(text) for key, text in texts.items()}}
+    return compiled
+
+TEMPLATES = _compile_templates()
+
 def get_text(key: str, language: str = 'en', **kwargs) -> str:
     """Get translated text for a given key and language"""
-    if language not in TRANSLATIONS:
-        language = 'en'
-    text = TRANSLATIONS[language].get(key, TRANSLATIONS['en'].get(key, key))
-    try:
-        return text.format(**kwargs)
-    except (KeyError, ValueError):
-        return text
+    template = TEMPLATES.get(language, TEMPLATES['en']).get(key)
+    if template is None:
+        return key
+    return template.render(kwargs)
 
 def get_status_emoji(status: str) -> str:
     """Get emoji for flight status"""
@@ -256,3 +309,15 @@ def get_month_names(language: str = 'en') -> Dict[str, str]:
             'October': 'Oktober', 'November': 'November', 'December': 'Desember'
         }
     return {}
+
+_ENGLISH_MONTHS = ('January', 'February', 'March', 'April', 'May', 'June',
+                   'July', 'August', 'September', 'October', 'November', 'December')
+_MONTHS: Dict[str, Tuple[str, ...]] = {
+    language: tuple(get_month_names(language).get(month, month) for month in _ENGLISH_MONTHS)
+    for language in TRANSLATIONS
+}
+
+def format_long_date(day: date, language: str = 'en') -> str:
+    """'05 March 2025', with the month name in the given language"""
+    months = _MONTHS.get(language, _ENGLISH_MONTHS)
+    return f"{day.day:02d} {months[day.month - 1]} {day.year}"
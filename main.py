@@ -1,17 +1,29 @@
 import logging
 import asyncio
+import contextlib
+import signal
 import threading
 import time
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 from uvicorn import Config, Server
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler
-from flight_handler import (start, flight_info, schedule_info, button, stop_monitor, monitor_flight_status, debug_monitor, test_notification, should_exit, change_language)
-from config import BOT_TOKEN, LOG_LEVEL
-from health import app as health_app
+from telegram import Update
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, InlineQueryHandler
+import flight_handler
+from flight_handler import (start, flight_info, schedule_info, button, stop_monitor, monitor_flight_status, debug_monitor, test_notification, should_exit, change_language, inline_query,
+                            open_subscription_store, close_subscription_store)
+from config import (ADMIN_HOST, ADMIN_PORT, BOT_TOKEN, HEALTH_PORT, LOG_LEVEL, SINGLE_LOOP, USE_UVLOOP, WEBHOOK_BATCH_SIZE,
+                    WEBHOOK_SECRET_TOKEN, WEBHOOK_URL, WEBHOOK_WORKERS)
+from health import admin_app, app as health_app
+from health_state import health_state
+from profiler import watch_loop
+from webhook import WebhookIngress
 
 load_dotenv()
 if BOT_TOKEN is None:
     raise ValueError("BOT_TOKEN environment variable is not set.")
+if WEBHOOK_URL and not WEBHOOK_SECRET_TOKEN:
+    raise ValueError("WEBHOOK_SECRET_TOKEN environment variable must be set when WEBHOOK_URL is.")
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -31,16 +43,12 @@ def run_monitoring_loop(application):
     finally:
         loop.close()
 
-def run_health_server():
-    config = Config(app=health_app, host="0.0.0.0", port=8000, log_level=LOG_LEVEL.lower())
-    server = Server(config)
-    asyncio.run(server.serve())
-
-
-def main():
-    logger.info("Starting Flight Bot...")
+async def start_polling_lag_probe(application):
+    """post_init hook: measure event-loop lag on the polling loop for /health/live"""
+    application.create_task(health_state.watch_loop_lag("polling"))
+    watch_loop("polling")
 
-    application = Application.builder().token(BOT_TOKEN).build()
+def register_handlers(application):
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("flight", flight_info))
     application.add_handler(CommandHandler("schedule", schedule_info))
@@ -49,6 +57,162 @@ def main():
     application.add_handler(CommandHandler("test", test_notification))
     application.add_handler(CommandHandler("language", change_language))
     application.add_handler(CallbackQueryHandler(button))
+    application.add_handler(InlineQueryHandler(inline_query))
+
+def run_health_server():
+    """Serve the public health app and the loopback admin app from one thread"""
+    servers = [
+        Server(Config(app=health_app, host="0.0.0.0", port=HEALTH_PORT, log_level=LOG_LEVEL.lower())),
+        Server(Config(app=admin_app, host=ADMIN_HOST, port=ADMIN_PORT, log_level=LOG_LEVEL.lower())),
+    ]
+
+    async def serve():
+        watch_loop("health")
+        await asyncio.gather(*(server.serve() for server in servers))
+
+    asyncio.run(serve())
+
+class EmbeddedServer(Server):
+    """uvicorn server that leaves SIGINT/SIGTERM to the bot's own shutdown"""
+
+    @contextlib.contextmanager
+    def capture_signals(self):
+        yield
+
+class EmbeddedServers:
+    """The public health app (and webhook) on ``port`` and the admin app
+    (metrics, profiling) on ``admin_port``, served together"""
+
+    def __init__(self, port=HEALTH_PORT, admin_port=ADMIN_PORT):
+        self.servers = [
+            EmbeddedServer(Config(app=health_app, host="0.0.0.0", port=port, log_level=LOG_LEVEL.lower())),
+            EmbeddedServer(Config(app=admin_app, host=ADMIN_HOST, port=admin_port, log_level=LOG_LEVEL.lower())),
+        ]
+
+    async def serve(self):
+        await asyncio.gather(*(server.serve() for server in self.servers))
+
+    def stop(self):
+        for server in self.servers:
+            server.should_exit = True
+
+def on_stop_signals(callback):
+    """Call ``callback`` on SIGINT/SIGTERM; only possible on the main thread"""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(stop_signal, callback)
+
+async def start_webhook(application, webhook_url):
+    """Mount the webhook endpoint on the health app, start its workers and register it with Telegram"""
+    ingress = WebhookIngress(application, WEBHOOK_WORKERS, WEBHOOK_BATCH_SIZE, WEBHOOK_SECRET_TOKEN)
+    ingress.mount(health_app, urlparse(webhook_url).path or "/")
+    await ingress.start()
+    await application.bot.set_webhook(webhook_url, secret_token=WEBHOOK_SECRET_TOKEN, allowed_updates=Update.ALL_TYPES)
+    return ingress
+
+async def run_webhook(application, webhook_url=WEBHOOK_URL, port=HEALTH_PORT, admin_port=ADMIN_PORT):
+    """Webhook mode: Telegram POSTs updates to the health server, and the bot
+    handles them on the same event loop; no polling or health thread"""
+    server = EmbeddedServers(port, admin_port)
+    on_stop_signals(server.stop)
+
+    async def stop_on_exit_flag():
+        while not flight_handler.should_exit:
+            await asyncio.sleep(1)
+        server.stop()
+
+    await application.initialize()
+    await application.start()
+    ingress = await start_webhook(application, webhook_url)
+    lag_probe = asyncio.ensure_future(health_state.watch_loop_lag("webhook"))
+    watch_loop("webhook")
+    exit_watch = asyncio.ensure_future(stop_on_exit_flag())
+    try:
+        await server.serve()
+    finally:
+        exit_watch.cancel()
+        lag_probe.cancel()
+        await ingress.stop()
+        await application.stop()
+        await application.shutdown()
+
+async def run_single_loop(application, webhook_url=WEBHOOK_URL, port=HEALTH_PORT, stop=None, admin_port=ADMIN_PORT):
+    """Single-loop runtime: updates (polling or webhook), the monitor and the
+    health server run as tasks on one event loop, so bot state is only ever
+    touched from one thread.
+
+    ``stop`` ends the runtime. It is set by SIGINT/SIGTERM, by the monitor
+    once nobody is monitoring, by the health server exiting, or by the caller.
+    Shutdown goes in order: stop taking updates, finish the queued ones, let
+    the monitor deliver its pending notifications, then stop the bot.
+    """
+    stop = stop or asyncio.Event()
+    on_stop_signals(stop.set)
+    server = EmbeddedServers(port, admin_port)
+
+    await application.initialize()
+    await application.start()
+    ingress = None
+    if webhook_url:
+        ingress = await start_webhook(application, webhook_url)
+    else:
+        await application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
+    lag_probe = asyncio.ensure_future(health_state.watch_loop_lag("main"))
+    watch_loop("main")
+    monitor = asyncio.ensure_future(monitor_flight_status(application, stop))
+    serving = asyncio.ensure_future(server.serve())
+    for task in (monitor, serving):
+        task.add_done_callback(lambda _: stop.set())
+    logger.info("All systems running on one event loop")
+
+    await stop.wait()
+    logger.info("Shutting down...")
+    try:
+        if application.updater is not None and application.updater.running:
+            await application.updater.stop()
+        server.stop()
+        await serving
+        if ingress is not None:
+            await ingress.stop()
+        try:
+            await monitor
+        except Exception as e:
+            logger.error(f"Monitoring loop error: {e}")
+    finally:
+        lag_probe.cancel()
+        await application.stop()
+        await application.shutdown()
+
+def run_event_loop(main_coroutine):
+    """asyncio.run, on uvloop when USE_UVLOOP is set and uvloop is installed"""
+    loop_factory = None
+    if USE_UVLOOP:
+        try:
+            import uvloop
+            loop_factory = uvloop.new_event_loop
+        except ImportError:
+            logger.warning("USE_UVLOOP is set but uvloop is not installed; using the default event loop")
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        return runner.run(main_coroutine)
+
+def main():
+    logger.info("Starting Flight Bot...")
+
+    application = Application.builder().token(BOT_TOKEN).post_init(start_polling_lag_probe).build()
+    register_handlers(application)
+
+    open_subscription_store()
+
+    if SINGLE_LOOP:
+        try:
+            run_event_loop(run_single_loop(application))
+        finally:
+            logger.info("Bot shutting down...")
+            close_subscription_store()
+        return
 
     logger.info("Starting flight monitoring thread...")
     monitoring_thread = threading.Thread(
@@ -57,6 +221,18 @@ def main():
         daemon=True
     )
     monitoring_thread.start()
+    health_state.register_thread("monitor", monitoring_thread)
+
+    if WEBHOOK_URL:
+        logger.info(f"🪝 Receiving updates by webhook at {WEBHOOK_URL}")
+        try:
+            run_event_loop(run_webhook(application))
+        except Exception as e:
+            logger.error(f"Webhook server error: {e}")
+        finally:
+            logger.info("Bot shutting down...")
+            close_subscription_store()
+        return
 
     logger.info("🩺 Starting health server thread...")
     health_thread = threading.Thread(target=run_health_server, daemon=True)
@@ -86,6 +262,7 @@ def main():
             daemon=True
         )
         polling_thread.start()
+        health_state.register_thread("polling", polling_thread)
         while not should_exit:
             time.sleep(1)
         logger.info("Exit flag detected. Shutting down gracefully...")
@@ -96,6 +273,7 @@ def main():
         logger.error(f"Bot error: {e}")
     finally:
         logger.info("Bot shutting down...")
+        close_subscription_store()
         print("Program has completely stopped. Please restart with /start to begin again.")
 
 if __name__ == '__main__':
@@ -0,0 +1,230 @@
+import bisect
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if not math.isfinite(value):
+        return "NaN" if math.isnan(value) else ("+Inf" if value > 0 else "-Inf")
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+class _Metric:
+    """Base for a metric family; ``labels`` returns the child for one label set.
+
+    Children are cached, so hot paths pay one dict lookup plus a short
+    critical section per update.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> "_Metric":
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1) -> None:
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        with self._lock:
+            self.value += amount
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        for values, child in list(self._children.items()):
+            yield "_total", _format_labels(self.labelnames, values), child.value
+        if not self.labelnames and not self._children:
+            yield "_total", "", self.value
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation)
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the value at scrape time instead of tracking it"""
+        self._function = function
+
+    def get(self) -> float:
+        if self._function is None:
+            return self.value
+        try:
+            return float(self._function())
+        except Exception as e:
+            logger.warning(f"Could not compute gauge {self.name}: {e}")
+            return math.nan
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        if self.labelnames:
+            for values, child in list(self._children.items()):
+                yield "", _format_labels(self.labelnames, values), child.get()
+        else:
+            yield "", "", self.get()
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+        self._counts = [0] * (len(self.upper_bounds) + 1)
+        self._sum = 0.0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self) -> "_Timer":
+        return _Timer(self)
+
+    def _child_samples(self, names: Sequence[str], labels: Sequence[str]) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = 0
+        for bound, count in zip(self.upper_bounds + (math.inf,), counts):
+            cumulative += count
+            yield "_bucket", _format_labels(names, labels, (("le", _format_value(bound)),)), cumulative
+        yield "_sum", _format_labels(names, labels), total
+        yield "_count", _format_labels(names, labels), cumulative
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        if not self.labelnames:
+            yield from self._child_samples((), ())
+            return
+        for values, child in list(self._children.items()):
+            yield from child._child_samples(self.labelnames, values)
+
+class _Timer:
+    __slots__ = ("_histogram", "_started")
+
+    def __init__(self, histogram: Histogram) -> None:
+        self._histogram = histogram
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._histogram.observe(time.perf_counter() - self._started)
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+UPSTREAM_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "flightbot_upstream_fetch_seconds", "Time to fetch one upstream feed.", ("feed", "result"),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+))
+MONITOR_TICK_SECONDS = REGISTRY.register(Histogram(
+    "flightbot_monitor_tick_seconds", "Duration of monitor ticks that checked at least one flight.",
+))
+HANDLER_SECONDS = REGISTRY.register(Histogram(
+    "flightbot_handler_seconds", "Duration of Telegram handlers and monitor ticks, by name.", ("handler",),
+))
+NOTIFICATION_SEND_SECONDS = REGISTRY.register(Histogram(
+    "flightbot_notification_send_seconds", "Time to deliver one notification, including rate-limit waits.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+))
+TELEGRAM_ERRORS = REGISTRY.register(Counter(
+    "flightbot_telegram_errors", "Telegram API calls that raised, by method and error type.", ("method", "error"),
+))
+FEED_CACHE_REQUESTS = REGISTRY.register(Gauge(
+    "flightbot_feed_cache_requests", "Feed cache lookups since start, by outcome.", ("result",),
+))
+FEED_CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "flightbot_feed_cache_hit_ratio", "Share of feed cache lookups served without waiting for the upstream.",
+))
+ACTIVE_SUBSCRIPTIONS = REGISTRY.register(Gauge(
+    "flightbot_active_subscriptions", "User subscriptions being monitored.",
+))
+WATCHED_FLIGHTS = REGISTRY.register(Gauge(
+    "flightbot_watched_flights", "Distinct flights being monitored.",
+))
@@ -0,0 +1,147 @@
+import sys
+from datetime import datetime
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Dict, Optional, Tuple
+
+_SCHEDULE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d")
+_TIME_FORMATS = ("%H:%M:%S", "%H:%M")
+
+_intern = sys.intern
+
+def _parse_datetime(text: str, formats: Tuple[str, ...]) -> Optional[datetime]:
+    for fmt in formats:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+def parse_schedule(value: Any) -> Optional[datetime]:
+    if not value or not isinstance(value, str):
+        return None
+    return _parse_datetime(value.strip(), _SCHEDULE_FORMATS)
+
+def parse_estimate(value: Any, schedule_at: Optional[datetime]) -> Optional[datetime]:
+    """Parse an estimate, which is either a full timestamp or a time on the scheduled day"""
+    parsed = parse_schedule(value)
+    if parsed is not None or not value or not isinstance(value, str) or schedule_at is None:
+        return parsed
+    clock = _parse_datetime(value.strip(), _TIME_FORMATS)
+    if clock is None:
+        return None
+    return schedule_at.replace(hour=clock.hour, minute=clock.minute, second=clock.second)
+
+@lru_cache(maxsize=16384)
+def _parse_times(schedule: Any, estimate: Any) -> Tuple[Optional[datetime], Optional[datetime], Optional[str]]:
+    """(schedule_at, estimate_at, YYYY-MM-DD); the same strings recur every refresh"""
+    schedule_at = parse_schedule(schedule)
+    estimate_at = parse_estimate(estimate, schedule_at)
+    return schedule_at, estimate_at, schedule_at.strftime("%Y-%m-%d") if schedule_at else None
+
+class Flight:
+    """One normalized row from the DOM or INTER feed.
+
+    Repeated strings (operator, status, route, gate) are interned
+    so that thousands of rows refreshed every few seconds share one copy, and
+    schedule/estimate are parsed once when the row is built.
+    """
+
+    __slots__ = (
+        "id", "operator", "schedule", "estimate", "flightno", "gatenumber",
+        "flightstat", "fromtolocation", "departure", "schedule_at", "estimate_at", "date",
+    )
+
+    FIELDS = ("id", "operator", "schedule", "estimate", "flightno", "gatenumber", "flightstat", "fromtolocation", "departure")
+    # Every sync compares each row with its previous copy; attrgetter builds the tuple in C
+    _values = attrgetter(*FIELDS)
+
+    def __init__(self, id: Any, operator: Any, schedule: Any, estimate: Any, flightno: Any,
+                 gatenumber: Any, flightstat: Any, fromtolocation: Any, departure: str) -> None:
+        self.id = id
+        self.operator = _intern(operator) if type(operator) is str else operator
+        self.schedule = schedule
+        self.estimate = estimate
+        self.flightno = flightno
+        self.gatenumber = _intern(gatenumber) if type(gatenumber) is str else gatenumber
+        self.flightstat = _intern(flightstat) if type(flightstat) is str else flightstat
+        self.fromtolocation = _intern(fromtolocation) if type(fromtolocation) is str else fromtolocation
+        self.departure = departure
+        try:
+            self.schedule_at, self.estimate_at, self.date = _parse_times(schedule, estimate)
+        except TypeError:  # unhashable value in the feed
+            self.schedule_at = self.estimate_at = self.date = None
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any], departure: str) -> "Flight":
+        return cls(
+            raw.get("id"),
+            raw.get("operator"),
+            raw.get("schedule"),
+            raw.get("estimate"),
+            raw.get("flightno"),
+            raw.get("gatenumber"),
+            raw.get("flightstat"),
+            raw.get("fromtolocation"),
+            departure,
+        )
+
+    def values(self) -> tuple:
+        return Flight._values(self)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(zip(self.FIELDS, self.values()))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Flight):
+            return NotImplemented
+        return Flight._values(self) == Flight._values(other)
+
+    __hash__ = None  # mutable record
+
+    def __repr__(self) -> str:
+        return f"Flight({self.flightno!r}, id={self.id!r}, departure={self.departure!r}, status={self.flightstat!r})"
+
+class Subscription:
+    """One user's watch on one flight: their language and notification state"""
+
+    __slots__ = ("flight_id", "flight_no", "language", "subscribed_at", "notification_count",
+                 "last_message_id", "missing_notified", "final_notified")
+
+    def __init__(self, flight_id: str, flight_no: Any, language: str) -> None:
+        self.flight_id = flight_id
+        self.flight_no = flight_no
+        self.language = language
+        self.subscribed_at = datetime.now()
+        self.notification_count = 0
+        self.last_message_id: Optional[int] = None
+        self.missing_notified = False
+        self.final_notified = False
+
+    @classmethod
+    def for_flight(cls, flight: Flight, language: str) -> "Subscription":
+        return cls(flight_id=str(flight.id), flight_no=flight.flightno, language=language)
+
+    def as_row(self, user_id: Any) -> tuple:
+        """Storage row, see subscription_store.SCHEMA"""
+        return (user_id, self.flight_id, self.flight_no, self.language, self.subscribed_at.isoformat(),
+                self.notification_count, self.last_message_id, int(self.missing_notified), int(self.final_notified))
+
+    @classmethod
+    def from_row(cls, row: tuple) -> Tuple[Any, "Subscription"]:
+        """(user id, subscription) from a storage row"""
+        user_id, flight_id, flight_no, language, subscribed_at, count, last_message_id, missing, final = row
+        subscription = cls(flight_id, flight_no, language or "en")
+        if subscribed_at:
+            try:
+                subscription.subscribed_at = datetime.fromisoformat(subscribed_at)
+            except ValueError:
+                pass
+        subscription.notification_count = count or 0
+        subscription.last_message_id = last_message_id
+        subscription.missing_notified = bool(missing)
+        subscription.final_notified = bool(final)
+        return user_id, subscription
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
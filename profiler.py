@@ -0,0 +1,145 @@
+import asyncio
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+from config import PROFILE_SLOW_SECONDS, PROFILING
+from metrics import HANDLER_SECONDS
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+class LatencyStats:
+    """Count, mean and max since start, percentiles over the most recent samples"""
+
+    def __init__(self, window: int = 1024) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            self._recent.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            recent = sorted(self._recent)
+            count, total, peak = self.count, self.total, self.max
+
+        def percentile(share: float) -> float:
+            return recent[min(len(recent) - 1, int(len(recent) * share))] if recent else 0.0
+
+        return {
+            "count": count,
+            "mean_ms": round(total / count * 1000, 2) if count else 0.0,
+            "p50_ms": round(percentile(0.50) * 1000, 2),
+            "p95_ms": round(percentile(0.95) * 1000, 2),
+            "max_ms": round(peak * 1000, 2),
+        }
+
+class CommandProfiler:
+    """Per-command latency stats, plus slow-call logging in profiling mode"""
+
+    def __init__(self, slow_seconds: float = PROFILE_SLOW_SECONDS, enabled: bool = PROFILING) -> None:
+        self.slow_seconds = slow_seconds
+        self.enabled = enabled
+        self._stats: Dict[str, LatencyStats] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats.setdefault(name, LatencyStats())
+        stats.record(seconds)
+        HANDLER_SECONDS.labels(name).observe(seconds)
+        if self.enabled and seconds > self.slow_seconds:
+            logger.warning(f"Slow {name}: {seconds * 1000:.0f} ms (threshold {self.slow_seconds * 1000:.0f} ms)")
+
+    def profiled(self, name: str) -> Callable[[F], F]:
+        """Decorator for async handlers"""
+        def decorate(handler: F) -> F:
+            @functools.wraps(handler)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await handler(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - started)
+            return wrapper  # type: ignore[return-value]
+        return decorate
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: stats.summary() for name, stats in sorted(self._stats.items())}
+
+class LoopWatchdog:
+    """Logs the stack of any event loop that stops turning for longer than the threshold.
+
+    Each watched loop runs a heartbeat task. A daemon thread checks the
+    heartbeats; when one is overdue, whatever the loop's thread is executing
+    right now is the blocking callback, so its stack is logged once per stall.
+    """
+
+    def __init__(self, threshold: float = PROFILE_SLOW_SECONDS) -> None:
+        self.threshold = threshold
+        self._beats: Dict[str, List[Any]] = {}  # name -> [thread id, last beat, reported]
+        self._thread: Optional[threading.Thread] = None
+        self.stalls = 0
+
+    async def watch(self, name: str) -> None:
+        """Run as a task on the loop to watch"""
+        self._ensure_thread()
+        beat = self._beats[name] = [threading.get_ident(), time.monotonic(), False]
+        interval = self.threshold / 4
+        try:
+            while True:
+                beat[1] = time.monotonic()
+                beat[2] = False
+                await asyncio.sleep(interval)
+        finally:
+            self._beats.pop(name, None)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="loop-watchdog", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.threshold / 4)
+            now = time.monotonic()
+            for name, beat in list(self._beats.items()):
+                thread_id, last_beat, reported = beat
+                stalled = now - last_beat
+                if reported or stalled <= self.threshold:
+                    continue
+                beat[2] = True
+                self.stalls += 1
+                frame = sys._current_frames().get(thread_id)
+                stack = "".join(traceback.format_stack(frame)) if frame is not None else "(thread gone)\n"
+                logger.warning(f"Event loop '{name}' blocked for {stalled * 1000:.0f} ms+, currently at:\n{stack}")
+
+command_profiler = CommandProfiler()
+loop_watchdog = LoopWatchdog()
+_watch_tasks = set()  # the loop only keeps weak references to tasks
+
+def profiled(name: str) -> Callable[[F], F]:
+    return command_profiler.profiled(name)
+
+def watch_loop(name: str) -> Optional["asyncio.Task"]:
+    """In profiling mode, start the watchdog heartbeat on the running loop"""
+    if not PROFILING:
+        return None
+    task = asyncio.get_running_loop().create_task(loop_watchdog.watch(name))
+    _watch_tasks.add(task)
+    task.add_done_callback(_watch_tasks.discard)
+    return task
@@ -0,0 +1,182 @@
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+from config import SCHEDULE_PAGE_SIZE
+from language import TEMPLATES, format_long_date, get_status_emoji, get_text
+from models import Flight
+
+class RenderCache:
+    """Bounded LRU of rendered message bodies (or other values built from them).
+
+    Keys include the version of the data a body was rendered from, so entries
+    never need invalidating: superseded versions just age out. Shared by the
+    polling and monitor threads.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get_or_render(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return text
+            self._stats["misses"] += 1
+        text = render()
+        with self._lock:
+            self._entries[key] = text
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return text
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
+
+render_cache = RenderCache()
+
+def _status_key(flight: Flight) -> tuple:
+    return (flight.id, flight.flightno, flight.schedule, flight.estimate, flight.gatenumber,
+            flight.flightstat, flight.fromtolocation)
+
+def _status_body(flight: Flight, changes: Optional[Sequence[str]], language: str) -> str:
+    parts = [
+        f"✈️ {get_text('flight_info_title', language, flight_no=flight.flightno)} Status*\n\n",
+        f"{get_text('schedule_label', language)} {flight.schedule}\n",
+        f"{get_text('estimate_label', language)} {flight.estimate}\n",
+        f"{get_text('gate_label', language)} {flight.gatenumber}\n",
+        f"{get_text('status_label', language)} {get_status_emoji(flight.flightstat)} {flight.flightstat}\n",
+        f"{get_text('route_label', language)} {flight.fromtolocation}\n",
+    ]
+    if changes:
+        parts.append(f"\n{get_text('recent_changes', language)}\n")
+        parts.extend(f"• {change}\n" for change in changes)
+    return "".join(parts)
+
+def render_flight_status(flight: Flight, changes: Optional[Sequence[str]] = None, language: str = 'en',
+                         updated_at: Optional[datetime] = None) -> str:
+    """Status card for a flight. Everything but the 'last updated' line is
+    cached per (row version, changes, language)."""
+    changes = tuple(changes) if changes else ()
+    body = render_cache.get_or_render(
+        ("status", _status_key(flight), changes, language), lambda: _status_body(flight, changes, language)
+    )
+    updated_at = updated_at or datetime.now()
+    return f"{body}\n{get_text('last_updated', language, time=updated_at.strftime('%H:%M:%S'))}"
+
+def render_schedule_page(flights: Sequence[Flight], day: date, language: str = 'en', first: int = 1,
+                         page: int = 1, pages: int = 1) -> str:
+    """One numbered page of a schedule list, starting at item ``first``"""
+    return render_listing_page(flights, format_long_date(day, language), language, first, page, pages)
+
+def render_listing_page(flights: Sequence[Flight], heading: str, language: str = 'en', first: int = 1,
+                        page: int = 1, pages: int = 1) -> str:
+    """A schedule-style page under any heading (a date, a date range, a time window)"""
+    parts = [f"{get_text('flight_schedules', language, date=heading)}\n\n"]
+    parts.extend(f"{i}. {flight.flightno}\n   📍 {flight.fromtolocation}\n   🕐 {flight.schedule}\n\n"
+                 for i, flight in enumerate(flights, first))
+    if pages > 1:
+        parts.append(get_text('page_indicator', language, page=page, pages=pages))
+    return "".join(parts)
+
+def range_heading(first: date, days: int, start: Optional[time], end: Optional[time], language: str = 'en') -> str:
+    """ "18 October 2026 – 20 October 2026, 14:00–18:00" """
+    heading = format_long_date(first, language)
+    if days > 1:
+        heading += f" – {format_long_date(first + timedelta(days=days - 1), language)}"
+    if start is not None or end is not None:
+        heading += f", {(start or time.min).strftime('%H:%M')}–{(end or time(23, 59)).strftime('%H:%M')}"
+    return heading
+
+def render_range_page(store: Any, first: str, days: int, start: Optional[time], end: Optional[time],
+                      flight_type: str, language: str = 'en', page: int = 0,
+                      page_size: int = SCHEDULE_PAGE_SIZE) -> Optional[Tuple[str, int, int]]:
+    """(text, page index, page count) for flights of one type over a date range and time window,
+    or None when there are none. The store bisects each date to the window; rendered pages are
+    cached until a date in the range changes."""
+    day = datetime.strptime(first, '%Y-%m-%d')
+    dates = [(day + timedelta(days=offset)).strftime('%Y-%m-%d') for offset in range(max(1, days))]
+    # Versions first, as in SchedulePages.page
+    key = ("range", tuple(store.date_version(date_str) for date_str in dates), first, days, start, end, flight_type)
+    flights = [flight for flight in store.flights_in_range(first, days, start, end) if flight.departure == flight_type]
+    if not flights:
+        return None
+    size = max(1, page_size)
+    pages = (len(flights) + size - 1) // size
+    index = min(max(page, 0), pages - 1)
+    text = render_cache.get_or_render(key + (language, index, size), lambda: render_listing_page(
+        flights[index * size:(index + 1) * size], range_heading(day, days, start, end, language), language,
+        index * size + 1, index + 1, pages
+    ))
+    return text, index, pages
+
+class SchedulePages:
+    """Every schedule page of a date, for each flight type and language.
+
+    A date's pages are all rendered together on the first lookup after the
+    store changed that date (``FlightStore.date_version``); until the next
+    change, showing any page of it is a dictionary lookup. Only dates that
+    have flights and that the store has not evicted are kept.
+    """
+
+    def __init__(self, page_size: int = SCHEDULE_PAGE_SIZE) -> None:
+        self.page_size = max(1, page_size)
+        self._dates: Dict[str, Tuple[int, Dict[Tuple[str, str], List[str]]]] = {}
+        self._lock = threading.Lock()
+        self._oldest: Optional[str] = None
+        self.builds = 0
+
+    def _build(self, flights: Sequence[Flight], day: date) -> Dict[Tuple[str, str], List[str]]:
+        by_type: Dict[str, List[Flight]] = {}
+        for flight in flights:
+            by_type.setdefault(flight.departure, []).append(flight)
+        pages: Dict[Tuple[str, str], List[str]] = {}
+        size = self.page_size
+        for flight_type, typed in by_type.items():
+            count = (len(typed) + size - 1) // size
+            for language in TEMPLATES:
+                pages[(flight_type, language)] = [
+                    render_schedule_page(typed[start:start + size], day, language, start + 1, index + 1, count)
+                    for index, start in enumerate(range(0, len(typed), size))
+                ]
+        return pages
+
+    def page(self, store: Any, date_str: str, flight_type: str, language: str, page: int = 0) -> Optional[Tuple[str, int, int]]:
+        """(text, page index, page count) for a page of ``date_str``, or None
+        when there are no flights of that type. Out-of-range pages clamp."""
+        # Read the version first: pages built from newer flights under an
+        # older version are only rebuilt once more, never served stale
+        version = store.date_version(date_str)
+        with self._lock:
+            if store.oldest_date != self._oldest:
+                # The store evicted old dates: drop their pages too
+                self._oldest = store.oldest_date
+                for expired in [cached_date for cached_date in self._dates if cached_date < (self._oldest or "")]:
+                    del self._dates[expired]
+            cached = self._dates.get(date_str)
+        if cached is None or cached[0] != version:
+            day = datetime.strptime(date_str, '%Y-%m-%d')
+            cached = (version, self._build(store.flights_on(date_str), day))
+            with self._lock:
+                if cached[1]:
+                    self._dates[date_str] = cached
+                else:
+                    self._dates.pop(date_str, None)
+                self.builds += 1
+        pages = cached[1].get((flight_type, language)) or cached[1].get((flight_type, 'en'))
+        if not pages:
+            return None
+        index = min(max(page, 0), len(pages) - 1)
+        return pages[index], index, len(pages)
+
+schedule_pages = SchedulePages()
@@ -0,0 +1,156 @@
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from config import MONITOR_INTERVAL_SECONDS, POLL_MAX_SECONDS, POLL_MIN_SECONDS
+from models import Flight
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a flight no longer changes; the monitor stops watching it
+FINAL_STATUSES = frozenset({"departed, gate close"})
+
+def is_final_status(status: Any) -> bool:
+    return str(status or "").strip().lower() in FINAL_STATUSES
+
+class PollPolicy:
+    """Decides how long to wait before a flight is checked again.
+
+    Subclass and override ``next_interval`` to plug in a different policy.
+    """
+
+    def next_interval(self, flight: Optional[Flight], now: datetime) -> float:
+        return float(MONITOR_INTERVAL_SECONDS)
+
+class FixedPollPolicy(PollPolicy):
+    """Every flight on the same interval (the monitor's original behaviour)"""
+
+    def __init__(self, interval: float = MONITOR_INTERVAL_SECONDS) -> None:
+        self.interval = float(interval)
+
+    def next_interval(self, flight: Optional[Flight], now: datetime) -> float:
+        return self.interval
+
+class PhasePollPolicy(PollPolicy):
+    """Poll by flight phase: often around boarding, rarely when departure is hours away.
+
+    A flight in a final status (see ``FINAL_STATUSES``) is polled at
+    ``max_interval``. Otherwise ``status_intervals`` is matched as lower-case
+    substrings of ``flightstat`` in order; the first match wins. Otherwise the interval comes from the time
+    left until the estimated (or scheduled) departure via ``horizon_intervals``,
+    a list of (seconds to departure, interval) sorted by distance.
+    """
+
+    DEFAULT_STATUS_INTERVALS: Tuple[Tuple[str, float], ...] = (
+        ("boarding", 0),
+        ("final call", 0),
+        ("gate close", 0),
+        ("gate open", 30),
+        ("delayed", 60),
+        ("check-in", 60),
+    )
+
+    DEFAULT_HORIZON_INTERVALS: Tuple[Tuple[float, float], ...] = (
+        (30 * 60, 0),
+        (60 * 60, 60),
+        (3 * 60 * 60, 120),
+        (6 * 60 * 60, 300),
+    )
+
+    def __init__(self, min_interval: float = POLL_MIN_SECONDS, max_interval: float = POLL_MAX_SECONDS,
+                 status_intervals: Optional[Iterable[Tuple[str, float]]] = None,
+                 horizon_intervals: Optional[Iterable[Tuple[float, float]]] = None) -> None:
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max_interval)
+        self.status_intervals = tuple(status_intervals or self.DEFAULT_STATUS_INTERVALS)
+        self.horizon_intervals = tuple(horizon_intervals or self.DEFAULT_HORIZON_INTERVALS)
+
+    def _clamp(self, interval: float) -> float:
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def next_interval(self, flight: Optional[Flight], now: datetime) -> float:
+        if flight is None:
+            # Missing from the feed: keep looking at the base rate
+            return self.min_interval
+        if is_final_status(flight.flightstat):
+            # "Departed, Gate Close" also contains "gate close"; nothing changes any more
+            return self.max_interval
+        status = str(flight.flightstat or "").lower()
+        for needle, interval in self.status_intervals:
+            if needle in status:
+                return self._clamp(interval)
+        departure = flight.estimate_at or flight.schedule_at
+        if departure is None:
+            return self.min_interval
+        seconds_left = (departure - now).total_seconds()
+        for horizon, interval in self.horizon_intervals:
+            if seconds_left <= horizon:
+                return self._clamp(interval)
+        return self.max_interval
+
+class PollScheduler:
+    """Priority queue of per-flight next-check times.
+
+    ``clock`` returns seconds (``time.monotonic`` by default) and can be
+    replaced with a simulated clock. Rescheduling a flight supersedes its
+    previous entry; stale heap entries are skipped when popped.
+    """
+
+    def __init__(self, policy: Optional[PollPolicy] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.policy = policy or PhasePollPolicy()
+        self.clock = clock
+        self._heap: List[Tuple[float, int, str]] = []
+        self._due_at: Dict[str, float] = {}
+        self._seq = 0
+
+    def __contains__(self, flight_id: str) -> bool:
+        return flight_id in self._due_at
+
+    def __len__(self) -> int:
+        return len(self._due_at)
+
+    def schedule_at(self, flight_id: str, due: float) -> None:
+        self._due_at[flight_id] = due
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, flight_id))
+
+    def schedule_now(self, flight_id: str) -> None:
+        self.schedule_at(flight_id, self.clock())
+
+    def reschedule(self, flight_id: str, flight: Optional[Flight], now: Optional[datetime] = None) -> float:
+        """Queue the next check of a flight according to the policy; returns the interval"""
+        interval = self.policy.next_interval(flight, now or datetime.now())
+        self.schedule_at(flight_id, self.clock() + interval)
+        return interval
+
+    def remove(self, flight_id: str) -> None:
+        self._due_at.pop(flight_id, None)
+
+    def sync(self, flight_ids: Iterable[str]) -> None:
+        """Make the queue track exactly ``flight_ids``; new flights are due immediately"""
+        wanted = set(flight_ids)
+        for flight_id in list(self._due_at):
+            if flight_id not in wanted:
+                del self._due_at[flight_id]
+        for flight_id in wanted:
+            if flight_id not in self._due_at:
+                self.schedule_now(flight_id)
+
+    def pop_due(self) -> List[str]:
+        """Remove and return every flight whose check time has come"""
+        now = self.clock()
+        due: List[str] = []
+        while self._heap and self._heap[0][0] <= now:
+            at, _, flight_id = heapq.heappop(self._heap)
+            if self._due_at.get(flight_id) == at:
+                del self._due_at[flight_id]
+                due.append(flight_id)
+        return due
+
+    def seconds_until_next(self) -> Optional[float]:
+        while self._heap and self._due_at.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
@@ -0,0 +1,213 @@
+import re
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from models import Flight
+
+_NON_ALNUM_RE = re.compile(r"[^A-Z0-9]")
+_LEADING_LETTERS_RE = re.compile(r"[A-Z]{3,}")
+_DIGITS_RE = re.compile(r"\d+")
+
+# ICAO codes and airline names passengers type instead of the IATA code in the feeds
+CARRIER_ALIASES = {
+    "GIA": "GA", "GARUDA": "GA",
+    "CTV": "QG", "CITILINK": "QG",
+    "LNI": "JT", "LION": "JT", "LIONAIR": "JT",
+    "BTK": "ID", "BATIK": "ID", "BATIKAIR": "ID",
+    "AWQ": "QZ", "AIRASIA": "QZ",
+    "SJY": "SJ", "SRIWIJAYA": "SJ",
+    "WON": "IW", "WINGS": "IW", "WINGSAIR": "IW",
+    "SJV": "IU", "SUPERAIRJET": "IU",
+    "TGN": "IP", "PELITA": "IP",
+    "SIA": "SQ", "SINGAPORE": "SQ",
+    "MAS": "MH", "MALAYSIA": "MH",
+}
+
+def search_key(text: Any) -> str:
+    """Canonical form of a (partly typed) flight number.
+
+    "GA 410", "ga-0410" and "GIA410" all become "GA410": spacing and
+    punctuation are dropped, a known ICAO code or airline name becomes its
+    IATA code and zeros leading the number are removed, down to a last
+    "0" ("GA0" stays "GA0"). Feed flight numbers and queries go through
+    the same function, so prefixes line up.
+    """
+    key = _NON_ALNUM_RE.sub("", str(text or "").upper())
+    letters = _LEADING_LETTERS_RE.match(key)
+    if letters and letters.group(0) in CARRIER_ALIASES:
+        key = CARRIER_ALIASES[letters.group(0)] + key[letters.end():]
+    carrier, number = key[:2], key[2:]
+    digits = _DIGITS_RE.match(number)
+    if digits:
+        number = (digits.group(0).lstrip("0") or "0") + number[digits.end():]
+    return carrier + number
+
+class _Node:
+    __slots__ = ("children", "flights", "owner")
+
+    def __init__(self, owner: object, children: Optional[Dict[str, "_Node"]] = None,
+                 flights: Optional[Dict[Tuple[str, str], Flight]] = None) -> None:
+        # The index allowed to change this node in place; see FlightSearchIndex.copy
+        self.owner = owner
+        self.children: Dict[str, "_Node"] = {} if children is None else children
+        self.flights: Dict[Tuple[str, str], Flight] = {} if flights is None else flights
+
+class FlightSearchIndex:
+    """Prefix trie over the canonical flight numbers (``search_key``) of a snapshot.
+
+    ``FlightStore`` keeps it up to date row by row as feeds sync. A lookup
+    walks the query's characters and then the subtree below them, nearest
+    completions first, so its cost depends on the query and the number of
+    results asked for rather than on the size of the feed. When nothing
+    starts with the query, flight numbers within one edit of it are offered
+    instead.
+    """
+
+    def __init__(self) -> None:
+        self._owner = object()
+        self._root = _Node(self._owner)
+        self.size = 0
+
+    def copy(self) -> "FlightSearchIndex":
+        """A copy sharing every node with this index.
+
+        Either side copies a shared node the first time it changes it, so
+        edits to the copy never show through to readers of this index.
+        """
+        clone = FlightSearchIndex.__new__(FlightSearchIndex)
+        clone._owner, clone._root, clone.size = object(), self._root, self.size
+        self._owner = object()
+        return clone
+
+    def _own(self, node: _Node) -> _Node:
+        if node.owner is self._owner:
+            return node
+        return _Node(self._owner, dict(node.children), dict(node.flights))
+
+    def add(self, key: Tuple[str, str], flight: Flight) -> None:
+        node = self._root = self._own(self._root)
+        for char in search_key(flight.flightno):
+            child = node.children.get(char)
+            child = node.children[char] = _Node(self._owner) if child is None else self._own(child)
+            node = child
+        if key not in node.flights:
+            self.size += 1
+        node.flights[key] = flight
+
+    def remove(self, key: Tuple[str, str], flight: Flight) -> None:
+        text = search_key(flight.flightno)
+        found = self._find(text)
+        if found is None or key not in found.flights:
+            return
+        path = [self._own(self._root)]
+        self._root = path[0]
+        for char in text:
+            parent = path[-1]
+            parent.children[char] = self._own(parent.children[char])
+            path.append(parent.children[char])
+        del path[-1].flights[key]
+        self.size -= 1
+        # Prune the branch back to the last node still in use
+        for depth in range(len(text), 0, -1):
+            node = path[depth]
+            if node.flights or node.children:
+                break
+            del path[depth - 1].children[text[depth - 1]]
+
+    def _find(self, text: str) -> Optional[_Node]:
+        node = self._root
+        for char in text:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def exact(self, query: Any) -> List[Flight]:
+        node = self._find(search_key(query))
+        return list(node.flights.values()) if node is not None else []
+
+    def _completions(self, text: str) -> Iterator[Tuple[str, _Node]]:
+        """Nodes with flights below ``text``: shorter flight numbers first, then in order.
+
+        One breadth-first walk. Parents are queued in order and their
+        children yielded sorted, so each level comes out in order; a node's
+        own children wait until its whole level is done, so a caller that
+        stops early never expands them.
+        """
+        start = self._find(text)
+        if start is None:
+            return
+        if start.flights:
+            yield text, start
+        queue = deque([(text, start)])
+        while queue:
+            prefix, node = queue.popleft()
+            for char, child in sorted(node.children.items()):
+                label = prefix + char
+                if child.flights:
+                    yield label, child
+                if child.children:
+                    queue.append((label, child))
+
+    def _near(self, text: str) -> List[Tuple[str, _Node]]:
+        """Flight numbers one deletion, insertion, substitution or swap away from ``text``.
+
+        Each edit position reuses the trie node of the text before it, so
+        only the children that exist there are tried.
+        """
+        found: Dict[str, _Node] = {}
+
+        def find(node: Optional[_Node], label: str, rest: str) -> None:
+            for char in rest:
+                node = node.children.get(char) if node is not None else None
+            if node is not None and node.flights:
+                found.setdefault(label + rest, node)
+
+        node: Optional[_Node] = self._root
+        for i in range(len(text) + 1):
+            if node is None:
+                break
+            head, rest = text[:i], text[i:]
+            for char, child in node.children.items():
+                find(child, head + char, rest)  # insertion
+                if rest and char != rest[0]:
+                    find(child, head + char, rest[1:])  # substitution
+            if rest:
+                find(node, head, rest[1:])  # deletion
+            if len(rest) > 1 and rest[0] != rest[1]:
+                find(node, head, rest[1] + rest[0] + rest[2:])  # swap
+            node = node.children.get(rest[0]) if rest else None
+        return sorted(found.items(), key=lambda match: (len(match[0]), match[0]))
+
+    def search(self, query: Any, date: Optional[str] = None, departure: Optional[str] = None,
+               limit: int = 5) -> List[Flight]:
+        """Ranked flights for a typed query.
+
+        Exact flight-number matches come first, then completions of the
+        query, then (only when there are neither) near misses. Only flights
+        on ``date`` and of the ``departure`` feed are returned when given;
+        each flight number appears once, at its earliest schedule.
+        """
+        text = search_key(query)
+        if not text or limit <= 0:
+            return []
+        results: List[Flight] = []
+
+        def take(node: _Node) -> bool:
+            matches = [flight for flight in node.flights.values()
+                       if (date is None or flight.date == str(date))
+                       and (departure is None or flight.departure == departure)]
+            if matches:
+                results.append(min(matches, key=lambda flight: str(flight.schedule)))
+            return len(results) >= limit
+
+        for _, node in self._completions(text):
+            if take(node):
+                return results
+        if not results:
+            for _, node in self._near(text):
+                if take(node):
+                    break
+        return results
+
+    def __len__(self) -> int:
+        return self.size
@@ -0,0 +1,165 @@
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watches (
+    flight_id TEXT PRIMARY KEY,
+    flight_no TEXT,
+    last_status TEXT,
+    last_schedule TEXT,
+    last_estimate TEXT,
+    last_gate TEXT
+);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    user_id INTEGER NOT NULL,
+    flight_id TEXT NOT NULL,
+    flight_no TEXT,
+    language TEXT,
+    subscribed_at TEXT,
+    notification_count INTEGER,
+    last_message_id INTEGER,
+    missing_notified INTEGER,
+    final_notified INTEGER,
+    PRIMARY KEY (user_id, flight_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS messages (
+    user_id INTEGER PRIMARY KEY,
+    message_id INTEGER
+);
+"""
+
+_UPSERT = {
+    "watches": "INSERT OR REPLACE INTO watches VALUES (?, ?, ?, ?, ?, ?)",
+    "subscriptions": "INSERT OR REPLACE INTO subscriptions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "messages": "INSERT OR REPLACE INTO messages VALUES (?, ?)",
+}
+
+_DELETE = {
+    "watches": "DELETE FROM watches WHERE flight_id = ?",
+    "subscriptions": "DELETE FROM subscriptions WHERE user_id = ? AND flight_id = ?",
+    "messages": "DELETE FROM messages WHERE user_id = ?",
+}
+
+class SubscriptionStore:
+    """SQLite (WAL) persistence for subscriptions, watches and message ids.
+
+    Writers only record the latest row per key in memory; a background thread
+    commits whatever has accumulated every ``flush_interval`` seconds in one
+    transaction, so the bot's event loops never wait on disk. A crash loses
+    at most the last interval and never leaves a half-written batch.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.5) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, Any], Optional[tuple]] = {}
+        self._wake = threading.Event()
+        self._closed = False
+        self._stats = {"flushes": 0, "rows_written": 0, "flush_failures": 0}
+        self._writer = threading.Thread(target=self._run, name="subscription-store", daemon=True)
+        self._writer.start()
+
+    def _put(self, table: str, key: Any, row: Optional[tuple]) -> None:
+        with self._lock:
+            self._pending[(table, key)] = row
+
+    def put_watch(self, row: tuple) -> None:
+        self._put("watches", row[0], row)
+
+    def delete_watch(self, flight_id: str) -> None:
+        self._put("watches", flight_id, None)
+
+    def put_subscription(self, row: tuple) -> None:
+        self._put("subscriptions", (row[0], row[1]), row)
+
+    def delete_subscription(self, user_id: Any, flight_id: str) -> None:
+        self._put("subscriptions", (user_id, flight_id), None)
+
+    def put_message(self, user_id: Any, message_id: Optional[int]) -> None:
+        self._put("messages", user_id, None if message_id is None else (user_id, message_id))
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Commit everything recorded so far; returns the number of rows written"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+        upserts: Dict[str, list] = {}
+        deletes: Dict[str, list] = {}
+        for (table, key), row in batch.items():
+            if row is None:
+                deletes.setdefault(table, []).append(key if isinstance(key, tuple) else (key,))
+            else:
+                upserts.setdefault(table, []).append(row)
+        with self._db_lock:
+            try:
+                self._conn.execute("BEGIN")
+                for table, keys in deletes.items():
+                    self._conn.executemany(_DELETE[table], keys)
+                for table, rows in upserts.items():
+                    self._conn.executemany(_UPSERT[table], rows)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._conn.execute("ROLLBACK")
+                self._stats["flush_failures"] += 1
+                logger.error(f"Subscription store flush failed, will retry: {e}")
+                with self._lock:
+                    # Keep newer writes that arrived meanwhile
+                    for key, row in batch.items():
+                        self._pending.setdefault(key, row)
+                return 0
+        self._stats["flushes"] += 1
+        self._stats["rows_written"] += len(batch)
+        return len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, pending=len(self._pending))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def _iter_rows(self, query: str, batch_size: int = 5000) -> Iterator[tuple]:
+        # Separate read connection: under WAL it does not block the writer
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            conn.close()
+
+    def iter_watches(self) -> Iterator[tuple]:
+        return self._iter_rows("SELECT * FROM watches")
+
+    def iter_subscriptions(self) -> Iterator[tuple]:
+        return self._iter_rows("SELECT * FROM subscriptions")
+
+    def load_messages(self) -> Dict[Any, int]:
+        return dict(self._iter_rows("SELECT user_id, message_id FROM messages"))
@@ -0,0 +1,211 @@
+import logging
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from diff_engine import FlightRow, make_row
+from models import Flight, Subscription
+
+if TYPE_CHECKING:
+    from subscription_store import SubscriptionStore
+
+logger = logging.getLogger(__name__)
+
+class FlightWatch:
+    """Monitoring state shared by every subscriber of one flight.
+
+    The last values seen on the feed live here rather than on each
+    subscription, so a tick diffs the flight once and fans the result out.
+    An unseeded watch has no last values yet; the monitor fills them from
+    the next snapshot instead of reporting every field as changed.
+    """
+
+    __slots__ = ("flight_id", "flight_no", "last_status", "last_schedule", "last_estimate",
+                 "last_gate", "last_seen", "check_count", "subscribers", "seeded")
+
+    def __init__(self, flight_id: str, flight_no: Any, last_status: Any = None, last_schedule: Optional[str] = None,
+                 last_estimate: Optional[str] = None, last_gate: Optional[str] = None, seeded: bool = True) -> None:
+        self.flight_id = flight_id
+        self.flight_no = flight_no
+        self.last_status = last_status
+        self.last_schedule = last_schedule
+        self.last_estimate = last_estimate
+        self.last_gate = last_gate
+        self.last_seen = datetime.now()
+        self.check_count = 0
+        self.subscribers: Dict[Any, Subscription] = {}
+        self.seeded = seeded
+
+    @classmethod
+    def for_flight(cls, flight: Flight) -> "FlightWatch":
+        return cls(
+            str(flight.id),
+            flight.flightno,
+            flight.flightstat,
+            str(flight.schedule) if flight.schedule else None,
+            str(flight.estimate) if flight.estimate else None,
+            str(flight.gatenumber) if flight.gatenumber else None,
+        )
+
+    def as_row(self) -> tuple:
+        """Storage row, see subscription_store.SCHEMA"""
+        return (self.flight_id, self.flight_no, self.last_status, self.last_schedule, self.last_estimate, self.last_gate)
+
+    @property
+    def row(self) -> FlightRow:
+        return make_row(self.last_status, self.last_schedule, self.last_estimate, self.last_gate)
+
+    def apply(self, row: FlightRow) -> None:
+        """Adopt the values of a changed row as the last known state"""
+        _, self.last_schedule, self.last_estimate, self.last_gate, self.last_status = row
+
+    def seed(self, row: FlightRow) -> None:
+        """Take ``row`` as the last known state of an unseeded watch"""
+        self.apply(row)
+        self.seeded = True
+
+class SubscriptionRegistry:
+    """Maps flight id -> watchers, and user id -> the flights they watch.
+
+    With a ``store`` attached (see subscription_store.SubscriptionStore) every
+    change is mirrored to disk. Code that mutates a watch or subscription in
+    place calls ``save_watch``/``save_subscription`` afterwards.
+    """
+
+    def __init__(self, store: Optional["SubscriptionStore"] = None) -> None:
+        self._lock = threading.RLock()
+        self._watches: Dict[str, FlightWatch] = {}
+        self._by_user: Dict[Any, Dict[str, Subscription]] = {}
+        self.store = store
+
+    def restore(self, store: "SubscriptionStore") -> int:
+        """Load everything saved in ``store`` and keep mirroring to it; returns the subscription count"""
+        count = 0
+        with self._lock:
+            for row in store.iter_watches():
+                watch = FlightWatch(*row)
+                self._watches[watch.flight_id] = watch
+            for row in store.iter_subscriptions():
+                user_id, subscription = Subscription.from_row(row)
+                watch = self._watches.get(subscription.flight_id)
+                if watch is None:
+                    # Watch row lost (e.g. crash between batches); seeded on the next check
+                    watch = FlightWatch(subscription.flight_id, subscription.flight_no, seeded=False)
+                    self._watches[subscription.flight_id] = watch
+                watch.subscribers[user_id] = subscription
+                self._by_user.setdefault(user_id, {})[subscription.flight_id] = subscription
+                count += 1
+            for flight_id in [fid for fid, watch in self._watches.items() if not watch.subscribers]:
+                del self._watches[flight_id]
+                store.delete_watch(flight_id)
+            self.store = store
+        return count
+
+    def save_watch(self, watch: FlightWatch) -> None:
+        """Persist ``watch``, unless it has been dropped (or replaced) meanwhile"""
+        with self._lock:
+            if self.store is not None and self._watches.get(watch.flight_id) is watch:
+                self.store.put_watch(watch.as_row())
+
+    def save_subscription(self, user_id: Any, subscription: Subscription) -> None:
+        """Persist ``subscription``, unless it has been removed (or replaced) meanwhile.
+
+        Sends finish after the monitor or the user may already have dropped
+        the watch; saving then would bring the row back on the next restart.
+        """
+        with self._lock:
+            current = self._by_user.get(user_id, {}).get(subscription.flight_id)
+            if self.store is not None and current is subscription:
+                self.store.put_subscription(subscription.as_row(user_id))
+
+    def _forget(self, user_id: Any, flight_id: str) -> None:
+        if self.store is not None:
+            self.store.delete_subscription(user_id, flight_id)
+
+    def subscribe(self, user_id: Any, flight: Flight, language: str) -> Subscription:
+        flight_id = str(flight.id)
+        with self._lock:
+            watch = self._watches.get(flight_id)
+            if watch is None:
+                watch = self._watches[flight_id] = FlightWatch.for_flight(flight)
+                self.save_watch(watch)
+            subscription = watch.subscribers.get(user_id)
+            if subscription is None:
+                subscription = Subscription.for_flight(flight, language)
+                watch.subscribers[user_id] = subscription
+                self._by_user.setdefault(user_id, {})[flight_id] = subscription
+            else:
+                subscription.language = language
+            self.save_subscription(user_id, subscription)
+            return subscription
+
+    def unsubscribe(self, user_id: Any, flight_id: Optional[str] = None) -> List[Subscription]:
+        """Drop one of the user's flights, or all of them when ``flight_id`` is None"""
+        with self._lock:
+            flights = self._by_user.get(user_id, {})
+            flight_ids = list(flights) if flight_id is None else [str(flight_id)]
+            removed: List[Subscription] = []
+            for fid in flight_ids:
+                subscription = flights.pop(fid, None)
+                if subscription is None:
+                    continue
+                removed.append(subscription)
+                self._forget(user_id, fid)
+                watch = self._watches.get(fid)
+                if watch is not None:
+                    watch.subscribers.pop(user_id, None)
+                    if not watch.subscribers:
+                        del self._watches[fid]
+                        if self.store is not None:
+                            self.store.delete_watch(fid)
+            if not flights:
+                self._by_user.pop(user_id, None)
+            return removed
+
+    def drop_flight(self, flight_id: str) -> List[Any]:
+        """Remove a flight and every subscription to it; returns the affected users"""
+        with self._lock:
+            watch = self._watches.pop(str(flight_id), None)
+            if watch is None:
+                return []
+            if self.store is not None:
+                self.store.delete_watch(watch.flight_id)
+            for user_id in watch.subscribers:
+                self._forget(user_id, watch.flight_id)
+                flights = self._by_user.get(user_id)
+                if flights is not None:
+                    flights.pop(watch.flight_id, None)
+                    if not flights:
+                        del self._by_user[user_id]
+            return list(watch.subscribers)
+
+    def is_watching(self, user_id: Any, flight_id: Optional[str] = None) -> bool:
+        flights = self._by_user.get(user_id)
+        if not flights:
+            return False
+        return flight_id is None or str(flight_id) in flights
+
+    def subscriptions_for(self, user_id: Any) -> Dict[str, Subscription]:
+        with self._lock:
+            return dict(self._by_user.get(user_id, {}))
+
+    def get_watch(self, flight_id: str) -> Optional[FlightWatch]:
+        return self._watches.get(str(flight_id))
+
+    def watches(self) -> List[FlightWatch]:
+        with self._lock:
+            return list(self._watches.values())
+
+    def user_ids(self) -> List[Any]:
+        with self._lock:
+            return list(self._by_user)
+
+    def subscription_count(self) -> int:
+        with self._lock:
+            return sum(len(flights) for flights in self._by_user.values())
+
+    def __len__(self) -> int:
+        """Number of distinct flights being watched"""
+        return len(self._watches)
+
+    def __bool__(self) -> bool:
+        return bool(self._watches)
@@ -0,0 +1,129 @@
+import asyncio
+import random
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import RetryAfter
+
+from dispatcher import NotificationDispatcher, TokenBucket
+from flight_handler import notify_subscriber
+from models import Subscription
+
+
+class SimulatedClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBot:
+    """Adds latency to every call, answers a share of sends with RetryAfter and records calls per chat"""
+
+    def __init__(self, latency=0.005, retry_after_share=0.0, retry_after=timedelta(milliseconds=50), seed=1):
+        self.random = random.Random(seed)
+        self.latency = latency
+        self.retry_after_share = retry_after_share
+        self.retry_after = retry_after
+        self.calls = {}
+        self.sent_at = []
+        self.next_id = 0
+        self.throttled = 0
+
+    async def delete_message(self, chat_id, message_id):
+        await asyncio.sleep(self.latency * self.random.random())
+        self.calls.setdefault(chat_id, []).append(("delete", message_id))
+
+    async def send_message(self, chat_id, text, reply_markup=None, parse_mode=None):
+        await asyncio.sleep(self.latency * self.random.random())
+        if self.random.random() < self.retry_after_share:
+            self.throttled += 1
+            raise RetryAfter(self.retry_after)
+        self.next_id += 1
+        self.calls.setdefault(chat_id, []).append(("send", self.next_id))
+        self.sent_at.append(time.monotonic())
+        return SimpleNamespace(message_id=self.next_id)
+
+
+def notify_everyone(dispatcher, chats, rounds):
+    subscriptions = {chat_id: Subscription("f1", "GA123", "en") for chat_id in chats}
+
+    def job(chat_id, round_no):
+        async def deliver(chat_bot):
+            await notify_subscriber(chat_bot, chat_id, subscriptions[chat_id], f"update {round_no}")
+        return deliver
+
+    async def run():
+        for round_no in range(rounds):
+            for chat_id in chats:
+                dispatcher.submit(chat_id, job(chat_id, round_no))
+        assert await dispatcher.join(timeout=30)
+
+    asyncio.run(run())
+
+
+def test_delete_previous_then_send_order_is_kept_per_chat_despite_latency_and_429s():
+    bot = FakeBot(retry_after_share=0.1)
+    dispatcher = NotificationDispatcher(bot, concurrency=8, global_rate=1000, chat_rate=100, max_retries=10)
+    chats = list(range(40))
+    notify_everyone(dispatcher, chats, rounds=3)
+    assert bot.throttled > 0
+    assert dispatcher.stats()["failed"] == 0
+    for chat_id in chats:
+        calls = bot.calls[chat_id]
+        assert [kind for kind, _ in calls] == ["send", "delete", "send", "delete", "send"]
+        for (_, sent_id), (_, deleted_id) in zip(calls[0::2], calls[1::2]):
+            assert sent_id == deleted_id
+
+
+def test_global_rate_limit_spaces_sends():
+    bot = FakeBot(latency=0)
+    dispatcher = NotificationDispatcher(bot, concurrency=16, global_rate=50, chat_rate=100)
+    notify_everyone(dispatcher, list(range(100)), rounds=1)
+    # 50 burst tokens, then 50 more at 50/s
+    assert bot.sent_at[-1] - bot.sent_at[0] >= 0.9
+
+
+def test_idle_chat_buckets_are_forgotten():
+    bot = FakeBot(latency=0)
+    dispatcher = NotificationDispatcher(bot, global_rate=1000, chat_rate=200, chat_burst=1)
+    notify_everyone(dispatcher, list(range(200)), rounds=1)
+    time.sleep(0.02)
+    notify_everyone(dispatcher, [1000], rounds=1)
+    assert list(dispatcher._chat_buckets) == [1000]
+
+
+def test_eviction_stops_at_the_first_bucket_still_refilling():
+    clock = SimulatedClock()
+    dispatcher = NotificationDispatcher(FakeBot(), chat_rate=1, chat_burst=1)
+    for chat_id in range(3):
+        dispatcher._chat_buckets[chat_id] = TokenBucket(1, 1, clock)
+    dispatcher._chat_buckets[1].reserve()
+    dispatcher._evict_idle_buckets()
+    assert list(dispatcher._chat_buckets) == [1, 2]
+
+
+def test_pause_delays_new_reservations():
+    clock = SimulatedClock()
+    bucket = TokenBucket(10, 5, clock)
+    bucket.pause(2)
+    assert bucket.reserve() == pytest.approx(2.1)
+    clock.now += 3
+    assert bucket.reserve() == 0
+
+
+def test_pause_holds_callers_that_already_reserved_a_token():
+    async def run():
+        bucket = TokenBucket(20, 1)
+        bucket.reserve()
+        started = time.monotonic()
+        waiter = asyncio.ensure_future(bucket.acquire())  # reserves now, due in 50 ms
+        await asyncio.sleep(0)
+        bucket.pause(0.3)
+        await waiter
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.3
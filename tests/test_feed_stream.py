@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from bench.stub_feed import make_feed
+from feed_stream import FeedArrayParser, iter_chunks, iter_feed_records
+from flight_bot import FlightScheduleBot
+
+DOCUMENTS = [
+    '{"data":[-3.25]}',
+    '{"data":[1, 2.5e3]}',
+    '{"data": [1E-2, -0.5, 10, 1e+3, true, false, null]}',
+    '{"status": 200, "total": -12.75, "data": [{"id": 1, "gate": "A1", "delay": 2.5e-1}, {"id": 2}], "ok": true}',
+    '{"data": [], "count": 0}',
+    ' { "data" : [ "GA 410" , {"nested": [1, [2.0, {"x": -1e5}]]} , 3.14159 ] , "next" : null } ',
+    '{"meta": {"pages": [1, 2]}, "data": ["\\u00e9t\\u00e9", "a]b", "c,d"]}',
+]
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 64 * 1024])
+def test_chunk_size_does_not_change_the_records(document, size):
+    body = document.encode()
+    assert list(iter_feed_records(iter_chunks(body, size))) == json.loads(body)["data"]
+
+
+def test_number_split_at_the_exponent_waits_for_the_rest():
+    parser = FeedArrayParser()
+    assert parser.feed('{"data":[1, 2.5e') == [1]
+    assert parser.feed('3]}') == [2500.0]
+    assert parser.close() == []
+
+
+def test_number_at_the_end_of_a_chunk_waits_for_a_delimiter():
+    parser = FeedArrayParser()
+    assert parser.feed('{"data":[7') == []
+    assert parser.feed('], "count": 12') == [7]
+    assert parser.feed('}') == []
+    assert parser.close() == []
+
+
+def test_truncated_document_raises():
+    parser = FeedArrayParser()
+    parser.feed('{"data":[1, 2')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+def test_malformed_number_raises_on_close():
+    parser = FeedArrayParser()
+    parser.feed('{"data":[-3.x]}')
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+class StalledBody(httpx.AsyncByteStream):
+    """Sends the head of a feed, then holds the rest back until released"""
+
+    def __init__(self, head, tail, release):
+        self.head, self.tail, self.release = head, tail, release
+
+    async def __aiter__(self):
+        yield self.head
+        await self.release.wait()
+        yield self.tail
+
+
+def test_lookup_is_answered_before_the_feed_finishes(monkeypatch):
+    feed = make_feed(2000, "d", date="2026-10-18")
+    body = json.dumps(feed).encode()
+    split = len(body) // 2
+    release = asyncio.Event()
+    transport = httpx.MockTransport(lambda request: httpx.Response(
+        200, stream=StalledBody(body[:split], body[split:], release) if request.url.path == "/dom"
+        else httpx.ByteStream(b'{"data": []}')))
+    monkeypatch.setattr(FlightScheduleBot, "FEED_URLS", {"D": "http://feed/dom", "I": "http://feed/inter"})
+    bot = FlightScheduleBot(cache_ttl=60)
+    client = httpx.AsyncClient(transport=transport)
+    monkeypatch.setattr(bot, "_get_client", lambda: client)
+
+    async def lookup():
+        flight = await asyncio.wait_for(bot.get_flight_info("ga100", "2026-10-18"), 5)
+        assert bot.store.get_by_flight_no("GA100") is None
+        release.set()
+        await asyncio.gather(*bot._tasks)
+        await client.aclose()
+        return flight
+
+    assert asyncio.run(lookup()).id == "d0"
+    assert len(bot.store.flights_on("2026-10-18")) == 2000
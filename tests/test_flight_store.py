@@ -0,0 +1,81 @@
+import threading
+from datetime import datetime
+
+from flight_store import FlightStore
+from models import Flight
+from search import FlightSearchIndex, search_key
+
+DATE = "2026-10-18"
+
+
+def feed(numbers, status="On Time"):
+    return [Flight(f"d{n}", "Garuda", f"{DATE} {n % 24:02d}:00", None, f"GA{n}", "1", status, "Jakarta", "D")
+            for n in numbers]
+
+
+def test_search_key_keeps_a_lone_zero():
+    assert search_key("ga-0410") == search_key("GIA 410") == "GA410"
+    assert search_key("GA0") == search_key("GA00") == "GA0"
+    assert search_key("GA0A") == "GA0A"
+
+
+def test_completions_come_shortest_first_then_in_order():
+    index = FlightSearchIndex()
+    for flight in feed([4100, 42, 419, 4, 410, 401]):
+        index.add(("D", flight.id), flight)
+    assert [flight.flightno for flight in index.search("GA4", limit=10)] == ["GA4", "GA42", "GA401", "GA410", "GA419", "GA4100"]
+    assert [flight.flightno for flight in index.search("GA4", limit=3)] == ["GA4", "GA42", "GA401"]
+
+
+def test_search_index_copy_leaves_the_original_unchanged():
+    index = FlightSearchIndex()
+    flights = feed([410, 411, 42])
+    for flight in flights:
+        index.add(("D", flight.id), flight)
+    copy = index.copy()
+    copy.remove(("D", "d410"), flights[0])
+    extra = feed([4100])[0]
+    copy.add(("D", extra.id), extra)
+    assert [flight.flightno for flight in index.search("GA41")] == ["GA410", "GA411"]
+    assert [flight.flightno for flight in copy.search("GA41")] == ["GA411", "GA4100"]
+    # and the original can still be edited without touching the copy
+    index.remove(("D", "d411"), flights[1])
+    assert [flight.flightno for flight in copy.search("GA41")] == ["GA411", "GA4100"]
+    assert (len(index), len(copy)) == (2, 3)
+
+
+def test_a_sync_does_not_change_what_earlier_readers_hold():
+    store = FlightStore(clock=lambda: datetime(2026, 10, 18))
+    store.sync("D", feed(range(10)))
+    by_id, index, flights = store.by_id, store.search_index, store.flights_on(DATE)
+    store.sync("D", feed(range(5, 15), status="Delayed"))
+    assert sorted(by_id) == [f"d{n}" for n in range(10)]
+    assert [flight.flightno for flight in index.search("GA1", DATE, limit=10)] == ["GA1"]
+    assert all(flight.flightstat == "On Time" for flight in flights)
+    assert [flight.flightno for flight in store.search("GA1", DATE, limit=10)] == ["GA10", "GA11", "GA12", "GA13", "GA14"]
+    assert store.get_by_flight_no("GA5").flightstat == "Delayed"
+    assert store.get_by_id("d2") is None
+
+
+def test_readers_see_whole_syncs_while_another_thread_syncs():
+    store = FlightStore(clock=lambda: datetime(2026, 10, 18))
+    feeds = [feed(range(0, 300)), feed(range(150, 450), status="Delayed")]
+    expected = [{flight.id for flight in flights} for flights in feeds]
+    store.sync("D", feeds[0])
+    done = threading.Event()
+
+    def writer():
+        for i in range(40):
+            store.sync("D", list(feeds[i % 2]))
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    reads = 0
+    while not done.is_set():
+        assert {flight.id for flight in store.flights_on(DATE)} in expected
+        assert set(store.snapshot_by_id()) in expected
+        assert store.search("GA2", DATE)
+        reads += 1
+    thread.join()
+    assert reads
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import flight_handler
+import rendering
+from models import Flight
+
+
+def frozen_now(at):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return at
+    return FrozenDatetime
+
+
+def test_status_card_shows_the_time_of_each_answer(monkeypatch):
+    flight = Flight("i9", "Garuda", "2026-10-18 10:00", "10:05", "GA410", "3", "Boarding", "Tokyo", "I")
+    flight_handler.inline_answers.clear()
+
+    monkeypatch.setattr(rendering, "datetime", frozen_now(datetime(2026, 10, 18, 9, 0, 0)))
+    first = flight_handler.inline_article(flight, "en")
+    monkeypatch.setattr(rendering, "datetime", frozen_now(datetime(2026, 10, 18, 9, 0, 42)))
+    second = flight_handler.inline_article(flight, "en")
+
+    assert flight_handler.inline_answers.stats()["hits"] == 1
+    assert (first.title, first.description) == (second.title, second.description)
+    assert first.input_message_content.message_text.endswith("09:00:00")
+    assert second.input_message_content.message_text.endswith("09:00:42")
+
+
+def test_changed_row_gets_a_new_description():
+    flight = Flight("i9", "Garuda", "2026-10-18 10:00", "10:05", "GA410", "3", "Boarding", "Tokyo", "I")
+    before = flight_handler.inline_article(flight, "en")
+    flight.gatenumber = "7"
+    after = flight_handler.inline_article(flight, "en")
+    assert "3" in before.description and "7" in after.description
+    assert "7" in after.input_message_content.message_text
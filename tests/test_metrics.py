@@ -0,0 +1,44 @@
+import math
+
+from fastapi.testclient import TestClient
+
+import health
+from metrics import REGISTRY, Gauge, Histogram, MetricsRegistry
+
+
+def failing():
+    raise RuntimeError("feed cache gone")
+
+
+def test_gauge_function_that_raises_renders_nan():
+    registry = MetricsRegistry()
+    registry.register(Gauge("broken", "Raises at scrape time.")).set_function(failing)
+    assert "broken NaN" in registry.render().splitlines()
+
+
+def test_special_values_use_prometheus_spelling():
+    registry = MetricsRegistry()
+    for name, value in (("up", math.inf), ("down", -math.inf), ("missing", math.nan), ("count", 3.0), ("ratio", 0.5)):
+        registry.register(Gauge(name, "A value.")).set(value)
+    lines = registry.render().splitlines()
+    for sample in ("up +Inf", "down -Inf", "missing NaN", "count 3", "ratio 0.5"):
+        assert sample in lines
+
+
+def test_histogram_renders_inf_bucket():
+    registry = MetricsRegistry()
+    registry.register(Histogram("took", "Seconds.", buckets=(1.0,))).observe(2.0)
+    lines = registry.render().splitlines()
+    assert 'took_bucket{le="1"} 0' in lines
+    assert 'took_bucket{le="+Inf"} 1' in lines
+
+
+def test_metrics_endpoint_survives_a_failing_gauge():
+    gauge = REGISTRY.register(Gauge("flightbot_test_broken", "Raises at scrape time."))
+    gauge.set_function(failing)
+    try:
+        response = TestClient(health.admin_app).get("/metrics")
+    finally:
+        REGISTRY._metrics.pop(gauge.name)
+    assert response.status_code == 200
+    assert "flightbot_test_broken NaN" in response.text.splitlines()
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from telegram.ext import Application
+
+import config
+import flight_handler
+from bench.fake_telegram import TOKEN, FakeTelegramServer
+from bench.load_test import free_port
+from bench.stub_feed import StubFeedServer
+from flight_bot import FlightScheduleBot
+from models import Flight
+from scheduler import FixedPollPolicy, PollScheduler
+from subscriptions import SubscriptionRegistry
+
+REPLIES = ("sendMessage", "editMessageText")
+
+
+@pytest.fixture
+def main(monkeypatch):
+    # main refuses to import without a token
+    monkeypatch.setattr(config, "BOT_TOKEN", TOKEN)
+    import main
+    return main
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    feed = StubFeedServer(dom_size=20, inter_size=10, latency=0).start()
+    telegram = FakeTelegramServer().start()
+    monkeypatch.setattr(FlightScheduleBot, "FEED_URLS", {"D": feed.dom_url, "I": feed.inter_url})
+    yield feed, telegram
+    telegram.stop()
+    feed.stop()
+
+
+class LoopRecordingBot(FlightScheduleBot):
+    """Records the loop each pooled-client request is made from"""
+
+    def __init__(self):
+        super().__init__(cache_ttl=0.5)
+        self.loops = set()
+
+    def _get_client(self):
+        self.loops.add(asyncio.get_running_loop())
+        return super()._get_client()
+
+
+def test_single_loop_runs_everything_on_one_loop_and_stops_on_the_event(main, stubs, monkeypatch, caplog):
+    _, telegram = stubs
+    bot = LoopRecordingBot()
+    registry = SubscriptionRegistry()
+    for user_id, flight_id in ((1, "d0"), (2, "d0"), (3, "i4")):
+        registry.subscribe(user_id, Flight(flight_id, "Garuda", None, None, "GA1", "1", "On Time", "Jakarta", "D"), "en")
+    watched = registry.watches()
+    monkeypatch.setattr(flight_handler, "flight_bot", bot)
+    monkeypatch.setattr(flight_handler, "registry", registry)
+    monkeypatch.setattr(flight_handler, "poll_scheduler", PollScheduler(FixedPollPolicy(60)))
+    monkeypatch.setattr(flight_handler, "should_exit", False)
+    application = Application.builder().token(TOKEN).base_url(telegram.base_url).build()
+    main.register_handlers(application)
+    caplog.set_level(logging.ERROR)
+
+    async def run():
+        stop = asyncio.Event()
+        runtime = asyncio.ensure_future(main.run_single_loop(application, "", free_port(), stop, admin_port=free_port()))
+        # Handlers run on the same loop as the monitor
+        seq = telegram.push_callback(4, "monitor_d5", 1000)
+        assert await asyncio.to_thread(telegram.wait_for, 4, REPLIES, seq, 10)
+        while not all(watch.check_count for watch in watched):
+            await asyncio.sleep(0.05)
+        # The monitor is now asleep until the next interval; the event must wake it
+        stopping = time.monotonic()
+        stop.set()
+        await asyncio.wait_for(runtime, 10)
+        return asyncio.get_running_loop(), time.monotonic() - stopping
+
+    loop, shutdown = asyncio.run(run())
+    assert shutdown < 5
+    assert bot.loops == {loop}
+    assert registry.subscription_count() == 4
+    assert not application.running
+    assert [record.getMessage() for record in caplog.records if record.levelno >= logging.ERROR] == []
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import flight_handler
+from flight_handler import parse_date_range
+
+TODAY = datetime(2026, 10, 18)
+
+
+def max_range_days(**env):
+    code = "import config; print(config.SCHEDULE_RANGE_DAYS, config.SCHEDULE_MAX_RANGE_DAYS)"
+    output = subprocess.run([sys.executable, "-c", code], env={"PATH": "", **env}, cwd=Path(__file__).parent.parent,
+                            capture_output=True, text=True, check=True).stdout
+    return tuple(map(int, output.split()))
+
+
+def test_max_range_is_never_below_the_menu_range():
+    assert max_range_days() == (3, 7)
+    assert max_range_days(SCHEDULE_RANGE_DAYS="10") == (10, 10)
+    assert max_range_days(SCHEDULE_RANGE_DAYS="2", SCHEDULE_MAX_RANGE_DAYS="14") == (2, 14)
+
+
+def test_days_argument_is_limited_by_config(monkeypatch):
+    monkeypatch.setattr(flight_handler, "SCHEDULE_MAX_RANGE_DAYS", 10)
+    assert parse_date_range("10days", TODAY) == ("2026-10-18", 10)
+    assert parse_date_range("11days", TODAY) is None
+    assert parse_date_range("0days", TODAY) is None
+
+
+def test_named_days_and_dates():
+    assert parse_date_range("tomorrow", TODAY) == ("2026-10-19", 1)
+    assert parse_date_range("besok", TODAY) == ("2026-10-19", 1)
+    assert parse_date_range("2026-10-20", TODAY) == ("2026-10-20", 1)
+    assert parse_date_range("someday", TODAY) is None
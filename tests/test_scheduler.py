@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import flight_handler
+from models import Flight
+from scheduler import FixedPollPolicy, PhasePollPolicy, PollScheduler, is_final_status
+from subscriptions import SubscriptionRegistry
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+
+class SimulatedClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def flight(status="On Time", departs_in=None, flight_id="f1"):
+    schedule = (NOW + departs_in).strftime("%Y-%m-%d %H:%M") if departs_in is not None else None
+    return Flight(flight_id, "Garuda", schedule, None, "GA410", "3", status, "Jakarta", "D")
+
+
+@pytest.fixture
+def policy():
+    return PhasePollPolicy(min_interval=10, max_interval=900)
+
+
+@pytest.mark.parametrize("status, interval", [
+    ("Boarding", 10),
+    ("Final Call", 10),
+    ("Gate Close", 10),
+    ("Gate Open", 30),
+    ("Delayed", 60),
+    ("Check-in", 60),
+])
+def test_status_sets_the_interval(policy, status, interval):
+    assert policy.next_interval(flight(status, timedelta(hours=9)), NOW) == interval
+
+
+@pytest.mark.parametrize("departs_in, interval", [
+    (timedelta(minutes=20), 10),
+    (timedelta(minutes=45), 60),
+    (timedelta(hours=2), 120),
+    (timedelta(hours=5), 300),
+    (timedelta(hours=9), 900),
+    (timedelta(minutes=-30), 10),
+])
+def test_time_to_departure_sets_the_interval(policy, departs_in, interval):
+    assert policy.next_interval(flight(departs_in=departs_in), NOW) == interval
+
+
+def test_missing_flight_or_departure_time_polls_at_the_base_rate(policy):
+    assert policy.next_interval(None, NOW) == 10
+    assert policy.next_interval(flight(), NOW) == 10
+
+
+@pytest.mark.parametrize("status", ["Departed, Gate Close", "departed, gate close", " DEPARTED, GATE CLOSE "])
+def test_final_status_backs_off_instead_of_matching_gate_close(policy, status):
+    assert is_final_status(status)
+    assert policy.next_interval(flight(status, timedelta(minutes=5)), NOW) == 900
+
+
+def test_gate_close_alone_is_not_final():
+    assert not is_final_status("Gate Close")
+    assert not is_final_status(None)
+
+
+def test_new_flights_are_due_immediately_and_then_follow_the_policy(policy):
+    clock = SimulatedClock()
+    scheduler = PollScheduler(policy, clock)
+    scheduler.sync(["boarding", "far"])
+    assert sorted(scheduler.pop_due()) == ["boarding", "far"]
+    scheduler.reschedule("boarding", flight("Boarding"), NOW)
+    scheduler.reschedule("far", flight(departs_in=timedelta(hours=2)), NOW)
+    assert scheduler.seconds_until_next() == 10
+    clock.advance(10)
+    assert scheduler.pop_due() == ["boarding"]
+    clock.advance(109)
+    assert scheduler.pop_due() == []
+    clock.advance(1)
+    assert scheduler.pop_due() == ["far"]
+
+
+def test_heap_order_after_a_reschedule():
+    clock = SimulatedClock()
+    scheduler = PollScheduler(FixedPollPolicy(60), clock)
+    for flight_id, due in (("a", 10), ("b", 20), ("c", 30)):
+        scheduler.schedule_at(flight_id, clock() + due)
+    # "a" moves behind "c"; its old heap entry must not fire
+    scheduler.schedule_at("a", clock() + 40)
+    assert scheduler.seconds_until_next() == 20
+    clock.advance(35)
+    assert scheduler.pop_due() == ["b", "c"]
+    assert scheduler.seconds_until_next() == 5
+    clock.advance(5)
+    assert scheduler.pop_due() == ["a"]
+    assert scheduler.seconds_until_next() is None
+
+
+def test_sync_drops_flights_nobody_watches():
+    clock = SimulatedClock()
+    scheduler = PollScheduler(FixedPollPolicy(60), clock)
+    scheduler.sync(["a", "b"])
+    scheduler.sync(["b"])
+    assert "a" not in scheduler
+    assert scheduler.pop_due() == ["b"]
+
+
+class SnapshotBot:
+    def __init__(self, flights):
+        self.flights = flights
+
+    async def get_flight_snapshot(self, allow_stale=True):
+        return {flight.id: flight for flight in self.flights}
+
+
+def test_monitor_stops_watching_a_departed_flight(monkeypatch):
+    departed = flight("Departed, Gate Close", timedelta(minutes=-5), flight_id="42")
+    boarding = flight("Boarding", timedelta(minutes=10), flight_id="43")
+    registry = SubscriptionRegistry()
+    registry.subscribe(1, flight(flight_id="42"), "en")
+    registry.subscribe(2, flight(flight_id="43"), "en")
+    scheduler = PollScheduler(FixedPollPolicy(60))
+    monkeypatch.setattr(flight_handler, "registry", registry)
+    monkeypatch.setattr(flight_handler, "flight_bot", SnapshotBot([departed, boarding]))
+    monkeypatch.setattr(flight_handler, "poll_scheduler", scheduler)
+    monkeypatch.setattr(flight_handler, "should_exit", False)
+
+    async def one_tick():
+        stop = asyncio.Event()
+        monitor = asyncio.ensure_future(flight_handler.monitor_flight_status(stop=stop))
+        while not registry.get_watch("43").check_count:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await monitor
+
+    asyncio.run(one_tick())
+    assert registry.get_watch("42") is None
+    assert "42" not in scheduler
+    assert registry.get_watch("43") is not None
@@ -0,0 +1,63 @@
+import os
+import signal
+import subprocess
+import sys
+
+from subscription_store import SubscriptionStore
+from subscriptions import SubscriptionRegistry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Flushes 200 subscriptions and a status change, records more that are never
+# flushed, then waits to be killed. The writer thread never wakes on its own.
+CHILD = r"""
+import sys, time
+from models import Flight
+from subscription_store import SubscriptionStore
+from subscriptions import SubscriptionRegistry
+
+def flight(n):
+    return Flight(f"f{n % 10}", "Garuda", "2026-10-18 10:00", "10:00", f"GA{n % 10}", "3", "On Time", "Jakarta", "D")
+
+store = SubscriptionStore(sys.argv[1], flush_interval=3600)
+registry = SubscriptionRegistry(store)
+for user_id in range(200):
+    registry.subscribe(user_id, flight(user_id), "en")
+watch = registry.get_watch("f0")
+watch.last_status = "Boarding"
+registry.save_watch(watch)
+store.put_message(0, 11)
+store.flush()
+for user_id in range(200, 300):
+    registry.subscribe(user_id, flight(user_id), "en")
+registry.unsubscribe(1)
+watch.last_status = "Gate Close"
+registry.save_watch(watch)
+store.put_message(0, 12)
+print("ready", flush=True)
+time.sleep(60)
+"""
+
+
+def test_sigkill_keeps_every_flushed_row_and_drops_the_pending_batch(tmp_path):
+    path = str(tmp_path / "subscriptions.db")
+    child = subprocess.Popen([sys.executable, "-c", CHILD, path], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    try:
+        assert child.stdout.readline().strip() == "ready"
+    finally:
+        child.send_signal(signal.SIGKILL)
+        child.wait()
+        child.stdout.close()
+
+    store = SubscriptionStore(path)
+    registry = SubscriptionRegistry()
+    try:
+        assert store._conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert registry.restore(store) == 200
+        assert all(registry.is_watching(user_id) for user_id in range(200))
+        assert not any(registry.is_watching(user_id) for user_id in range(200, 300))
+        assert len(registry) == 10
+        assert registry.get_watch("f0").last_status == "Boarding"
+        assert store.load_messages() == {0: 11}
+    finally:
+        store.close()
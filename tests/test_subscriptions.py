@@ -0,0 +1,144 @@
+import asyncio
+from types import SimpleNamespace
+
+import flight_handler
+from models import Flight
+from scheduler import FixedPollPolicy, PollScheduler
+from subscription_store import SubscriptionStore
+from subscriptions import SubscriptionRegistry
+
+
+class QueuedDispatcher:
+    """Keeps submitted jobs until the test runs them, like a send stuck behind a rate limit"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, chat_id, job):
+        self.jobs.append(job)
+
+    def run(self, bot):
+        async def run_all():
+            for job in self.jobs:
+                await job(bot)
+        asyncio.run(run_all())
+
+
+class SentMessage:
+    message_id = 7
+
+
+class FakeBot:
+    async def send_message(self, **kwargs):
+        return SentMessage()
+
+    async def delete_message(self, **kwargs):
+        return True
+
+
+def flight(flight_id="42"):
+    return Flight(flight_id, "Garuda", "2026-10-18 10:00", "10:00", "GA42", "3", "On Time", "Jakarta", "D")
+
+
+def restart(path):
+    registry = SubscriptionRegistry()
+    store = SubscriptionStore(path)
+    registry.restore(store)
+    return registry, store
+
+
+def pending_send_then(monkeypatch, tmp_path, drop):
+    path = str(tmp_path / "subscriptions.db")
+    store = SubscriptionStore(path)
+    registry = SubscriptionRegistry(store)
+    monkeypatch.setattr(flight_handler, "registry", registry)
+    subscription = registry.subscribe(1, flight(), "en")
+    dispatcher = QueuedDispatcher()
+    flight_handler.queue_notification(dispatcher, 1, subscription, "final", "final status", flag="final_notified")
+    drop(registry)
+    dispatcher.run(FakeBot())
+    store.close()
+    return restart(path)
+
+
+def test_dropped_flight_stays_dropped_after_late_send(monkeypatch, tmp_path):
+    registry, store = pending_send_then(monkeypatch, tmp_path, lambda registry: registry.drop_flight("42"))
+    assert not registry
+    assert list(store.iter_subscriptions()) == []
+    assert list(store.iter_watches()) == []
+    store.close()
+
+
+def test_unsubscribe_during_send_stays_unsubscribed(monkeypatch, tmp_path):
+    registry, store = pending_send_then(monkeypatch, tmp_path, lambda registry: registry.unsubscribe(1, "42"))
+    assert not registry.is_watching(1)
+    assert list(store.iter_subscriptions()) == []
+    store.close()
+
+
+def test_send_saves_a_live_subscription(monkeypatch, tmp_path):
+    registry, store = pending_send_then(monkeypatch, tmp_path, lambda registry: None)
+    subscription = registry.subscriptions_for(1)["42"]
+    assert subscription.last_message_id == 7
+    assert subscription.notification_count == 1
+    assert subscription.final_notified
+    store.close()
+
+
+def test_resubscribe_is_not_overwritten_by_the_old_subscription(tmp_path):
+    path = str(tmp_path / "subscriptions.db")
+    store = SubscriptionStore(path)
+    registry = SubscriptionRegistry(store)
+    old = registry.subscribe(1, flight(), "en")
+    registry.unsubscribe(1, "42")
+    registry.subscribe(1, flight(), "id")
+    old.notification_count = 5
+    registry.save_subscription(1, old)
+    store.close()
+    registry, store = restart(path)
+    assert registry.subscriptions_for(1)["42"].language == "id"
+    assert registry.subscriptions_for(1)["42"].notification_count == 0
+    store.close()
+
+
+class SnapshotBot:
+    def __init__(self, flights):
+        self.flights = flights
+
+    async def get_flight_snapshot(self, allow_stale=True):
+        return {flight.id: flight for flight in self.flights}
+
+
+def test_watch_restored_without_its_row_is_seeded_silently(monkeypatch, tmp_path):
+    path = str(tmp_path / "subscriptions.db")
+    store = SubscriptionStore(path)
+    SubscriptionRegistry(store).subscribe(1, flight(), "en")
+    store.delete_watch("42")
+    store.close()
+    registry, store = restart(path)
+    assert not registry.get_watch("42").seeded
+
+    changes = []
+    monkeypatch.setattr(flight_handler, "registry", registry)
+    monkeypatch.setattr(flight_handler, "flight_bot", SnapshotBot([flight()]))
+    monkeypatch.setattr(flight_handler, "poll_scheduler", PollScheduler(FixedPollPolicy(60)))
+    monkeypatch.setattr(flight_handler, "should_exit", False)
+    monkeypatch.setattr(flight_handler, "notify_flight_changes", lambda *args: changes.append(args))
+
+    async def one_tick():
+        stop = asyncio.Event()
+        monitor = asyncio.ensure_future(flight_handler.monitor_flight_status(SimpleNamespace(bot=FakeBot()), stop))
+        while not registry.get_watch("42").check_count:
+            await asyncio.sleep(0.01)
+        stop.set()
+        await monitor
+
+    asyncio.run(one_tick())
+    watch = registry.get_watch("42")
+    assert changes == []
+    assert watch.seeded and watch.last_status == "On Time"
+    store.close()
+    registry, store = restart(path)
+    assert registry.get_watch("42").seeded
+    assert registry.get_watch("42").last_status == "On Time"
+    store.close()
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+import flight_handler
+from bench.stub_feed import StubFeedServer
+from flight_bot import FlightScheduleBot
+from models import Flight
+from scheduler import FixedPollPolicy, PollScheduler
+from subscriptions import SubscriptionRegistry
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    feed = StubFeedServer(dom_size=60, inter_size=30, latency=0.2).start()
+    monkeypatch.setattr(FlightScheduleBot, "FEED_URLS", {"D": feed.dom_url, "I": feed.inter_url})
+    yield feed
+    feed.stop()
+
+
+def test_concurrent_lookups_inside_the_ttl_share_one_download(feed):
+    bot = FlightScheduleBot(cache_ttl=60)
+
+    async def lookups():
+        try:
+            found = await asyncio.gather(*(bot.get_flight_info_by_id(f"d{i}") for i in range(50)))
+            found += await asyncio.gather(*(bot.get_flight_info_by_id(f"i{i}") for i in range(30)))
+            return found
+        finally:
+            await bot.aclose()
+
+    found = asyncio.run(lookups())
+    assert all(flight is not None for flight in found)
+    assert feed.hits == {"dom": 1, "inter": 1}
+    assert bot.feed_cache.stats()["coalesced"] > 0
+
+
+def test_expired_entry_is_served_while_one_refresh_runs(feed):
+    bot = FlightScheduleBot(cache_ttl=0.1)
+
+    async def lookups():
+        try:
+            await bot.get_flight_snapshot()
+            await asyncio.sleep(0.15)
+            started = time.perf_counter()
+            stale = await asyncio.gather(*(bot.get_flight_snapshot() for _ in range(20)))
+            waited = time.perf_counter() - started
+            # The refresh started by the first stale hit finishes in the background
+            while bot.feed_cache.stats()["refreshes"] < 4 or bot.feed_cache._inflight:
+                await asyncio.sleep(0.05)
+            return stale, waited
+        finally:
+            await bot.aclose()
+
+    stale, waited = asyncio.run(lookups())
+    assert all(len(snapshot) == 90 for snapshot in stale)
+    assert waited < feed.latency
+    assert feed.hits == {"dom": 2, "inter": 2}
+    assert bot.feed_cache.stats()["stale_hits"] == 40
+
+
+@pytest.mark.parametrize("watchers", [1, 50, 500])
+def test_monitor_tick_downloads_each_feed_once_for_any_number_of_watchers(feed, monkeypatch, watchers):
+    registry = SubscriptionRegistry()
+    for user_id in range(watchers):
+        flight_id = f"d{user_id % 60}"
+        registry.subscribe(user_id, Flight(flight_id, "Garuda", None, None, f"GA{user_id}", "1", "On Time", "Jakarta", "D"), "en")
+    monkeypatch.setattr(flight_handler, "registry", registry)
+    monkeypatch.setattr(flight_handler, "flight_bot", FlightScheduleBot(cache_ttl=60))
+    monkeypatch.setattr(flight_handler, "poll_scheduler", PollScheduler(FixedPollPolicy(60)))
+    monkeypatch.setattr(flight_handler, "should_exit", False)
+
+    async def one_tick():
+        stop = asyncio.Event()
+        monitor = asyncio.ensure_future(flight_handler.monitor_flight_status(stop=stop))
+        while not all(watch.check_count for watch in registry.watches()):
+            await asyncio.sleep(0.05)
+        stop.set()
+        await monitor
+        await flight_handler.flight_bot.aclose()
+
+    asyncio.run(one_tick())
+    assert all(watch.check_count == 1 for watch in registry.watches())
+    assert feed.hits == {"dom": 1, "inter": 1}
@@ -0,0 +1,29 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import health
+from webhook import SECRET_HEADER, WebhookIngress
+
+
+def test_ingress_refuses_to_run_without_a_secret():
+    with pytest.raises(ValueError):
+        WebhookIngress(application=None, secret_token="")
+
+
+def test_receive_checks_the_secret_header():
+    app = FastAPI()
+    WebhookIngress(application=None, secret_token="s3cret").mount(app, "/telegram")
+    client = TestClient(app)
+
+    assert client.post("/telegram", json={}).status_code == 403
+    assert client.post("/telegram", json={}, headers={SECRET_HEADER: "guess"}).status_code == 403
+    # Past the check; the workers aren't started, so it's refused as busy
+    assert client.post("/telegram", json={}, headers={SECRET_HEADER: "s3cret"}).status_code == 503
+
+
+def test_metrics_and_profiling_are_not_on_the_public_app():
+    public = TestClient(health.app)
+    assert public.get("/metrics").status_code == 404
+    assert public.get("/debug/profile").status_code == 404
+    assert TestClient(health.admin_app).get("/metrics").status_code == 200
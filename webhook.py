@@ -0,0 +1,106 @@
+import asyncio
+import hmac
+import logging
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+class WebhookIngress:
+    """Receives Telegram updates over HTTP and runs them on a pool of workers.
+
+    An update is acknowledged as soon as it is queued. Each chat is pinned to
+    one worker, so a chat's updates are handled in order while different
+    chats are handled concurrently. A worker takes whatever has queued up
+    for it, up to ``batch_size`` updates, per wake-up. A full queue answers
+    503, which makes Telegram retry the delivery later. Requests without
+    Telegram's ``secret_token`` header are refused, so a secret is required.
+    """
+
+    def __init__(self, application: Any, workers: int = 8, batch_size: int = 32, secret_token: Optional[str] = None,
+                 queue_size: int = 1000) -> None:
+        if workers < 1:
+            raise ValueError("WebhookIngress needs at least one worker")
+        if not secret_token:
+            raise ValueError("WebhookIngress needs a secret token")
+        self.application = application
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.secret_token = secret_token
+        self.queue_size = queue_size
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"received": 0, "processed": 0, "failed": 0, "rejected": 0, "batches": 0}
+
+    def mount(self, app: FastAPI, path: str) -> None:
+        app.add_api_route(path, self.receive, methods=["POST"], include_in_schema=False)
+
+    async def start(self) -> None:
+        """Start the workers on the running loop"""
+        self._queues = [asyncio.Queue(self.queue_size) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._work(queue), name=f"webhook-worker-{index}")
+                       for index, queue in enumerate(self._queues)]
+        logger.info(f"Webhook ingress started with {self.workers} workers")
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Finish the queued updates (for up to ``timeout`` seconds), then stop the workers"""
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook ingress stopping with {self.pending} updates unprocessed")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def pending(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats, pending=self.pending)
+
+    def _worker_for(self, update: Update) -> int:
+        chat = update.effective_chat
+        user = update.effective_user
+        key = chat.id if chat is not None else user.id if user is not None else update.update_id
+        return hash(key) % self.workers
+
+    async def receive(self, request: Request) -> Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token, self.secret_token):
+            return Response(status_code=403)
+        if not self._queues:
+            return Response(status_code=503)
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except Exception as e:
+            logger.warning(f"Rejected malformed webhook update: {e}")
+            return Response(status_code=400)
+        try:
+            self._queues[self._worker_for(update)].put_nowait(update)
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            return Response(status_code=503)
+        self._stats["received"] += 1
+        return Response(status_code=200)
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            self._stats["batches"] += 1
+            for update in batch:
+                try:
+                    await self.application.process_update(update)
+                    self._stats["processed"] += 1
+                except Exception as e:
+                    self._stats["failed"] += 1
+                    logger.error(f"Error processing update {update.update_id}: {e}")
+                finally:
+                    queue.task_done()